@@ -0,0 +1,126 @@
+"""Startup benchmark for the ``monitoring_tool`` command line.
+
+Runs each CLI command in a fresh interpreter and reports wall-clock percentiles,
+net of a bare ``python -c pass``, together with the cumulative import time of
+the package measured by ``-X importtime``. Results can be appended to a JSON
+Lines history file to follow startup cost across commits::
+
+    python benchmarks/startup.py --repeat 30 --history benchmarks/startup_history.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    "help": ["--help"],
+    "list": ["list"],
+    "overview": ["overview"],
+    "technique": ["technique", "Detecção de Drift de Dados"],
+    "search": ["search", "drift"],
+    "summary": ["summary"],
+}
+
+
+def _environment() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def _wall_times(arguments: list[str], repeat: int) -> list[float]:
+    env = _environment()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(arguments, check=True, stdout=subprocess.DEVNULL, env=env)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def _import_time_ms(module: str, repeat: int) -> float:
+    """Median cumulative import time of ``module`` reported by ``-X importtime``."""
+
+    env = _environment()
+    samples = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        for line in completed.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                samples.append(int(fields[1]) / 1000.0)
+    return statistics.median(samples)
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def run(repeat: int) -> dict:
+    interpreter = statistics.median(_wall_times([sys.executable, "-c", "pass"], repeat))
+    commands = {}
+    for name, arguments in COMMANDS.items():
+        samples = _wall_times([sys.executable, "-m", "monitoring_tool", *arguments], repeat)
+        commands[name] = {
+            "p50_ms": round(statistics.median(samples) - interpreter, 2),
+            "p95_ms": round(_percentile(samples, 0.95) - interpreter, 2),
+        }
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "interpreter_ms": round(interpreter, 2),
+        "import_ms": {
+            module: round(_import_time_ms(module, repeat), 2)
+            for module in ("monitoring_tool", "monitoring_tool.__main__")
+        },
+        "commands": commands,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização da CLI.")
+    parser.add_argument("--repeat", type=int, default=20, help="Execuções por comando.")
+    parser.add_argument("--history", type=Path, help="Arquivo JSON Lines onde acrescentar o resultado.")
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=None,
+        help="Falha (código 1) se importar monitoring_tool.__main__ levar mais que isso.",
+    )
+    args = parser.parse_args(argv)
+
+    result = run(args.repeat)
+    print(f"Interpretador vazio: {result['interpreter_ms']:.1f} ms")
+    for module, value in result["import_ms"].items():
+        print(f"import {module}: {value:.1f} ms")
+    for name, stats in result["commands"].items():
+        print(f"{name:<10} p50 {stats['p50_ms']:7.1f} ms   p95 {stats['p95_ms']:7.1f} ms")
+    if args.history is not None:
+        with args.history.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+    if args.max_import_ms is not None and result["import_ms"]["monitoring_tool.__main__"] > args.max_import_ms:
+        print(f"Importação acima do limite de {args.max_import_ms:.1f} ms.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,556 @@
+"""Benchmark suite for the detectors, the production simulators and the guide renderers.
+
+Every case streams synthetic data, generated from a fixed seed in chunks of about
+one million cells, through one component of ``monitoring_tool`` at each size of the
+chosen scale (10^3 to 10^8 rows, 1 to 1,000 features). Each size runs in a fresh
+process, so its peak memory is not inherited from the previous one. A run records
+throughput, per-call latency percentiles and the peak resident memory added by the
+case, appends them to a JSON Lines history and compares them with a baseline::
+
+    python benchmarks/suite.py --scale standard --update-baseline
+    python benchmarks/suite.py --scale standard            # exits 1 on regression
+
+A size that regresses is measured again (``--confirm`` times) and only fails the
+run if every attempt regresses; p95 latency is not gated for sizes timed in fewer
+than :data:`MIN_P95_CALLS` calls.
+
+Data generation happens outside the timed calls. Every algorithm listed in
+``data.py`` must be mapped to a case, or to :data:`NOT_IMPLEMENTED` when the
+package does not ship it, so new catalogue entries cannot go unmeasured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+# Imported up front so that neither their import time nor their memory is charged
+# to the first case that uses them.
+from monitoring_tool import guide  # noqa: E402
+from monitoring_tool.bootstrap import PoissonBootstrap  # noqa: E402
+from monitoring_tool.concept_drift import ADWIN, DDM  # noqa: E402
+from monitoring_tool.control_charts import ControlChartEvaluator  # noqa: E402
+from monitoring_tool.data import MONITORING_TECHNIQUES  # noqa: E402
+from monitoring_tool.discrete_event import plant_from_parameters, run_discrete_event  # noqa: E402
+from monitoring_tool.drift import CategoricalDriftDetector, KSDetector, PSIReference  # noqa: E402
+from monitoring_tool.drift_report import DriftReport, DriftThresholds, FeatureDrift, NUMERIC  # noqa: E402
+from monitoring_tool.fairness import FairnessMonitor  # noqa: E402
+from monitoring_tool.isolation_forest import IsolationForest  # noqa: E402
+from monitoring_tool.quality import InRange, NotNull, RuleSet, StatisticBetween  # noqa: E402
+from monitoring_tool.simulation import ProductionParameters, simulate  # noqa: E402
+
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "history.jsonl"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Absolute slack on latency and memory comparisons: below these, differences are
+# scheduler and allocator noise rather than changes in the code under test.
+_LATENCY_SLACK_MS = 0.5
+_MEMORY_SLACK_MB = 1.0
+# Timed calls needed before a p95 latency is gated: with fewer, the "95th
+# percentile" is just the slowest call and one hiccup flags a regression.
+MIN_P95_CALLS = 20
+
+# Cells generated per chunk; a 10^8-row case never holds more than this at once.
+CHUNK_CELLS = 1_000_000
+
+SCALES: Dict[str, Dict[str, object]] = {
+    "smoke": {"rows": (10**3, 10**4), "features": (1, 10), "max_cells": 10**6},
+    "standard": {"rows": (10**3, 10**4, 10**5, 10**6), "features": (1, 10, 100), "max_cells": 10**8},
+    "full": {
+        "rows": (10**3, 10**4, 10**5, 10**6, 10**7, 10**8),
+        "features": (1, 10, 100, 1_000),
+        "max_cells": 10**10,
+    },
+}
+
+# Catalogue algorithms without an implementation in the package.
+NOT_IMPLEMENTED = {
+    "Teste de hipótese em métricas de performance": "sem implementação dedicada no pacote",
+    "Autoencoders": "sem implementação no pacote",
+    "Threshold Moving ou Reweighting": "sem implementação no pacote",
+}
+
+
+class _Run:
+    """One case at one size: synthetic data streams plus the timing of each call."""
+
+    def __init__(self, rows: int, features: int, seed: int) -> None:
+        self.rows = rows
+        self.features = features
+        self.seed = seed
+        self.chunk_rows = max(min(rows, CHUNK_CELLS // features), 1)
+        self.latencies: List[float] = []
+        self.seconds = 0.0
+
+    def rng(self, stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, stream])
+
+    def sizes(self) -> Iterator[int]:
+        for start in range(0, self.rows, self.chunk_rows):
+            yield min(self.chunk_rows, self.rows - start)
+
+    def matrices(self, shift: float = 0.1, stream: int = 1) -> Iterator[np.ndarray]:
+        """``(rows, features)`` normal chunks, shifted from the reference by ``shift``."""
+
+        rng = self.rng(stream)
+        for size in self.sizes():
+            yield rng.normal(shift, 1.0, (size, self.features))
+
+    def reference(self, rows: Optional[int] = None) -> np.ndarray:
+        return self.rng(0).normal(0.0, 1.0, (min(rows or self.chunk_rows, self.rows), self.features))
+
+    def labels(self, error_rate: float = 0.1, stream: int = 1) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Binary ``(y_true, y_pred)`` chunks that disagree on ``error_rate`` of the rows."""
+
+        rng = self.rng(stream)
+        for size in self.sizes():
+            y_true = (rng.random(size) < 0.3).astype(np.float64)
+            wrong = rng.random(size) < error_rate
+            yield y_true, np.where(wrong, 1.0 - y_true, y_true)
+
+    @contextmanager
+    def timed(self, sample: bool = True) -> Iterator[None]:
+        """Time the enclosed call; ``sample=False`` counts it in throughput only."""
+
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.seconds += elapsed
+        if sample:
+            self.latencies.append(elapsed)
+
+    def timed_stream(self, chunks: Iterator[object]) -> Iterator[object]:
+        """Yield ``chunks`` to a consumer, timing the work done on each one."""
+
+        for chunk in chunks:
+            start = time.perf_counter()
+            yield chunk
+            elapsed = time.perf_counter() - start
+            self.seconds += elapsed
+            self.latencies.append(elapsed)
+
+
+@dataclass(frozen=True)
+class Case:
+    """A benchmarked component and the catalogue algorithms it implements.
+
+    Cases without ``uses_rows`` are called ``--repeat`` times instead; cases without
+    ``uses_features`` only run with a single feature.
+    """
+
+    name: str
+    run: Callable[[_Run], None]
+    algorithms: Tuple[str, ...] = ()
+    uses_rows: bool = True
+    uses_features: bool = True
+    max_rows: Optional[int] = None
+    max_features: Optional[int] = None
+
+
+def _psi(run: _Run) -> None:
+    reference = PSIReference.fit(run.reference())
+    counts = np.zeros((run.features, reference.n_bins), dtype=np.int64)
+    for chunk in run.matrices():
+        with run.timed():
+            counts += reference.bin_counts(chunk)
+    with run.timed(sample=False):
+        reference.score_counts(counts)
+
+
+def _ks(run: _Run) -> None:
+    detector = KSDetector(run.features, seed=run.seed)
+    for chunk in run.matrices(shift=0.0, stream=0):
+        with run.timed():
+            detector.update_reference(chunk)
+    for chunk in run.matrices():
+        with run.timed():
+            detector.update(chunk)
+    with run.timed(sample=False):
+        detector.test()
+
+
+def _categorical(run: _Run) -> None:
+    # Zipf-like codes over ~10^4 levels exercise the heavy-hitter counters.
+    detector = CategoricalDriftDetector(run.features, seed=run.seed)
+    for stream, target in ((0, detector.update_reference), (1, detector.update)):
+        rng = run.rng(stream)
+        for size in run.sizes():
+            codes = np.minimum(rng.zipf(1.3, (size, run.features)), 10_000)
+            with run.timed():
+                target(codes)
+    with run.timed(sample=False):
+        detector.test()
+
+
+def _ddm(run: _Run) -> None:
+    detector = DDM()
+    for y_true, y_pred in run.labels():
+        errors = (y_true != y_pred).astype(np.float64)
+        with run.timed():
+            detector.update_batch(errors)
+
+
+def _adwin(run: _Run) -> None:
+    detector = ADWIN()
+    for y_true, y_pred in run.labels():
+        errors = (y_true != y_pred).astype(np.float64)
+        with run.timed():
+            detector.update_batch(errors)
+
+
+def _control_charts(run: _Run) -> None:
+    # Features are metric series and rows are ticks: each chunk is a block of columns.
+    evaluator = ControlChartEvaluator.fit(run.reference(1_000).T)
+    for chunk in run.matrices():
+        columns = np.ascontiguousarray(chunk.T)
+        with run.timed():
+            evaluator.update(columns)
+
+
+def _bootstrap(run: _Run) -> None:
+    with PoissonBootstrap(n_replicates=200, seed=run.seed) as bootstrap:
+        for y_true, y_pred in run.labels():
+            with run.timed():
+                bootstrap.update(y_true, y_pred)
+        with run.timed(sample=False):
+            bootstrap.confidence_interval("accuracy")
+
+
+def _quality(run: _Run) -> None:
+    names = [f"f{index}" for index in range(run.features)]
+    rules = RuleSet(
+        [rule for name in names for rule in (NotNull(name, 0.99), InRange(name, -4.0, 4.0, 0.999),
+                                             StatisticBetween(name, "mean", -0.5, 0.5))]
+    )
+    chunks = ({name: column for name, column in zip(names, chunk.T)} for chunk in run.matrices())
+    rules.validate_chunks(run.timed_stream(chunks))
+
+
+def _isolation_forest(run: _Run) -> None:
+    with run.timed(sample=False):
+        forest = IsolationForest(seed=run.seed).fit(run.reference(10_000))
+    for chunk in run.matrices():
+        with run.timed():
+            forest.score(chunk)
+
+
+def _fairness(run: _Run) -> None:
+    monitor = FairnessMonitor()
+    rng = run.rng(2)
+    for y_true, y_pred in run.labels():
+        groups = rng.integers(0, 8, y_true.size)
+        with run.timed():
+            monitor.update(groups, y_pred, y_true)
+    with run.timed(sample=False):
+        monitor.report()
+
+
+def _monte_carlo(run: _Run) -> None:
+    # Rows are replications, simulated in chunks like the data of the other cases.
+    for index, size in enumerate(run.sizes()):
+        with run.timed():
+            simulate(ProductionParameters(), replications=size, seed=run.seed + index)
+
+
+def _discrete_event(run: _Run) -> None:
+    plant = plant_from_parameters(ProductionParameters(), lines=run.features, repair_crews=max(run.features // 4, 1))
+    for index in range(run.rows):
+        with run.timed():
+            run_discrete_event(plant, seed=run.seed + index)
+
+
+def _render_summary_cold(run: _Run) -> None:
+    for _ in range(run.rows):
+        guide._rendered_sections.clear()
+        with run.timed():
+            guide.build_summary()
+
+
+def _render_summary(run: _Run) -> None:
+    guide.build_summary()
+    for _ in range(run.rows):
+        with run.timed():
+            guide.build_summary()
+
+
+def _render_lookups(run: _Run) -> None:
+    names = [technique.name.lower() for technique in MONITORING_TECHNIQUES]
+    for index in range(run.rows):
+        with run.timed():
+            guide.format_technique(names[index % len(names)])
+            guide.format_search("drift de dados")
+
+
+def _render_drift_report(run: _Run) -> None:
+    rng = run.rng(0)
+    features = tuple(
+        FeatureDrift(
+            name=f"f{index}",
+            kind=NUMERIC,
+            n_reference=1_000_000,
+            n_current=1_000_000,
+            missing_reference=0,
+            missing_current=int(rng.integers(0, 1_000)),
+            psi=float(rng.random() * 0.4),
+            chi2_statistic=float(rng.random() * 100.0),
+            chi2_p_value=float(rng.random()),
+            js_divergence=float(rng.random() * 0.2),
+            ks_statistic=float(rng.random() * 0.2),
+            ks_p_value=float(rng.random()),
+            alerts=("PSI",) if index % 2 else (),
+        )
+        for index in range(run.features)
+    )
+    report = DriftReport("referencia.parquet", "producao.parquet", 1_000_000, 1_000_000, DriftThresholds(), features)
+    for _ in range(run.rows):
+        with run.timed():
+            guide.format_drift_report(report)
+            guide.drift_report_json(report)
+
+
+CASES: Tuple[Case, ...] = (
+    Case("psi", _psi, ("Population Stability Index (PSI)",)),
+    Case("ks", _ks, ("Teste de Kolmogorov-Smirnov",)),
+    Case("chi_square", _categorical, ("Chi-quadrado",)),
+    Case("ddm", _ddm, ("Drift Detection Method (DDM)",), uses_features=False),
+    Case("adwin", _adwin, ("ADaptive WINdowing (ADWIN)",), uses_features=False, max_rows=10**7),
+    Case("control_charts", _control_charts, ("Controle Estatístico de Processo (Shewhart, CUSUM)",)),
+    Case("bootstrap", _bootstrap, ("Bootstrapping de métricas",), uses_features=False),
+    Case("quality_rules", _quality, ("Regras declarativas (Great Expectations, Deequ)",)),
+    Case("isolation_forest", _isolation_forest, ("Isolation Forest",), max_rows=10**7),
+    Case("fairness", _fairness, ("Demographic Parity", "Equalized Odds"), uses_features=False),
+    Case("monte_carlo", _monte_carlo, uses_features=False, max_rows=10**7),
+    Case("discrete_event", _discrete_event, uses_rows=False, max_features=100),
+    Case("render_summary_cold", _render_summary_cold, uses_rows=False, uses_features=False),
+    Case("render_summary", _render_summary, uses_rows=False, uses_features=False),
+    Case("render_lookups", _render_lookups, uses_rows=False, uses_features=False),
+    Case("render_drift_report", _render_drift_report, uses_rows=False),
+)
+_CASES_BY_NAME = {case.name: case for case in CASES}
+
+
+def check_coverage() -> None:
+    """Fail when an algorithm of the catalogue has neither a case nor an exemption."""
+
+    covered = {algorithm for case in CASES for algorithm in case.algorithms}
+    catalogue = {algorithm.name for technique in MONITORING_TECHNIQUES for algorithm in technique.algorithms}
+    missing = sorted(catalogue - covered - NOT_IMPLEMENTED.keys())
+    if missing:
+        raise SystemExit(f"Algoritmos do catálogo sem benchmark: {', '.join(missing)}")
+
+
+def _max_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _measure(name: str, rows: int, features: int, seed: int) -> dict:
+    before = _max_rss_mb()
+    run = _Run(rows, features, seed)
+    wall = time.perf_counter()
+    _CASES_BY_NAME[name].run(run)
+    wall = time.perf_counter() - wall
+    latencies = np.asarray(run.latencies) * 1000.0
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) if latencies.size else (0.0, 0.0, 0.0)
+    return {
+        "case": name,
+        "rows": rows,
+        "features": features,
+        "calls": int(latencies.size),
+        "seconds": round(run.seconds, 6),
+        "wall_seconds": round(wall, 6),
+        "throughput": round(rows / run.seconds, 2) if run.seconds > 0 else None,
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "peak_mb": round(max(_max_rss_mb() - before, 0.0), 2),
+    }
+
+
+@dataclass
+class Plan:
+    """Sizes each selected case runs at, and the sizes skipped by the caps."""
+
+    runs: List[Tuple[str, int, int]] = field(default_factory=list)
+    skipped: List[Tuple[str, int, int]] = field(default_factory=list)
+
+
+def plan(
+    cases: List[Case], rows: Tuple[int, ...], features: Tuple[int, ...], max_cells: int, repeat: int
+) -> Plan:
+    result = Plan()
+    for case in cases:
+        sizes = [
+            (size, width)
+            for size in (rows if case.uses_rows else (repeat,))
+            for width in (features if case.uses_features else (1,))
+        ]
+        for size, width in dict.fromkeys(sizes):
+            too_big = (
+                (case.uses_rows and size * width > max_cells)
+                or (case.max_rows is not None and size > case.max_rows)
+                or (case.max_features is not None and width > case.max_features)
+            )
+            (result.skipped if too_big else result.runs).append((case.name, size, width))
+    return result
+
+
+def _key(result: dict) -> str:
+    return f"{result['case']}/{result['rows']}x{result['features']}"
+
+
+def regressions(results: List[dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Describe every result that is slower, or heavier, than the baseline allows.
+
+    p95 latencies are only compared when both runs timed at least
+    :data:`MIN_P95_CALLS` calls.
+    """
+
+    found = []
+    for result in results:
+        reference = baseline.get(_key(result))
+        if reference is None:
+            continue
+        if reference.get("throughput") and result["throughput"] is not None:
+            if result["throughput"] < reference["throughput"] * (1.0 - tolerance):
+                found.append(
+                    f"{_key(result)}: vazão {result['throughput']:.4g}/s contra {reference['throughput']:.4g}/s"
+                )
+        enough_calls = min(result["calls"], reference.get("calls", 0)) >= MIN_P95_CALLS
+        if (
+            enough_calls
+            and reference.get("p95_ms")
+            and result["p95_ms"] > reference["p95_ms"] * (1.0 + tolerance) + _LATENCY_SLACK_MS
+        ):
+            found.append(f"{_key(result)}: p95 {result['p95_ms']:.4g} ms contra {reference['p95_ms']:.4g} ms")
+        if result["peak_mb"] > reference.get("peak_mb", 0.0) * (1.0 + tolerance) + _MEMORY_SLACK_MB:
+            found.append(f"{_key(result)}: memória {result['peak_mb']:.1f} MB contra {reference['peak_mb']:.1f} MB")
+    return found
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def _sizes(text: str) -> Tuple[int, ...]:
+    return tuple(int(float(value)) for value in text.split(",") if value)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Mede detectores, simuladores e renderizadores do guia.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="smoke", help="Conjunto de tamanhos (padrão: smoke).")
+    parser.add_argument("--rows", type=_sizes, help="Linhas por caso, separadas por vírgula (ex.: 1e3,1e6).")
+    parser.add_argument("--features", type=_sizes, help="Features por caso, separadas por vírgula.")
+    parser.add_argument("--max-cells", type=float, help="Pula tamanhos com mais células (linhas x features).")
+    parser.add_argument("--repeat", type=int, default=50, help="Chamadas dos casos sem eixo de linhas.")
+    parser.add_argument("--cases", default="*", help="Padrões dos casos a executar, separados por vírgula.")
+    parser.add_argument("--seed", type=int, default=0, help="Semente dos dados sintéticos.")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="Arquivo JSON Lines do histórico.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Arquivo JSON de referência.")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Grava os resultados desta execução como referência.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Piora relativa tolerada antes de acusar regressão.")
+    parser.add_argument(
+        "--confirm",
+        type=int,
+        default=2,
+        help="Vezes que um tamanho com regressão é medido de novo; só falha se piorar em todas (padrão: 2).",
+    )
+    args = parser.parse_args(argv)
+
+    check_coverage()
+    scale = SCALES[args.scale]
+    patterns = [pattern for pattern in args.cases.split(",") if pattern]
+    cases = [case for case in CASES if any(fnmatch.fnmatch(case.name, pattern) for pattern in patterns)]
+    if not cases:
+        parser.error(f"Nenhum caso corresponde a '{args.cases}'.")
+    schedule = plan(
+        cases,
+        args.rows or scale["rows"],
+        args.features or scale["features"],
+        int(args.max_cells or scale["max_cells"]),
+        args.repeat,
+    )
+
+    context = get_context("spawn")
+
+    def measure(name: str, rows: int, features: int, note: str = "") -> dict:
+        # A fresh process per size keeps peak memory from leaking between runs.
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(_measure, name, rows, features, args.seed).result()
+        print(
+            f"{name:<20} {rows:>11,d} x {features:<5d} {result['throughput'] or 0:>14,.0f}/s   "
+            f"p50 {result['p50_ms']:9.3f} ms   p95 {result['p95_ms']:9.3f} ms   "
+            f"pico {result['peak_mb']:8.1f} MB{note}",
+            flush=True,
+        )
+        return result
+
+    results = [measure(name, rows, features) for name, rows, features in schedule.runs]
+    for name, rows, features in schedule.skipped:
+        print(f"{name:<20} {rows:>11,d} x {features:<5d} pulado (acima dos limites do caso)")
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    if not args.update_baseline:
+        # Re-measure the sizes that regressed and keep the retry when it passes, so
+        # that only a slowdown seen in every attempt fails the run.
+        for attempt in range(1, args.confirm + 1):
+            for index, result in enumerate(results):
+                if regressions([result], baseline, args.tolerance):
+                    retry = measure(result["case"], result["rows"], result["features"], f"   (repetição {attempt})")
+                    if not regressions([retry], baseline, args.tolerance):
+                        results[index] = retry
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "not_implemented": NOT_IMPLEMENTED,
+        "results": results,
+    }
+    with args.history.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if args.update_baseline:
+        baseline.update({_key(result): result for result in results})
+        args.baseline.write_text(json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Referência atualizada em {args.baseline}")
+        return 0
+    found = regressions(results, baseline, args.tolerance)
+    for line in found:
+        print(f"Regressão: {line}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
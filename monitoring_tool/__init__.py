@@ -1,11 +1,37 @@
 """Educational toolkit for monitoring machine learning models in production."""
 
-from .data import MONITORING_TECHNIQUES, PRODUCTION_PROBLEMS, USE_CASES
-from .guide import build_summary
+from __future__ import annotations
+
+import importlib
+
+# Public names and the submodule defining them. They are imported on first
+# access (PEP 562) so that ``python -m monitoring_tool`` starts without loading
+# the catalogue or the guide renderers.
+_LAZY_ATTRIBUTES = {
+    "MONITORING_TECHNIQUES": "data",
+    "PRODUCTION_PROBLEMS": "data",
+    "USE_CASES": "data",
+    "KnowledgeBase": "knowledge_base",
+    "build_summary": "guide",
+}
 
 __all__ = [
     "MONITORING_TECHNIQUES",
     "PRODUCTION_PROBLEMS",
     "USE_CASES",
+    "KnowledgeBase",
     "build_summary",
 ]
+
+
+def __getattr__(name: str) -> object:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
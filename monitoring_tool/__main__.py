@@ -4,15 +4,10 @@ from __future__ import annotations
 
 import argparse
 import sys
+import time
 
-from . import MONITORING_TECHNIQUES, PRODUCTION_PROBLEMS, USE_CASES
-from .guide import (
-    build_cli_overview,
-    build_summary,
-    format_problem,
-    format_technique,
-    format_use_case,
-)
+# Command implementations are imported inside the handlers so that ``--help``
+# and ``list`` do not pay for the catalogue dataclasses, the guide or NumPy.
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -26,14 +21,19 @@ def build_parser() -> argparse.ArgumentParser:
 
     subparsers.add_parser("overview", help="Mostra um resumo com técnicas, problemas e casos de uso.")
 
-    subparsers.add_parser(
+    summary_parser = subparsers.add_parser(
         "summary", help="Gera um guia completo em Markdown com todas as informações.")
+    summary_parser.add_argument(
+        "--output",
+        help="Atualiza o guia neste arquivo, reescrevendo apenas as seções alteradas.",
+    )
 
     technique_parser = subparsers.add_parser(
         "technique",
         help="Mostra detalhes de uma técnica de monitoramento específica.",
     )
-    technique_parser.add_argument("name", help="Nome da técnica exatamente como listado.")
+    technique_parser.add_argument(
+        "name", help="Nome da técnica (maiúsculas, acentos e pequenos erros são ignorados).")
 
     problem_parser = subparsers.add_parser(
         "problem", help="Explora sintomas, causas e mitigação de um problema de produção.")
@@ -47,6 +47,152 @@ def build_parser() -> argparse.ArgumentParser:
         help="Lista técnicas, problemas e casos disponíveis para consulta.",
     )
 
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Busca por texto livre em nomes, sinais, sintomas e KPIs (tolera erros de digitação).",
+    )
+    search_parser.add_argument("query", help="Termos da busca.")
+    search_parser.add_argument("--limit", type=int, default=10, help="Número máximo de resultados.")
+
+    compile_parser = subparsers.add_parser(
+        "compile-catalogue",
+        help="Compila catálogos JSON/YAML no formato binário mapeado em memória.",
+    )
+    compile_parser.add_argument("sources", nargs="+", help="Arquivos .json/.yaml, concatenados em ordem.")
+    compile_parser.add_argument(
+        "--output",
+        required=True,
+        help="Arquivo .bin de saída (use-o via MONITORING_TOOL_CATALOGUE).",
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serviço que acompanha logs de previsões e executa os detectores por janela.",
+    )
+    serve_parser.add_argument(
+        "--input", action="append", default=[], dest="inputs", help="Log .jsonl ou .csv a acompanhar (repetível).")
+    serve_parser.add_argument("--socket", help="Socket Unix local que recebe registros JSONL.")
+    serve_parser.add_argument(
+        "--window",
+        action="append",
+        default=[],
+        dest="windows",
+        metavar="TAMANHO[:PASSO]",
+        help="Janela em segundos; com PASSO vira janela deslizante (padrão: 60).",
+    )
+    serve_parser.add_argument("--features", default="", help="Colunas numéricas monitoradas, separadas por vírgula.")
+    serve_parser.add_argument("--prediction-column", default="prediction", help="Coluna com a previsão ou score.")
+    serve_parser.add_argument("--label-column", default="label", help="Coluna com o rótulo observado.")
+    serve_parser.add_argument("--group-column", help="Coluna do grupo sensível para métricas de fairness.")
+    serve_parser.add_argument("--time-column", help="Coluna de tempo do evento (padrão: horário de chegada).")
+    serve_parser.add_argument(
+        "--allowed-lateness", type=float, default=0.0, help="Atraso tolerado no tempo do evento (segundos).")
+    serve_parser.add_argument("--reference", help="CSV/Parquet de referência para o PSI das features.")
+    serve_parser.add_argument("--psi-threshold", type=float, default=0.2, help="PSI acima do qual há alerta.")
+    serve_parser.add_argument("--min-accuracy", type=float, default=None, help="Acurácia mínima por janela.")
+    serve_parser.add_argument("--workers", type=int, default=None, help="Processos de pontuação.")
+    serve_parser.add_argument("--output", help="Arquivo JSONL de relatórios (padrão: saída padrão).")
+    serve_parser.add_argument("--history", help="Diretório do histórico de sinais (séries temporais).")
+    serve_parser.add_argument(
+        "--from-start", action="store_true", help="Lê os logs desde o início em vez de só novas linhas.")
+    serve_parser.add_argument(
+        "--exit-at-eof", action="store_true", help="Encerra ao fim dos arquivos (reprocessamento em lote).")
+    serve_parser.add_argument("--duration", type=float, default=None, help="Encerra após N segundos.")
+    serve_parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Porta local que expõe as métricas internas no formato Prometheus (ex.: 9464).",
+    )
+
+    stats_parser = subparsers.add_parser(
+        "stats", help="Mostra as métricas internas de um serviço iniciado com --metrics-port.")
+    stats_parser.add_argument(
+        "--url", default="http://127.0.0.1:9464/metrics", help="Endereço das métricas do serviço.")
+    stats_parser.add_argument(
+        "--raw", action="store_true", help="Imprime o texto Prometheus em vez do ranking por técnica.")
+
+    history_parser = subparsers.add_parser(
+        "history", help="Consulta o histórico de sinais gravado pelo serviço.")
+    history_parser.add_argument("--store", required=True, help="Diretório do histórico.")
+    history_parser.add_argument("--signal", help="Sinal a consultar (sem ele, lista os sinais).")
+    history_parser.add_argument(
+        "--last", type=float, default=86400.0, help="Intervalo consultado, em segundos até o fim.")
+    history_parser.add_argument("--end", type=float, default=None, help="Fim do intervalo (epoch; padrão: agora).")
+    history_parser.add_argument("--step", type=float, default=None, help="Passo de agregação em segundos.")
+
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="Simula em paralelo combinações de parâmetros do simulador de produção.",
+    )
+    sweep_parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="PARAM=V1,V2,...",
+        help="Valores de um parâmetro para o produto cartesiano (ex.: capacity=80,100,120).",
+    )
+    sweep_parser.add_argument(
+        "--range",
+        action="append",
+        default=[],
+        dest="ranges",
+        metavar="PARAM=MIN:MAX",
+        help="Faixa amostrada por hipercubo latino (ex.: unplannedProbability=5:30).",
+    )
+    sweep_parser.add_argument(
+        "--samples", type=int, default=100, help="Amostras do hipercubo latino por ponto da grade.")
+    sweep_parser.add_argument(
+        "--replications", type=int, default=1000, help="Replicações Monte Carlo por cenário.")
+    sweep_parser.add_argument("--seed", type=int, default=None, help="Semente aleatória.")
+    sweep_parser.add_argument(
+        "--workers", type=int, default=None, help="Processos paralelos (padrão: número de CPUs).")
+    sweep_parser.add_argument("--output", help="Arquivo .csv ou .parquet com um resultado por cenário.")
+
+    events_parser = subparsers.add_parser(
+        "simulate-events",
+        help="Simulação por eventos discretos de várias linhas com equipes de reparo compartilhadas.",
+    )
+    events_parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        dest="assignments",
+        metavar="PARAM=VALOR",
+        help="Parâmetro do simulador (ex.: capacity=120, shiftsPerDay=3); repetível.",
+    )
+    events_parser.add_argument("--lines", type=int, default=1, help="Linhas de produção idênticas.")
+    events_parser.add_argument("--repair-crews", type=int, default=1, help="Equipes de reparo compartilhadas.")
+    events_parser.add_argument("--days", type=int, default=None, help="Dias simulados (padrão: parâmetro days).")
+    events_parser.add_argument(
+        "--mtbf", help="Tempo entre falhas em minutos de operação, TIPO:A[:B] (padrão: da probabilidade por hora).")
+    events_parser.add_argument(
+        "--mttr", help="Tempo de reparo em minutos, TIPO:A[:B] (padrão: uniform:5:25).")
+    events_parser.add_argument("--seed", type=int, default=None, help="Semente aleatória.")
+
+    drift_parser = subparsers.add_parser(
+        "drift-report",
+        help="Compara snapshots CSV/Parquet de referência e produção feature a feature (PSI, KS, Chi-quadrado).",
+    )
+    drift_parser.add_argument("--reference", required=True, help="Snapshot .csv ou .parquet de referência.")
+    drift_parser.add_argument("--current", required=True, help="Snapshot .csv ou .parquet de produção.")
+    drift_parser.add_argument(
+        "--features", default="", help="Features comparadas, separadas por vírgula (padrão: colunas em comum).")
+    drift_parser.add_argument("--psi-threshold", type=float, default=0.2, help="PSI acima do qual há drift.")
+    drift_parser.add_argument("--alpha", type=float, default=0.05, help="Nível de significância do KS e do Chi-quadrado.")
+    drift_parser.add_argument("--min-ks", type=float, default=0.1, help="Distância KS mínima para alerta.")
+    drift_parser.add_argument("--max-js", type=float, default=0.1, help="Divergência JS mínima para alerta do Chi-quadrado.")
+    drift_parser.add_argument("--bins", type=int, default=10, help="Faixas do PSI para features numéricas.")
+    drift_parser.add_argument(
+        "--workers", type=int, default=None, help="Processos paralelos (padrão: número de CPUs).")
+    drift_parser.add_argument(
+        "--chunk-rows", type=int, default=None, help="Linhas lidas por vez (padrão: ajustado ao número de colunas).")
+    drift_parser.add_argument("--seed", type=int, default=0, help="Semente dos sketches.")
+    drift_parser.add_argument(
+        "--format", choices=("markdown", "json"), default=None,
+        help="Formato do relatório (padrão: pela extensão de --output, senão Markdown).")
+    drift_parser.add_argument("--output", help="Arquivo do relatório (padrão: saída padrão).")
+
     return parser
 
 
@@ -54,33 +200,239 @@ def _print(text: str) -> None:
     sys.stdout.write(text + "\n")
 
 
+def _parse_assignment(text: str) -> tuple[str, str]:
+    name, separator, value = text.partition("=")
+    if not separator or not name or not value:
+        raise ValueError(f"Use o formato PARAM=VALOR, recebido '{text}'.")
+    return name, value
+
+
+def _list_catalogue() -> str:
+    from .catalogue import default_catalogue
+
+    sections = default_catalogue().sections
+    lines = [
+        "Técnicas:",
+        *[f"  - {name}" for name in sections["techniques"].names],
+        "",
+        "Problemas:",
+        *[f"  - {name}" for name in sections["problems"].names],
+        "",
+        "Casos de uso:",
+        *[f"  - {name}" for name in sections["use_cases"].names],
+    ]
+    return "\n".join(lines)
+
+
+def _compile_catalogue(args: argparse.Namespace) -> str:
+    from .catalogue import CompiledCatalogue, compile_catalogue
+
+    payload = compile_catalogue(args.sources, args.output)
+    counts = {kind: len(section) for kind, section in CompiledCatalogue(payload).sections.items()}
+    return (
+        f"Catálogo compilado em {args.output} ({len(payload)} bytes): "
+        f"{counts['techniques']} técnicas, {counts['problems']} problemas, {counts['use_cases']} casos de uso."
+    )
+
+
+def _run_guide(args: argparse.Namespace) -> str:
+    from . import guide
+
+    if args.command == "overview":
+        return guide.build_cli_overview()
+    if args.command == "summary" and args.output:
+        changed = guide.write_summary(args.output)
+        if not changed:
+            return f"{args.output} já está atualizado."
+        return f"{len(changed)} seção(ões) atualizada(s) em {args.output}: {', '.join(changed)}"
+    if args.command == "summary":
+        return guide.build_summary()
+    if args.command == "technique":
+        return guide.format_technique(args.name)
+    if args.command == "problem":
+        return guide.format_problem(args.name)
+    if args.command == "use-case":
+        return guide.format_use_case(args.name)
+    return guide.format_search(args.query, args.limit)
+
+
+def _run_service(args: argparse.Namespace) -> None:
+    import asyncio
+
+    from .service import DetectorConfig, MonitoringService, WindowSpec, fit_reference
+    from .timeseries import SignalStore
+
+    features = tuple(name for name in args.features.split(",") if name)
+    reference = fit_reference(args.reference, features) if args.reference and features else None
+    config = DetectorConfig(
+        features=features,
+        prediction_column=args.prediction_column or None,
+        label_column=args.label_column or None,
+        group_column=args.group_column,
+        reference=reference,
+        psi_threshold=args.psi_threshold,
+        min_accuracy=args.min_accuracy,
+    )
+    specs = [WindowSpec.parse(text) for text in args.windows or ["60"]]
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    history = SignalStore(args.history) if args.history else None
+    try:
+        service = MonitoringService(
+            config,
+            specs,
+            inputs=args.inputs,
+            socket_path=args.socket,
+            time_column=args.time_column,
+            allowed_lateness=args.allowed_lateness,
+            workers=args.workers,
+            output=output,
+            from_start=args.from_start,
+            exit_at_eof=args.exit_at_eof,
+            history=history,
+            metrics_port=args.metrics_port,
+        )
+        asyncio.run(service.run(args.duration))
+    finally:
+        if output is not None:
+            output.close()
+        if history is not None:
+            history.close()
+
+
+def _show_history(args: argparse.Namespace) -> str:
+    from datetime import datetime, timezone
+
+    from .timeseries import SignalStore
+
+    store = SignalStore(args.store)
+    if not args.signal:
+        names = store.signals()
+        return "\n".join(names) if names else f"Nenhum sinal em {args.store}."
+    end = args.end if args.end is not None else time.time()
+    series = store.query(args.signal, end - args.last, end, args.step)
+    lines = [
+        f"{args.signal} (resolução {series.resolution or 'bruta'}"
+        f"{'s' if series.resolution else ''}, passo {series.step:g}s)",
+        "início                     n        média       mínimo       máximo",
+    ]
+    for start, count, mean, low, high in zip(
+        series.start, series.count, series.mean, series.minimum, series.maximum
+    ):
+        stamp = datetime.fromtimestamp(start, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        lines.append(f"{stamp}  {count:8d} {mean:12.6g} {low:12.6g} {high:12.6g}")
+    return "\n".join(lines)
+
+
+def _show_stats(args: argparse.Namespace) -> str:
+    from .instrumentation import fetch, format_stats
+
+    text = fetch(args.url)
+    return text.rstrip("\n") if args.raw else format_stats(text)
+
+
+def _run_sweep(args: argparse.Namespace) -> str:
+    from .simulation import ProductionParameters
+    from .sweep import build_scenarios, format_tornado, run_sweep, tornado
+
+    try:
+        grid = {
+            name: [float(value) for value in values.split(",")]
+            for name, values in map(_parse_assignment, args.grid)
+        }
+        ranges = {
+            name: tuple(float(bound) for bound in bounds.split(":", 1))
+            for name, bounds in map(_parse_assignment, args.ranges)
+        }
+    except ValueError as exc:
+        raise ValueError(f"Parâmetros do sweep inválidos: {exc}") from exc
+    if any(len(bounds) != 2 for bounds in ranges.values()):
+        raise ValueError("Faixas devem seguir o formato PARAM=MIN:MAX.")
+
+    scenarios = build_scenarios(ProductionParameters(), grid, ranges, args.samples, args.seed)
+    result = run_sweep(scenarios, args.replications, args.seed, args.workers, args.output)
+    lines = [f"Cenários simulados: {result.n_scenarios}"]
+    if args.output:
+        lines.append(f"Resultados gravados em {args.output}")
+    lines.extend(["", format_tornado(tornado(result, [*grid, *ranges]))])
+    return "\n".join(lines)
+
+
+def _run_discrete_event(args: argparse.Namespace) -> str:
+    from dataclasses import replace
+
+    from .discrete_event import Distribution, format_discrete_event, plant_from_parameters, run_discrete_event
+    from .simulation import ProductionParameters
+    from .sweep import build_scenarios
+
+    try:
+        values = {name: [float(value)] for name, value in map(_parse_assignment, args.assignments)}
+    except ValueError as exc:
+        raise ValueError(f"Parâmetros da simulação inválidos: {exc}") from exc
+    # A one-point grid resolves the app.js names and integer parameters like ``sweep``.
+    (parameters,) = build_scenarios(ProductionParameters(), values)
+    plant = plant_from_parameters(parameters, args.lines, args.repair_crews, args.days)
+    overrides = {}
+    if args.mtbf:
+        overrides["mtbf"] = Distribution.parse(args.mtbf)
+    if args.mttr:
+        overrides["mttr"] = Distribution.parse(args.mttr)
+    if overrides:
+        plant = replace(plant, lines=tuple(replace(line, **overrides) for line in plant.lines))
+    return format_discrete_event(run_discrete_event(plant, args.seed))
+
+
+def _run_drift_report(args: argparse.Namespace) -> str:
+    from pathlib import Path
+
+    from .drift_report import DriftThresholds, build_drift_report
+    from .guide import drift_report_json, format_drift_report
+
+    features = [name for name in args.features.split(",") if name] or None
+    thresholds = DriftThresholds(psi=args.psi_threshold, alpha=args.alpha, min_ks=args.min_ks, max_js=args.max_js)
+    report = build_drift_report(
+        args.reference,
+        args.current,
+        features,
+        thresholds,
+        n_bins=args.bins,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        seed=args.seed,
+    )
+    output_format = args.format or ("json" if args.output and args.output.endswith(".json") else "markdown")
+    text = drift_report_json(report) if output_format == "json" else format_drift_report(report)
+    if not args.output:
+        return text
+    Path(args.output).write_text(text + "\n", encoding="utf-8")
+    return (
+        f"{len(report.drifted)} de {len(report.features)} feature(s) com drift. "
+        f"Relatório gravado em {args.output}"
+    )
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
 
     try:
-        if args.command == "overview":
-            _print(build_cli_overview())
-        elif args.command == "summary":
-            _print(build_summary())
-        elif args.command == "technique":
-            _print(format_technique(args.name))
-        elif args.command == "problem":
-            _print(format_problem(args.name))
-        elif args.command == "use-case":
-            _print(format_use_case(args.name))
-        elif args.command == "list":
-            lines = [
-                "Técnicas:",
-                *[f"  - {technique.name}" for technique in MONITORING_TECHNIQUES],
-                "",
-                "Problemas:",
-                *[f"  - {problem.name}" for problem in PRODUCTION_PROBLEMS],
-                "",
-                "Casos de uso:",
-                *[f"  - {use_case.name}" for use_case in USE_CASES],
-            ]
-            _print("\n".join(lines))
+        if args.command == "list":
+            _print(_list_catalogue())
+        elif args.command == "sweep":
+            _print(_run_sweep(args))
+        elif args.command == "simulate-events":
+            _print(_run_discrete_event(args))
+        elif args.command == "drift-report":
+            _print(_run_drift_report(args))
+        elif args.command == "serve":
+            _run_service(args)
+        elif args.command == "history":
+            _print(_show_history(args))
+        elif args.command == "stats":
+            _print(_show_stats(args))
+        elif args.command == "compile-catalogue":
+            _print(_compile_catalogue(args))
+        elif args.command in {"overview", "summary", "technique", "problem", "use-case", "search"}:
+            _print(_run_guide(args))
         else:
             parser.error("Comando não suportado.")
     except ValueError as exc:  # pragma: no cover - defensive branch
@@ -0,0 +1,175 @@
+"""Online Poisson bootstrap for confidence intervals on monitored metrics."""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+METRICS = ("mean", "accuracy", "rmse", "f1")
+
+# Columns of the per-row statistics matrix that every replicate accumulates.
+_WEIGHT, _VALUE, _CORRECT, _SQUARED_ERROR, _TP, _FP, _FN = range(7)
+_N_STATS = 7
+
+# Poisson(1) CDF, truncated where the remaining tail mass is below 1e-9.
+_POISSON_CDF = np.cumsum([math.exp(-1.0) / math.factorial(k) for k in range(12)]).astype(np.float32)
+
+# Replicate x row cells of Poisson weights drawn at once.
+_WEIGHT_BLOCK = 1 << 22
+# Replicates drawn from one seed. Jobs receive whole blocks, so the weights, and
+# therefore the results, do not depend on ``n_jobs``.
+_REPLICATE_BLOCK = 64
+
+
+def _row_statistics(y_true: np.ndarray, y_pred: Optional[np.ndarray]) -> np.ndarray:
+    stats = np.zeros((y_true.size, _N_STATS), dtype=np.float64)
+    stats[:, _WEIGHT] = 1.0
+    stats[:, _VALUE] = y_true
+    if y_pred is not None:
+        positive_true = y_true == 1
+        positive_pred = y_pred == 1
+        stats[:, _CORRECT] = y_true == y_pred
+        stats[:, _SQUARED_ERROR] = (y_pred - y_true) ** 2
+        stats[:, _TP] = positive_true & positive_pred
+        stats[:, _FP] = ~positive_true & positive_pred
+        stats[:, _FN] = positive_true & ~positive_pred
+    return stats
+
+
+def _poisson_weights(rng: np.random.Generator, shape: Tuple[int, int]) -> np.ndarray:
+    # Inverse-CDF sampling by threshold counting is several times faster than
+    # Generator.poisson for the tiny support of Poisson(1).
+    uniform = rng.random(shape, dtype=np.float32)
+    weights = np.zeros(shape, dtype=np.float32)
+    for threshold in _POISSON_CDF[:-1]:
+        weights += uniform >= threshold
+    return weights
+
+
+def _accumulate(seed: np.random.SeedSequence, n_replicates: int, stats: np.ndarray) -> np.ndarray:
+    """Weighted sums of ``stats`` for ``n_replicates`` Poisson replicates."""
+
+    rng = np.random.default_rng(seed)
+    totals = np.zeros((n_replicates, stats.shape[1]), dtype=np.float64)
+    step = max(_WEIGHT_BLOCK // max(n_replicates, 1), 1)
+    for start in range(0, stats.shape[0], step):
+        chunk = stats[start : start + step]
+        totals += _poisson_weights(rng, (n_replicates, chunk.shape[0])) @ chunk
+    return totals
+
+
+def _accumulate_blocks(blocks: List[Tuple[np.random.SeedSequence, int]], stats: np.ndarray) -> np.ndarray:
+    return np.vstack([_accumulate(seed, size, stats) for seed, size in blocks])
+
+
+def _metrics_from_totals(totals: np.ndarray) -> Dict[str, np.ndarray]:
+    weight = totals[..., _WEIGHT]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision_recall = 2 * totals[..., _TP] + totals[..., _FP] + totals[..., _FN]
+        return {
+            "mean": totals[..., _VALUE] / weight,
+            "accuracy": totals[..., _CORRECT] / weight,
+            "rmse": np.sqrt(totals[..., _SQUARED_ERROR] / weight),
+            "f1": np.where(precision_recall > 0, 2 * totals[..., _TP] / precision_recall, np.nan),
+        }
+
+
+class PoissonBootstrap:
+    """Streaming bootstrap where every row gets an independent Poisson(1) weight.
+
+    Each of the ``n_replicates`` replicates only keeps a handful of weighted sums, so
+    nothing is resampled or copied. A batch updates each block of replicates with a
+    single matrix product; with ``n_jobs > 1`` the blocks are spread across a process
+    pool, and a fixed ``seed`` gives the same replicates whatever ``n_jobs`` is.
+    ``mean`` summarizes ``y_true``; the other metrics need ``y_pred`` and treat ``1``
+    as the positive class for F1.
+    """
+
+    def __init__(self, n_replicates: int = 1000, seed: Optional[int] = None, n_jobs: int = 1) -> None:
+        if n_replicates < 2:
+            raise ValueError("O bootstrap exige pelo menos 2 réplicas.")
+        self.n_replicates = n_replicates
+        self.n_jobs = max(n_jobs, 1)
+        self.totals = np.zeros((n_replicates, _N_STATS), dtype=np.float64)
+        self.exact = np.zeros(_N_STATS, dtype=np.float64)
+        self._seeds = np.random.SeedSequence(seed)
+        starts = range(0, n_replicates, _REPLICATE_BLOCK)
+        self._blocks = [min(_REPLICATE_BLOCK, n_replicates - start) for start in starts]
+        # Block indices handled by each job.
+        self._groups = [group for group in np.array_split(np.arange(len(self._blocks)), self.n_jobs) if group.size]
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "PoissonBootstrap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def update(self, y_true: np.ndarray, y_pred: Optional[np.ndarray] = None) -> None:
+        """Add a batch of observations to every replicate."""
+
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        if y_pred is not None:
+            y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+            if y_pred.shape != y_true.shape:
+                raise ValueError("y_true e y_pred devem ter o mesmo tamanho.")
+        if y_true.size == 0:
+            return
+        stats = _row_statistics(y_true, y_pred)
+        self.exact += stats.sum(axis=0)
+
+        blocks = list(zip(self._seeds.spawn(len(self._blocks)), self._blocks))
+        if len(self._groups) == 1:
+            parts: List[np.ndarray] = [_accumulate_blocks(blocks, stats)]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=len(self._groups))
+            futures = [
+                self._executor.submit(_accumulate_blocks, [blocks[index] for index in group], stats)
+                for group in self._groups
+            ]
+            parts = [future.result() for future in futures]
+        self.totals += np.vstack(parts)
+
+    def merge(self, other: "PoissonBootstrap") -> None:
+        """Add the replicates of a bootstrap run on another shard or window."""
+
+        if other.n_replicates != self.n_replicates:
+            raise ValueError("Bootstraps com números diferentes de réplicas.")
+        self.totals += other.totals
+        self.exact += other.exact
+
+    def _check_metric(self, metric: str) -> None:
+        if metric not in METRICS:
+            raise ValueError(f"Métrica '{metric}' não suportada. Opções: {', '.join(METRICS)}")
+
+    def estimate(self, metric: str) -> float:
+        """Metric computed on the unweighted stream."""
+
+        self._check_metric(metric)
+        return float(_metrics_from_totals(self.exact)[metric])
+
+    def replicates(self, metric: str) -> np.ndarray:
+        """Metric value of every bootstrap replicate."""
+
+        self._check_metric(metric)
+        return _metrics_from_totals(self.totals)[metric]
+
+    def confidence_interval(self, metric: str, level: float = 0.95) -> Tuple[float, float]:
+        """Percentile interval of the metric across replicates."""
+
+        if not 0.0 < level < 1.0:
+            raise ValueError("O nível de confiança deve estar entre 0 e 1.")
+        tail = (1.0 - level) / 2.0
+        low, high = np.nanquantile(self.replicates(metric), [tail, 1.0 - tail])
+        return float(low), float(high)
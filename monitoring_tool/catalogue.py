@@ -0,0 +1,345 @@
+"""Compiled, memory-mapped catalogue of techniques, problems and use cases.
+
+Catalogue sources are JSON (or YAML) documents with ``techniques``, ``problems``
+and ``use_cases`` lists. ``compile_catalogue`` turns them into a binary file made
+of a deduplicated UTF-8 string table and ``uint32`` arrays of string ids, all
+addressed by offsets. Opening the file maps it read-only; an entry is decoded
+only when it is accessed and names can be read without decoding anything else.
+
+Layout (little endian)::
+
+    header      magic, version, string count, source mtime (ns), source size
+    sections    entry count of each kind
+    strings     string count + 1 byte offsets into the string blob
+    entries     per kind, entry count + 1 offsets into the word array
+    words       string ids (and list lengths) of every entry, field by field
+    blob        UTF-8 bytes of every distinct string
+
+The module avoids heavy imports so that the CLI can list names cheaply.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+MAGIC = b"MTCATLG\x00"
+VERSION = 1
+KINDS = ("techniques", "problems", "use_cases")
+
+SOURCE_PATH = Path(__file__).with_name("catalogue.json")
+# Points to a compiled file or to a JSON/YAML source replacing the built-in catalogue.
+CATALOGUE_ENV = "MONITORING_TOOL_CATALOGUE"
+
+_HEADER = struct.Struct("<8sIIqq")
+_STRING, _LIST, _ALGORITHMS = range(3)
+_ALGORITHM_FIELDS = ("name", "summary", "when_to_use")
+
+# Field order and encoding of each kind; ``name`` must come first.
+SCHEMAS: Dict[str, Tuple[Tuple[str, int], ...]] = {
+    "techniques": (
+        ("name", _STRING),
+        ("objective", _STRING),
+        ("description", _STRING),
+        ("monitoring_signals", _LIST),
+        ("algorithms", _ALGORITHMS),
+        ("operational_tips", _LIST),
+        ("related_problems", _LIST),
+    ),
+    "problems": (
+        ("name", _STRING),
+        ("symptoms", _LIST),
+        ("causes", _LIST),
+        ("detection_methods", _LIST),
+        ("mitigation_actions", _LIST),
+    ),
+    "use_cases": (
+        ("name", _STRING),
+        ("context", _STRING),
+        ("risks", _LIST),
+        ("monitoring_focus", _LIST),
+        ("example_kpis", _LIST),
+    ),
+}
+
+
+def load_source(path: Path | str) -> Dict[str, List[Dict[str, Any]]]:
+    """Read a JSON or YAML catalogue source."""
+
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in {".yaml", ".yml"}:
+        try:
+            import yaml
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ValueError("Catálogos em YAML requerem o pacote opcional 'pyyaml'.") from exc
+        document = yaml.safe_load(text)
+    else:
+        import json
+
+        document = json.loads(text)
+    if not isinstance(document, dict):
+        raise ValueError(f"O catálogo '{path}' deve ser um objeto com as chaves {', '.join(KINDS)}.")
+    return {kind: list(document.get(kind) or []) for kind in KINDS}
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.offsets = array("I", [0])
+        self.blob = bytearray()
+
+    def string(self, value: object, where: str) -> int:
+        if not isinstance(value, str):
+            raise ValueError(f"{where}: esperado texto, recebido {type(value).__name__}.")
+        identifier = self.ids.get(value)
+        if identifier is None:
+            identifier = self.ids[value] = len(self.offsets) - 1
+            self.blob += value.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return identifier
+
+    def strings(self, values: object, where: str) -> List[int]:
+        if not isinstance(values, list):
+            raise ValueError(f"{where}: esperada uma lista.")
+        return [self.string(value, where) for value in values]
+
+
+def _encode_entry(encoder: _Encoder, kind: str, position: int, record: Dict[str, Any]) -> List[int]:
+    words: List[int] = []
+    for field, encoding in SCHEMAS[kind]:
+        where = f"{kind}[{position}].{field}"
+        if field not in record:
+            raise ValueError(f"{where}: campo obrigatório ausente.")
+        value = record[field]
+        if encoding == _STRING:
+            words.append(encoder.string(value, where))
+        elif encoding == _LIST:
+            ids = encoder.strings(value, where)
+            words.append(len(ids))
+            words.extend(ids)
+        else:
+            if not isinstance(value, list):
+                raise ValueError(f"{where}: esperada uma lista de algoritmos.")
+            words.append(len(value))
+            for algorithm in value:
+                words.extend(encoder.string(algorithm.get(name), f"{where}.{name}") for name in _ALGORITHM_FIELDS)
+    return words
+
+
+def compile_catalogue(
+    sources: Iterable[Path | str],
+    output: Optional[Path | str] = None,
+) -> bytes:
+    """Compile one or more catalogue sources, concatenated in order.
+
+    The compiled bytes are returned and, when ``output`` is given, written there
+    atomically. With a single source its mtime and size are recorded so that
+    ``open_catalogue`` can tell when the compiled file is stale.
+    """
+
+    sources = [Path(source) for source in sources]
+    if not sources:
+        raise ValueError("Informe pelo menos um arquivo de catálogo.")
+    encoder = _Encoder()
+    words = array("I")
+    entry_offsets: Dict[str, array] = {}
+    for kind in KINDS:
+        offsets = entry_offsets[kind] = array("I", [len(words)])
+        position = 0
+        for source in sources:
+            for record in load_source(source)[kind]:
+                words.extend(_encode_entry(encoder, kind, position, record))
+                offsets.append(len(words))
+                position += 1
+    if len(encoder.blob) >= 1 << 32 or len(words) >= 1 << 32:
+        raise ValueError("Catálogo grande demais para offsets de 32 bits.")
+
+    stamp = sources[0].stat() if len(sources) == 1 else None
+    arrays = [array("I", [len(entry_offsets[kind]) - 1 for kind in KINDS]), encoder.offsets]
+    arrays.extend(entry_offsets[kind] for kind in KINDS)
+    arrays.append(words)
+    if sys.byteorder != "little":  # pragma: no cover - big-endian hosts
+        for values in arrays:
+            values.byteswap()
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(encoder.offsets) - 1,
+        stamp.st_mtime_ns if stamp else 0,
+        stamp.st_size if stamp else 0,
+    )
+    payload = b"".join([header, *(values.tobytes() for values in arrays), bytes(encoder.blob)])
+
+    if output is not None:
+        import tempfile
+
+        output = Path(output)
+        descriptor, temporary = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                handle.write(payload)
+            os.replace(temporary, output)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    return payload
+
+
+class CatalogueSection:
+    """Entries of one kind, decoded on demand from the compiled buffer."""
+
+    __slots__ = ("_catalogue", "kind", "_offsets")
+
+    def __init__(self, catalogue: "CompiledCatalogue", kind: str, offsets: Sequence[int]) -> None:
+        self._catalogue = catalogue
+        self.kind = kind
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def name(self, index: int) -> str:
+        return self._catalogue.string(self._catalogue.words[self._offsets[index]])
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self.name(index) for index in range(len(self)))
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Decode entry ``index`` into a plain dict keyed by field name."""
+
+        words, string = self._catalogue.words, self._catalogue.string
+        cursor = self._offsets[index]
+        record: Dict[str, Any] = {}
+        for field, encoding in SCHEMAS[self.kind]:
+            if encoding == _STRING:
+                record[field] = string(words[cursor])
+                cursor += 1
+                continue
+            count = words[cursor]
+            cursor += 1
+            if encoding == _LIST:
+                record[field] = [string(identifier) for identifier in words[cursor : cursor + count]]
+                cursor += count
+            else:
+                record[field] = [
+                    dict(zip(_ALGORITHM_FIELDS, map(string, words[start : start + 3])))
+                    for start in range(cursor, cursor + 3 * count, 3)
+                ]
+                cursor += 3 * count
+        return record
+
+
+class CompiledCatalogue:
+    """Read-only view over a compiled catalogue held in a buffer or a mapped file."""
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("Arquivo de catálogo compilado truncado.")
+        magic, version, n_strings, self.source_mtime_ns, self.source_size = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Arquivo de catálogo compilado inválido ou de versão incompatível.")
+        self._buffer = buffer
+        cursor = _HEADER.size
+
+        def take(count: int) -> memoryview:
+            nonlocal cursor
+            words = _words(view[cursor : cursor + 4 * count])
+            cursor += 4 * count
+            return words
+
+        counts = take(len(KINDS))
+        self._string_offsets = take(n_strings + 1)
+        section_offsets = [take(count + 1) for count in counts]
+        words_size = max((offsets[-1] for offsets in section_offsets), default=0)
+        self.words = take(words_size)
+        self._blob = view[cursor:]
+        self.sections = {
+            kind: CatalogueSection(self, kind, offsets) for kind, offsets in zip(KINDS, section_offsets)
+        }
+
+    def string(self, identifier: int) -> str:
+        return str(self._blob[self._string_offsets[identifier] : self._string_offsets[identifier + 1]], "utf-8")
+
+    @classmethod
+    def open(cls, path: Path | str) -> "CompiledCatalogue":
+        with open(path, "rb") as handle:
+            return cls(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _words(view: memoryview) -> Sequence[int]:
+    if sys.byteorder == "little":
+        return view.cast("I")
+    swapped = array("I", bytes(view))  # pragma: no cover - big-endian hosts
+    swapped.byteswap()
+    return swapped
+
+
+def _is_current(compiled: Path, source: Path) -> bool:
+    try:
+        with open(compiled, "rb") as handle:
+            header = handle.read(_HEADER.size)
+        magic, version, _, mtime_ns, size = _HEADER.unpack(header)
+    except (OSError, struct.error):
+        return False
+    stamp = source.stat()
+    return magic == MAGIC and version == VERSION and (mtime_ns, size) == (stamp.st_mtime_ns, stamp.st_size)
+
+
+def cache_dir() -> Path:
+    """Per-user directory holding compiled copies of catalogue sources."""
+
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "monitoring_tool"
+
+
+def _compiled_path(source: Path) -> Path:
+    # One cached file per source location, so two catalogues with the same
+    # file name never overwrite each other. This runs on every start, so it uses
+    # zlib rather than hashlib, which takes several milliseconds to import.
+    import zlib
+
+    digest = zlib.crc32(os.fsencode(source.resolve()))
+    return cache_dir() / f"{source.stem}-{digest:08x}.bin"
+
+
+def open_catalogue(path: Optional[Path | str] = None) -> CompiledCatalogue:
+    """Open a catalogue, compiling its source into the user cache when missing or stale.
+
+    ``path`` defaults to ``$MONITORING_TOOL_CATALOGUE`` and then to the built-in
+    ``catalogue.json``. A ``.bin`` path is mapped as is. For a source file the
+    compiled copy lives in ``cache_dir()``, never beside the source (which may be
+    an installed, read-only package); if the cache is not writable, the catalogue
+    is compiled in memory instead.
+    """
+
+    path = Path(path or os.environ.get(CATALOGUE_ENV) or SOURCE_PATH)
+    if path.suffix.lower() == ".bin":
+        return CompiledCatalogue.open(path)
+    compiled = _compiled_path(path)
+    if _is_current(compiled, path):
+        return CompiledCatalogue.open(compiled)
+    try:
+        compiled.parent.mkdir(parents=True, exist_ok=True)
+        compile_catalogue([path], compiled)
+    except OSError:
+        return CompiledCatalogue(compile_catalogue([path]))
+    return CompiledCatalogue.open(compiled)
+
+
+_default: Optional[CompiledCatalogue] = None
+
+
+def default_catalogue() -> CompiledCatalogue:
+    """Catalogue shared by ``data`` and the CLI, opened once per process."""
+
+    global _default
+    if _default is None:
+        _default = open_catalogue()
+    return _default
@@ -0,0 +1,574 @@
+"""Sharded, versioned binary checkpoints of detector state.
+
+Detectors are stored under string keys (e.g. ``"modelo/segmento/feature"``) and
+each key belongs to one shard, chosen by a consistent-hash ring so that changing
+the number of shards only moves a fraction of the keys. A worker process owns a
+:class:`DetectorShard`: it keeps the detectors it touched in memory and
+:meth:`DetectorShard.checkpoint` appends only the changed ones to a new segment
+file, so checkpoints are incremental. Segments are listed in a small manifest,
+replaced atomically, and merged into one once there are too many.
+
+Segment layout (little endian)::
+
+    header      magic, version, entry count, buffer count, pool and index offsets
+    buffers     raw NumPy array bytes, each aligned to 64 bytes
+    pool        UTF-8 keys and JSON metadata of every entry
+    entries     per detector: key hash, key and metadata spans, first buffer, buffer count
+    buffers     per array: offset, byte size, dtype, rank and shape
+
+A detector is encoded as JSON metadata (class, scalars, nesting) plus its arrays,
+which are written straight from their memory. Restoring maps the segment
+copy-on-write: opening costs one read of the entry table, a detector is decoded
+only when first requested, and its arrays are views of the mapping that can be
+updated in place without touching the file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import Executor
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .instrumentation import (
+    CHECKPOINT_SECONDS,
+    CONCEPT_DRIFT,
+    DATA_DRIFT,
+    DATA_QUALITY,
+    FAIRNESS,
+    PERFORMANCE,
+    REGISTRY,
+    SHARD_CHECKPOINT_BYTES,
+    SHARD_DETECTORS,
+    SHARD_RESIDENT_BYTES,
+)
+
+MAGIC = b"MTSTATE\x00"
+VERSION = 1
+MANIFEST = "manifest.json"
+
+_HEADER = struct.Struct("<8sIIQQQQ")
+_ALIGNMENT = 64
+_MAX_RANK = 4
+_ENTRY_DTYPE = np.dtype(
+    [
+        ("hash", "<u8"),
+        ("key_offset", "<u8"),
+        ("key_size", "<u4"),
+        ("meta_size", "<u4"),
+        ("first_buffer", "<u8"),
+        ("buffer_count", "<u4"),
+        ("deleted", "<u4"),
+    ]
+)
+_BUFFER_DTYPE = np.dtype(
+    [("offset", "<u8"), ("size", "<u8"), ("dtype", "S8"), ("rank", "<u8"), ("shape", "<u8", (_MAX_RANK,))]
+)
+
+# Detector classes of each technique of ``MONITORING_TECHNIQUES``, with the helper
+# classes they contain. Only these classes are rebuilt from a checkpoint.
+CHECKPOINT_FAMILIES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    DATA_DRIFT: (
+        ("drift", "PSIReference"),
+        ("drift", "KSDetector"),
+        ("drift", "CategoricalDriftDetector"),
+        ("embedding_drift", "EmbeddingDriftDetector"),
+        ("embedding_drift", "_WindowSummary"),
+        ("sketches", "KLLSketch"),
+        ("sketches", "CountMinSketch"),
+        ("sketches", "TopKCounter"),
+    ),
+    CONCEPT_DRIFT: (("concept_drift", "DDM"), ("concept_drift", "ADWIN")),
+    PERFORMANCE: (
+        ("control_charts", "ControlChartEvaluator"),
+        ("bootstrap", "PoissonBootstrap"),
+        ("performance", "ClassificationMetrics"),
+        ("performance", "RegressionMetrics"),
+    ),
+    DATA_QUALITY: (
+        ("isolation_forest", "IsolationForest"),
+        ("quality", "RuleSet"),
+        ("quality", "NotNull"),
+        ("quality", "InRange"),
+        ("quality", "StatisticBetween"),
+        ("quality", "Unique"),
+        ("quality", "ForeignKey"),
+    ),
+    FAIRNESS: (("fairness", "FairnessMonitor"),),
+}
+
+_registry: Dict[str, type] = {}
+
+
+def _classes() -> Dict[str, type]:
+    if not _registry:
+        import importlib
+
+        for entries in CHECKPOINT_FAMILIES.values():
+            for module, name in entries:
+                cls = getattr(importlib.import_module(f".{module}", __package__), name)
+                _registry[f"{module}.{name}"] = cls
+    return _registry
+
+
+def _class_name(obj: object) -> Optional[str]:
+    cls = type(obj)
+    name = f"{cls.__module__.rpartition('.')[2]}.{cls.__qualname__}"
+    return name if _classes().get(name) is cls else None
+
+
+def _attributes(obj: object) -> Iterator[Tuple[str, Any]]:
+    if is_dataclass(obj):
+        for field in fields(obj):
+            yield field.name, getattr(obj, field.name)
+        return
+    names = list(getattr(obj, "__dict__", {}))
+    for cls in type(obj).__mro__:
+        names.extend(slot for slot in getattr(cls, "__slots__", ()) if hasattr(obj, slot))
+    for name in dict.fromkeys(names):
+        yield name, getattr(obj, name)
+
+
+class _Encoder:
+    """Turn a detector into JSON-compatible metadata plus a list of arrays."""
+
+    def __init__(self) -> None:
+        self.buffers: List[np.ndarray] = []
+
+    def _buffer(self, values: np.ndarray) -> int:
+        if values.dtype.hasobject:
+            raise ValueError("Arrays de objetos não podem ser gravados em um checkpoint.")
+        if values.ndim > _MAX_RANK:
+            raise ValueError(f"Arrays com mais de {_MAX_RANK} dimensões não são suportados.")
+        self.buffers.append(np.ascontiguousarray(values))
+        return len(self.buffers) - 1
+
+    def encode(self, value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return {"@a": self._buffer(value)}
+        if isinstance(value, array):
+            return {"@array": value.typecode, "@a": self._buffer(np.frombuffer(value, dtype=value.typecode))}
+        if isinstance(value, tuple):
+            return {"@t": [self.encode(item) for item in value]}
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, dict):
+            return {"@d": [[self.encode(key), self.encode(item)] for key, item in value.items()]}
+        if isinstance(value, np.random.Generator):
+            return {"@rng": value.bit_generator.state}
+        if isinstance(value, np.random.SeedSequence):
+            return {
+                "@seq": [
+                    self.encode(value.entropy),
+                    list(value.spawn_key),
+                    value.pool_size,
+                    value.n_children_spawned,
+                ]
+            }
+        if isinstance(value, Executor):
+            # Worker pools are recreated on demand after a restore.
+            return None
+        name = _class_name(value)
+        if name is None:
+            raise ValueError(f"Tipo sem suporte a checkpoint: {type(value).__name__}")
+        return {"@o": name, "f": {attribute: self.encode(item) for attribute, item in _attributes(value)}}
+
+
+def _decode(value: Any, buffers: List[np.ndarray]) -> Any:
+    if isinstance(value, list):
+        return [_decode(item, buffers) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "@array" in value:
+        return array(value["@array"], buffers[value["@a"]].tobytes())
+    if "@a" in value:
+        return buffers[value["@a"]]
+    if "@t" in value:
+        return tuple(_decode(item, buffers) for item in value["@t"])
+    if "@d" in value:
+        return {_hashable(_decode(key, buffers)): _decode(item, buffers) for key, item in value["@d"]}
+    if "@rng" in value:
+        state = value["@rng"]
+        generator = np.random.Generator(getattr(np.random, state["bit_generator"])())
+        generator.bit_generator.state = state
+        return generator
+    if "@seq" in value:
+        entropy, spawn_key, pool_size, spawned = value["@seq"]
+        entropy = _decode(entropy, buffers)
+        return np.random.SeedSequence(entropy, spawn_key=spawn_key, pool_size=pool_size, n_children_spawned=spawned)
+    cls = _classes().get(value["@o"])
+    if cls is None:
+        raise ValueError(f"Classe desconhecida no checkpoint: {value['@o']}")
+    obj = cls.__new__(cls)
+    for attribute, item in value["f"].items():
+        # Frozen dataclasses are rebuilt the way their own __init__ does.
+        object.__setattr__(obj, attribute, _decode(item, buffers))
+    return obj
+
+
+def _hashable(key: Any) -> Any:
+    return tuple(_hashable(item) for item in key) if isinstance(key, list) else key
+
+
+def _key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ShardRing:
+    """Consistent-hash ring assigning keys to ``n_shards`` shards.
+
+    Each shard owns ``replicas`` points of the ring; a key belongs to the shard of
+    the first point at or after its hash. Growing from ``n`` to ``n + 1`` shards
+    moves about ``1 / (n + 1)`` of the keys.
+    """
+
+    def __init__(self, n_shards: int, replicas: int = 128) -> None:
+        if n_shards < 1:
+            raise ValueError("É necessário pelo menos 1 shard.")
+        self.n_shards = n_shards
+        points = sorted((_key_hash(f"shard-{shard}#{replica}"), shard) for shard in range(n_shards) for replica in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> int:
+        index = bisect_right(self._hashes, _key_hash(key))
+        return self._owners[index % len(self._owners)]
+
+
+def _align(handle, position: int) -> int:
+    padding = -position % _ALIGNMENT
+    if padding:
+        handle.write(b"\x00" * padding)
+    return position + padding
+
+
+def _write_segment(path: Path, entries: Iterable[Tuple[str, bytes, List[np.ndarray], bool]]) -> int:
+    """Write ``(key, metadata, arrays, deleted)`` entries; returns how many were written."""
+
+    records: List[Tuple[int, bytes, bytes, int, int, bool]] = []
+    buffers: List[Tuple[int, int, bytes, Tuple[int, ...]]] = []
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "wb") as handle:
+        handle.write(b"\x00" * _HEADER.size)
+        position = _HEADER.size
+        for key, meta, arrays, deleted in entries:
+            first = len(buffers)
+            for values in arrays:
+                position = _align(handle, position)
+                data = memoryview(values).cast("B") if values.size else b""
+                handle.write(data)
+                buffers.append((position, values.nbytes, values.dtype.str.encode("ascii"), values.shape))
+                position += values.nbytes
+            encoded = key.encode("utf-8")
+            records.append((_key_hash(key), encoded, meta, first, len(arrays), deleted))
+
+        pool_offset = position
+        table = np.zeros(len(records), dtype=_ENTRY_DTYPE)
+        for index, (hashed, key, meta, first, count, deleted) in enumerate(records):
+            table[index] = (hashed, position - pool_offset, len(key), len(meta), first, count, deleted)
+            handle.write(key)
+            handle.write(meta)
+            position += len(key) + len(meta)
+
+        index_offset = _align(handle, position)
+        table = table[np.argsort(table["hash"], kind="stable")]
+        handle.write(table.tobytes())
+        buffer_table = np.zeros(len(buffers), dtype=_BUFFER_DTYPE)
+        for index, (offset, size, dtype, shape) in enumerate(buffers):
+            buffer_table[index]["offset"] = offset
+            buffer_table[index]["size"] = size
+            buffer_table[index]["dtype"] = dtype
+            buffer_table[index]["rank"] = len(shape)
+            buffer_table[index]["shape"][: len(shape)] = shape
+        handle.write(buffer_table.tobytes())
+
+        handle.seek(0)
+        handle.write(_HEADER.pack(MAGIC, VERSION, 0, len(records), len(buffers), pool_offset, index_offset))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+    return len(records)
+
+
+class _Segment:
+    """A checkpoint file mapped copy-on-write."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, _, n_entries, n_buffers, self._pool, index = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é um checkpoint de detectores.")
+        if version != VERSION:
+            raise ValueError(f"Checkpoint {path} na versão {version}; esta versão lê apenas a {VERSION}.")
+        self.entries = np.frombuffer(self._map, dtype=_ENTRY_DTYPE, count=n_entries, offset=index)
+        self.buffers = np.frombuffer(
+            self._map, dtype=_BUFFER_DTYPE, count=n_buffers, offset=index + n_entries * _ENTRY_DTYPE.itemsize
+        )
+        # Binary search on a strided field of the mapped table is several times slower.
+        self._hashes = np.ascontiguousarray(self.entries["hash"])
+
+    def _key(self, index: int) -> str:
+        _, offset, size, *_ = self.entries[index].tolist()
+        start = self._pool + offset
+        return self._map[start : start + size].decode("utf-8")
+
+    def keys(self) -> Iterator[Tuple[str, bool]]:
+        pool = self._pool
+        for _, offset, size, _, _, _, deleted in self.entries.tolist():
+            yield self._map[pool + offset : pool + offset + size].decode("utf-8"), bool(deleted)
+
+    def find(self, key: str) -> Optional[int]:
+        # A Python int above 2**63 would turn the search into an object comparison.
+        hashed = np.uint64(_key_hash(key))
+        index = int(self._hashes.searchsorted(hashed))
+        while index < self._hashes.size and self._hashes[index] == hashed:
+            if self._key(index) == key:
+                return index
+            index += 1
+        return None
+
+    def deleted(self, index: int) -> bool:
+        return bool(self.entries[index]["deleted"])
+
+    def raw(self, index: int) -> Tuple[bytes, List[np.ndarray]]:
+        """Metadata and zero-copy array views of one entry."""
+
+        _, offset, key_size, meta_size, first, count, _ = self.entries[index].tolist()
+        start = self._pool + offset + key_size
+        meta = self._map[start : start + meta_size]
+        arrays = []
+        for offset, size, dtype, rank, shape in self.buffers[first : first + count].tolist():
+            dtype = np.dtype(dtype.decode("ascii"))
+            values = np.frombuffer(self._map, dtype=dtype, count=size // dtype.itemsize, offset=offset)
+            arrays.append(values.reshape(shape[:rank]))
+        return meta, arrays
+
+
+def encode_detector(detector: object) -> Tuple[bytes, List[np.ndarray]]:
+    """JSON metadata and arrays of a detector, as written to a checkpoint."""
+
+    encoder = _Encoder()
+    meta = json.dumps(encoder.encode(detector), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return meta, encoder.buffers
+
+
+def decode_detector(meta: bytes, arrays: List[np.ndarray]) -> object:
+    """Inverse of :func:`encode_detector`; the arrays are used without copying."""
+
+    return _decode(json.loads(meta), arrays)
+
+
+class DetectorShard:
+    """Detectors of one shard, checkpointed incrementally under ``directory``.
+
+    :meth:`get` returns a detector restored lazily from the newest segment holding
+    it. Detectors updated in place must be flagged with :meth:`put` or
+    :meth:`mark_dirty` to be included in the next :meth:`checkpoint`.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        shard: int = 0,
+        ring: Optional[ShardRing] = None,
+        max_segments: int = 8,
+    ) -> None:
+        self.shard = shard
+        self.ring = ring
+        self.max_segments = max(max_segments, 1)
+        self.path = Path(directory) / f"shard-{shard:04d}"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._live: Dict[str, object] = {}
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        # Array bytes of each loaded detector, as of its last restore or checkpoint.
+        self._sizes: Dict[str, int] = {}
+        manifest = self.path / MANIFEST
+        if manifest.exists():
+            state = json.loads(manifest.read_text(encoding="utf-8"))
+            if state.get("version") != VERSION:
+                raise ValueError(f"Manifesto {manifest} em versão não suportada.")
+            self._next = int(state["next"])
+            self._segments = [_Segment(self.path / name) for name in state["segments"]]
+        else:
+            self._next = 0
+            self._segments = []
+
+    def _check_owner(self, key: str) -> None:
+        if self.ring is not None and self.ring.shard_for(key) != self.shard:
+            raise ValueError(f"A chave '{key}' pertence ao shard {self.ring.shard_for(key)}, não ao {self.shard}.")
+
+    def _locate(self, key: str) -> Optional[Tuple[_Segment, int]]:
+        for segment in reversed(self._segments):
+            index = segment.find(key)
+            if index is not None:
+                return None if segment.deleted(index) else (segment, index)
+        return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._live:
+            return self._live[key]
+        if key in self._deleted:
+            return default
+        found = self._locate(key)
+        if found is None:
+            return default
+        return self._load(key, *found)
+
+    def _load(self, key: str, segment: _Segment, index: int) -> object:
+        meta, arrays = segment.raw(index)
+        detector = self._live[key] = decode_detector(meta, arrays)
+        self._sizes[key] = sum(values.nbytes for values in arrays)
+        return detector
+
+    def restore(self) -> int:
+        """Decode every stored detector now instead of on first access; returns how many."""
+
+        restored = 0
+        seen = set(self._live) | self._deleted
+        for segment in reversed(self._segments):
+            for index, (key, deleted) in enumerate(segment.keys()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                if not deleted:
+                    self._load(key, segment, index)
+                    restored += 1
+        self._report()
+        return restored
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._live or (key not in self._deleted and self._locate(key) is not None)
+
+    def put(self, key: str, detector: object) -> None:
+        self._check_owner(key)
+        self._live[key] = detector
+        self._dirty.add(key)
+        self._deleted.discard(key)
+
+    def mark_dirty(self, key: str) -> None:
+        if key not in self._live:
+            raise KeyError(key)
+        self._dirty.add(key)
+
+    def delete(self, key: str) -> None:
+        self._live.pop(key, None)
+        self._sizes.pop(key, None)
+        self._dirty.discard(key)
+        self._deleted.add(key)
+
+    def keys(self) -> List[str]:
+        known: Dict[str, bool] = {}
+        for segment in reversed(self._segments):
+            for key, deleted in segment.keys():
+                known.setdefault(key, deleted)
+        for key in self._deleted:
+            known[key] = True
+        for key in self._live:
+            known[key] = False
+        return sorted(key for key, deleted in known.items() if not deleted)
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    @property
+    def pending(self) -> int:
+        """Changes not yet written by :meth:`checkpoint`."""
+
+        return len(self._dirty) + len(self._deleted)
+
+    def _entries(self) -> Iterator[Tuple[str, bytes, List[np.ndarray], bool]]:
+        for key in sorted(self._dirty):
+            meta, arrays = encode_detector(self._live[key])
+            self._sizes[key] = sum(values.nbytes for values in arrays)
+            yield key, meta, arrays, False
+        for key in sorted(self._deleted):
+            yield key, b"", [], True
+
+    def _write_manifest(self, names: List[str]) -> None:
+        manifest = self.path / MANIFEST
+        temporary = manifest.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps({"version": VERSION, "shard": self.shard, "next": self._next, "segments": names}),
+            encoding="utf-8",
+        )
+        os.replace(temporary, manifest)
+
+    def _new_segment_path(self) -> Path:
+        path = self.path / f"{self._next:08d}.state"
+        self._next += 1
+        return path
+
+    def checkpoint(self) -> int:
+        """Write the detectors changed since the last checkpoint; returns how many."""
+
+        if not self.pending:
+            return 0
+        started = time.perf_counter()
+        path = self._new_segment_path()
+        written = _write_segment(path, self._entries())
+        self._segments.append(_Segment(path))
+        self._write_manifest([segment.path.name for segment in self._segments])
+        self._dirty.clear()
+        self._deleted.clear()
+        if len(self._segments) > self.max_segments:
+            self.compact()
+        if REGISTRY.enabled:
+            CHECKPOINT_SECONDS.observe(time.perf_counter() - started, str(self.shard))
+            self._report()
+        return written
+
+    def _report(self) -> None:
+        if not REGISTRY.enabled:
+            return
+        shard = str(self.shard)
+        SHARD_DETECTORS.set(len(self._live), shard)
+        SHARD_RESIDENT_BYTES.set(sum(self._sizes.values()), shard)
+        SHARD_CHECKPOINT_BYTES.set(sum(segment.path.stat().st_size for segment in self._segments), shard)
+
+    def compact(self) -> None:
+        """Merge every segment into one holding the newest state of each key.
+
+        Entries are copied as raw bytes, without decoding the detectors.
+        """
+
+        self.checkpoint()
+        if len(self._segments) <= 1:
+            return
+
+        def entries() -> Iterator[Tuple[str, bytes, List[np.ndarray], bool]]:
+            seen: Set[str] = set()
+            for segment in reversed(self._segments):
+                for index, (key, deleted) in enumerate(segment.keys()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if not deleted:
+                        meta, arrays = segment.raw(index)
+                        yield key, bytes(meta), arrays, False
+
+        old = self._segments
+        path = self._new_segment_path()
+        _write_segment(path, entries())
+        self._segments = [_Segment(path)]
+        self._write_manifest([path.name])
+        # Detectors already restored keep viewing the old mappings, which stay valid
+        # after the files are unlinked.
+        for segment in old:
+            segment.path.unlink(missing_ok=True)
@@ -0,0 +1,237 @@
+"""Online concept drift detectors fed with streams of prediction errors."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import List
+
+import numpy as np
+
+from .instrumentation import CONCEPT_DRIFT, timed
+
+
+class DDM:
+    """Drift Detection Method (Gama et al., 2004) over a stream of 0/1 errors.
+
+    A whole batch is evaluated with cumulative sums and running minima; Python only
+    loops when a drift resets the statistics in the middle of the batch.
+    """
+
+    __slots__ = (
+        "min_instances",
+        "warning_level",
+        "drift_level",
+        "n",
+        "errors",
+        "p_min",
+        "s_min",
+        "warning",
+    )
+
+    def __init__(self, min_instances: int = 30, warning_level: float = 2.0, drift_level: float = 3.0) -> None:
+        self.min_instances = min_instances
+        self.warning_level = warning_level
+        self.drift_level = drift_level
+        self.reset()
+
+    def reset(self) -> None:
+        self.n = 0
+        self.errors = 0.0
+        self.p_min = math.inf
+        self.s_min = math.inf
+        self.warning = False
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.n if self.n else 0.0
+
+    def update_batch(self, errors: np.ndarray) -> np.ndarray:
+        """Consume a batch of errors and return the positions where drift fired."""
+
+        errors = np.asarray(errors, dtype=np.float64).ravel()
+        drifts: List[int] = []
+        offset = 0
+        while offset < errors.size:
+            fired = self._scan(errors[offset:])
+            if fired < 0:
+                break
+            drifts.append(offset + fired)
+            self.reset()
+            offset += fired + 1
+        return np.asarray(drifts, dtype=np.int64)
+
+    def _scan(self, errors: np.ndarray) -> int:
+        n = self.n + np.arange(1, errors.size + 1, dtype=np.float64)
+        p = (self.errors + np.cumsum(errors)) / n
+        s = np.sqrt(p * (1.0 - p) / n)
+        ps = np.where(n >= self.min_instances, p + s, math.inf)
+
+        # Running minimum of p + s, seeded with the state carried from earlier batches.
+        best_before = np.minimum.accumulate(np.concatenate(([self.p_min + self.s_min], ps)))[:-1]
+        improves = np.isfinite(ps) & (ps <= best_before)
+        last = np.maximum.accumulate(np.where(improves, np.arange(errors.size), -1))
+        p_min = np.where(last >= 0, p[np.maximum(last, 0)], self.p_min)
+        s_min = np.where(last >= 0, s[np.maximum(last, 0)], self.s_min)
+
+        with np.errstate(invalid="ignore"):
+            drift = np.isfinite(ps) & (ps > p_min + self.drift_level * s_min)
+            warning = np.isfinite(ps) & (ps > p_min + self.warning_level * s_min)
+        hits = np.flatnonzero(drift)
+        stop = int(hits[0]) if hits.size else errors.size - 1
+
+        self.n = int(n[stop])
+        self.errors = float(p[stop] * n[stop])
+        self.p_min = float(p_min[stop])
+        self.s_min = float(s_min[stop])
+        self.warning = bool(warning[stop])
+        return int(hits[0]) if hits.size else -1
+
+
+class ADWIN:
+    """ADaptive WINdowing (Bifet and Gavaldà, 2007) with an exponential histogram.
+
+    Level ``h`` holds at most ``max_buckets`` buckets summarizing ``2**h`` values each,
+    stored oldest first in ``array('d')`` columns. Memory and the cost of a cut check
+    therefore grow with ``log(width)`` rather than with the window itself.
+    """
+
+    __slots__ = (
+        "delta",
+        "clock",
+        "max_buckets",
+        "min_window_length",
+        "grace_period",
+        "width",
+        "total",
+        "variance",
+        "_ticks",
+        "_totals",
+        "_variances",
+    )
+
+    def __init__(
+        self,
+        delta: float = 0.002,
+        clock: int = 32,
+        max_buckets: int = 5,
+        min_window_length: int = 5,
+        grace_period: int = 10,
+    ) -> None:
+        self.delta = delta
+        self.clock = clock
+        self.max_buckets = max_buckets
+        self.min_window_length = min_window_length
+        self.grace_period = grace_period
+        self.width = 0
+        self.total = 0.0
+        self.variance = 0.0
+        self._ticks = 0
+        self._totals: List[array] = [array("d")]
+        self._variances: List[array] = [array("d")]
+
+    @property
+    def estimation(self) -> float:
+        return self.total / self.width if self.width else 0.0
+
+    @property
+    def n_buckets(self) -> int:
+        return sum(len(level) for level in self._totals)
+
+    def update(self, value: float) -> bool:
+        """Add one value and report whether the window was cut."""
+
+        self._insert(float(value))
+        self._ticks += 1
+        if self._ticks % self.clock or self.width <= self.grace_period:
+            return False
+        return self._detect_change()
+
+    def update_batch(self, errors: np.ndarray) -> np.ndarray:
+        """Consume a batch of values and return the positions where drift fired.
+
+        Unlike :meth:`DDM.update_batch` this is not vectorized: each value still goes
+        through :meth:`update` in a Python loop, because the bucket merges and cut
+        checks depend on every earlier value. Expect a few hundred thousand values
+        per second, over an order of magnitude below DDM. Reach for DDM or per-batch
+        error rates on high-volume streams.
+        """
+
+        update = self.update
+        values = np.asarray(errors, dtype=np.float64).ravel().tolist()
+        with timed(CONCEPT_DRIFT, "ADWIN", len(values)):
+            return np.asarray([index for index, value in enumerate(values) if update(value)], dtype=np.int64)
+
+    def _insert(self, value: float) -> None:
+        self.width += 1
+        if self.width > 1:
+            mean = self.total / (self.width - 1)
+            self.variance += (self.width - 1) * (value - mean) ** 2 / self.width
+        self.total += value
+        self._totals[0].append(value)
+        self._variances[0].append(0.0)
+        self._compress()
+
+    def _compress(self) -> None:
+        for level, totals in enumerate(self._totals):
+            if len(totals) <= self.max_buckets:
+                return
+            variances = self._variances[level]
+            size = 1 << level
+            total = totals[0] + totals[1]
+            gap = totals[0] / size - totals[1] / size
+            variance = variances[0] + variances[1] + size * size * gap * gap / (2 * size)
+            del totals[:2]
+            del variances[:2]
+            if level + 1 == len(self._totals):
+                self._totals.append(array("d"))
+                self._variances.append(array("d"))
+            self._totals[level + 1].append(total)
+            self._variances[level + 1].append(variance)
+
+    def _delete_oldest(self) -> None:
+        level = max(h for h, totals in enumerate(self._totals) if totals)
+        size = 1 << level
+        bucket_total = self._totals[level].pop(0)
+        bucket_variance = self._variances[level].pop(0)
+        self.width -= size
+        self.total -= bucket_total
+        if self.width:
+            gap = bucket_total / size - self.total / self.width
+            self.variance -= bucket_variance + size * self.width * gap * gap / (size + self.width)
+        else:
+            self.variance = 0.0
+        while len(self._totals) > 1 and not self._totals[-1]:
+            self._totals.pop()
+            self._variances.pop()
+
+    def _cut(self, n0: int, n1: int, gap: float) -> bool:
+        log_term = math.log(2.0 * math.log(self.width) / self.delta)
+        variance = self.variance / self.width
+        m = 1.0 / (n0 - self.min_window_length + 1) + 1.0 / (n1 - self.min_window_length + 1)
+        epsilon = math.sqrt(2.0 * m * variance * log_term) + 2.0 / 3.0 * log_term * m
+        return gap > epsilon
+
+    def _detect_change(self) -> bool:
+        changed = False
+        shrinking = True
+        while shrinking and self.width > 1:
+            shrinking = False
+            n0, u0 = 0, 0.0
+            # Walk split points from the oldest bucket towards the newest one.
+            for level in range(len(self._totals) - 1, -1, -1):
+                size = 1 << level
+                for bucket_total in self._totals[level]:
+                    n0 += size
+                    u0 += bucket_total
+                    n1 = self.width - n0
+                    if n1 <= 0:
+                        break
+                    if n0 >= self.min_window_length and n1 >= self.min_window_length:
+                        if self._cut(n0, n1, abs(u0 / n0 - (self.total - u0) / n1)):
+                            self._delete_oldest()
+                            changed = shrinking = True
+                            break
+                if shrinking:
+                    break
+        return changed
@@ -0,0 +1,148 @@
+"""Shewhart and CUSUM control charts evaluated over many metric series at once."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ControlChartResult:
+    """Per-point outcome of one evaluation over a ``(series, time)`` matrix."""
+
+    shewhart_upper: np.ndarray
+    shewhart_lower: np.ndarray
+    cusum_upper: np.ndarray
+    cusum_lower: np.ndarray
+    cusum_alarm: np.ndarray
+
+    @property
+    def out_of_control(self) -> np.ndarray:
+        """Points flagged by either chart."""
+
+        return self.shewhart_upper | self.shewhart_lower | self.cusum_alarm
+
+    def alarmed_series(self) -> np.ndarray:
+        """Indices of the series with at least one flagged point."""
+
+        return np.flatnonzero(self.out_of_control.any(axis=1))
+
+
+def _lindley(steps: np.ndarray, start: np.ndarray) -> np.ndarray:
+    # S_t = max(0, S_{t-1} + d_t) has the closed form C_t - min(-S_0, min_{j<=t} C_j),
+    # which turns the recursion into a cumulative sum and a running minimum.
+    cumulative = np.cumsum(steps, axis=1)
+    floor = np.minimum(np.minimum.accumulate(cumulative, axis=1), -start[:, None])
+    return cumulative - floor
+
+
+class ControlChartEvaluator:
+    """Two-sided tabular CUSUM and Shewhart limits for a bank of metric series.
+
+    Values are standardized with each series' in-control mean and standard deviation.
+    CUSUM accumulators are kept between calls, so every tick only processes the new
+    columns. With ``reset_on_alarm`` an accumulator restarts from zero after it fires.
+    """
+
+    def __init__(
+        self,
+        center: np.ndarray,
+        sigma: np.ndarray,
+        k: float = 0.5,
+        h: float = 5.0,
+        shewhart_limit: float = 3.0,
+        reset_on_alarm: bool = True,
+        series_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.center = np.asarray(center, dtype=np.float64).ravel()
+        self.sigma = np.asarray(sigma, dtype=np.float64).ravel()
+        if self.center.shape != self.sigma.shape:
+            raise ValueError("Média e desvio padrão devem ter o mesmo número de séries.")
+        if np.any(self.sigma <= 0):
+            raise ValueError("O desvio padrão de cada série deve ser positivo.")
+        if series_names is not None and len(series_names) != self.center.size:
+            raise ValueError("A quantidade de nomes difere da quantidade de séries.")
+        self.k = k
+        self.h = h
+        self.shewhart_limit = shewhart_limit
+        self.reset_on_alarm = reset_on_alarm
+        self.series_names: Optional[Tuple[str, ...]] = tuple(series_names) if series_names is not None else None
+        self.upper = np.zeros(self.center.size, dtype=np.float64)
+        self.lower = np.zeros(self.center.size, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, baseline: np.ndarray, **kwargs) -> "ControlChartEvaluator":
+        """Estimate in-control limits from a ``(series, time)`` baseline matrix."""
+
+        baseline = np.asarray(baseline, dtype=np.float64)
+        if baseline.ndim != 2:
+            raise ValueError("A linha de base deve ser uma matriz (séries x tempo).")
+        sigma = np.nanstd(baseline, axis=1, ddof=1)
+        # Flat series would produce infinite z-scores; give them a tiny spread instead.
+        sigma = np.where(np.isfinite(sigma) & (sigma > 0), sigma, np.finfo(np.float64).eps)
+        return cls(np.nanmean(baseline, axis=1), sigma, **kwargs)
+
+    @property
+    def n_series(self) -> int:
+        return self.center.size
+
+    def reset(self) -> None:
+        """Zero every CUSUM accumulator."""
+
+        self.upper[:] = 0.0
+        self.lower[:] = 0.0
+
+    def update(self, values: np.ndarray) -> ControlChartResult:
+        """Evaluate new points, a ``(series, time)`` matrix, against both charts."""
+
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        if values.ndim != 2 or values.shape[0] != self.n_series:
+            raise ValueError(f"Esperada matriz com {self.n_series} séries nas linhas.")
+
+        z = (values - self.center[:, None]) / self.sigma[:, None]
+        missing = np.isnan(z)
+        z = np.where(missing, 0.0, z)
+
+        upper = _lindley(np.where(missing, 0.0, z - self.k), self.upper)
+        lower = _lindley(np.where(missing, 0.0, -z - self.k), self.lower)
+        if self.reset_on_alarm:
+            self._restart_after_alarms(z, missing, upper, lower)
+
+        alarm = (upper > self.h) | (lower > self.h)
+        if values.shape[1]:
+            restart = alarm[:, -1] if self.reset_on_alarm else np.zeros(self.n_series, dtype=bool)
+            self.upper = np.where(restart, 0.0, upper[:, -1])
+            self.lower = np.where(restart, 0.0, lower[:, -1])
+        return ControlChartResult(
+            shewhart_upper=z > self.shewhart_limit,
+            shewhart_lower=z < -self.shewhart_limit,
+            cusum_upper=upper,
+            cusum_lower=lower,
+            cusum_alarm=alarm,
+        )
+
+    def _restart_after_alarms(
+        self, z: np.ndarray, missing: np.ndarray, upper: np.ndarray, lower: np.ndarray
+    ) -> None:
+        # Series that fired are recomputed from zero after their first alarm, all at
+        # once. The loop runs once per successive alarm, not once per time step.
+        columns = np.arange(z.shape[1])[None, :]
+        searched_from = np.zeros(self.n_series, dtype=np.int64)
+        while True:
+            alarm = ((upper > self.h) | (lower > self.h)) & (columns >= searched_from[:, None])
+            rows = np.flatnonzero(alarm.any(axis=1))
+            if rows.size == 0:
+                return
+            first = alarm[rows].argmax(axis=1)
+            tail = (columns > first[:, None]) & ~missing[rows]
+            zero = np.zeros(rows.size)
+            new_upper = _lindley(np.where(tail, z[rows] - self.k, 0.0), zero)
+            new_lower = _lindley(np.where(tail, -z[rows] - self.k, 0.0), zero)
+            after = columns > first[:, None]
+            upper[rows] = np.where(after, new_upper, upper[rows])
+            lower[rows] = np.where(after, new_lower, lower[rows])
+            searched_from[rows] = first + 1
@@ -0,0 +1,468 @@
+"""Chunked, parallel drift report comparing two large CSV/Parquet snapshots.
+
+The parent process parses each file once, chunk by chunk, and sends the columns
+of every feature group to the worker process that owns the group, so no table is
+ever held in memory: numeric features are summarized by KLL sketches (KS test and
+the PSI bin edges) plus exact counts of the current values per reference bin, and
+categorical features by top-k counters (chi-square and PSI over the levels).
+
+A feature is numeric when the first reference chunk parses it as numbers. A CSV
+column that turns out to hold text further down (in either file) is treated as
+categorical: the report is restarted with that column declared as text.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .drift import (
+    CategoricalDriftDetector,
+    KSDetector,
+    PSIReference,
+    _jensen_shannon,
+    chi_square_homogeneity,
+    count_bins,
+    population_stability_index,
+)
+from .instrumentation import REGISTRY
+from .tables import (
+    DEFAULT_CHUNK_ROWS,
+    NUMERIC as NUMERIC_DTYPE,
+    TEXT as TEXT_DTYPE,
+    Chunk,
+    SchemaError,
+    iter_table_chunks,
+    null_mask,
+    table_columns,
+)
+
+# Production problem attached to every drifted feature of the report.
+DRIFT_PROBLEM = "Drift de dados"
+
+NUMERIC = "numérica"
+CATEGORICAL = "categórica"
+
+DEFAULT_BINS = 10
+# Cells the parent buffers per chunk; wide files are read fewer rows at a time.
+_CELL_BUDGET = 2_000_000
+_MIN_CHUNK_ROWS = 1_000
+# Chunks queued for each worker before the parent waits for it to catch up.
+_QUEUED_CHUNKS = 2
+# Seconds between liveness checks while waiting on a worker.
+_POLL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class DriftThresholds:
+    """When each test flags a feature.
+
+    Snapshots of millions of rows make almost any gap significant, so KS and
+    chi-square also require a minimum effect size (KS distance, JS divergence).
+    """
+
+    psi: float = 0.2
+    alpha: float = 0.05
+    min_ks: float = 0.1
+    max_js: float = 0.1
+
+
+@dataclass(frozen=True)
+class FeatureDrift:
+    """PSI, KS (numeric features only) and chi-square results for one feature."""
+
+    name: str
+    kind: str
+    n_reference: int
+    n_current: int
+    missing_reference: int
+    missing_current: int
+    psi: float
+    chi2_statistic: float
+    chi2_p_value: float
+    js_divergence: float
+    ks_statistic: Optional[float] = None
+    ks_p_value: Optional[float] = None
+    alerts: Tuple[str, ...] = ()
+
+    @property
+    def drifted(self) -> bool:
+        return bool(self.alerts)
+
+
+@dataclass(frozen=True)
+class DriftReport:
+    """Per-feature comparison of a current snapshot against the reference."""
+
+    reference: str
+    current: str
+    reference_rows: int
+    current_rows: int
+    thresholds: DriftThresholds
+    features: Tuple[FeatureDrift, ...]
+
+    @property
+    def drifted(self) -> Tuple[FeatureDrift, ...]:
+        return tuple(feature for feature in self.features if feature.drifted)
+
+
+@dataclass(frozen=True)
+class _FeatureGroup:
+    numeric: Tuple[str, ...]
+    categorical: Tuple[str, ...]
+    n_bins: int
+    sketch_k: int
+    seed: int
+    thresholds: DriftThresholds
+
+
+def _numeric_column(values: np.ndarray, name: str) -> np.ndarray:
+    if values.dtype.kind in "iuf":
+        return values.astype(np.float64, copy=False)
+    # A CSV chunk where the column is entirely empty is still numeric.
+    if null_mask(values).all():
+        return np.full(values.shape, np.nan)
+    raise ValueError(f"A coluna '{name}' mistura valores numéricos e texto.")
+
+
+def _categorical_column(values: np.ndarray, name: str) -> np.ndarray:
+    if values.dtype.kind == "f":
+        if not np.isnan(values).all():
+            raise ValueError(f"A coluna '{name}' mistura valores numéricos e texto.")
+        return np.full(values.shape, None, dtype=object)
+    return values
+
+
+class _GroupSummary:
+    """Streaming summaries of one group of features over both snapshots."""
+
+    def __init__(self, group: _FeatureGroup) -> None:
+        self.group = group
+        self.features = group.numeric + group.categorical
+        self.numeric = list(group.numeric)
+        self.categorical = list(group.categorical)
+        self.ks = KSDetector(len(self.numeric), group.sketch_k, group.seed, self.numeric)
+        self.counters = CategoricalDriftDetector(len(self.categorical), seed=group.seed, feature_names=self.categorical)
+        self.rows = {"reference": 0, "current": 0}
+        self.missing = {side: dict.fromkeys(self.features, 0) for side in self.rows}
+        self.edges: Optional[np.ndarray] = None
+        self.current_bins = np.zeros((len(self.numeric), group.n_bins), dtype=np.int64)
+
+    def ingest(self, side: str, chunk: Chunk) -> None:
+        """Add the group's columns of one chunk; the reference comes first."""
+
+        if side == "current" and self.edges is None:
+            self.freeze_reference()
+        rows = len(next(iter(chunk.values()))) if chunk else 0
+        if rows == 0:
+            return
+        self.rows[side] += rows
+        missing = self.missing[side]
+        for name in self.features:
+            missing[name] += int(null_mask(chunk[name]).sum())
+        if self.numeric:
+            matrix = np.column_stack([_numeric_column(chunk[name], name) for name in self.numeric])
+            if side == "reference":
+                self.ks.update_reference(matrix)
+            else:
+                self.ks.update(matrix)
+                self.current_bins += count_bins(matrix, self.edges)
+        if self.categorical:
+            matrix = np.column_stack([_categorical_column(chunk[name], name) for name in self.categorical])
+            if side == "reference":
+                self.counters.update_reference(matrix)
+            else:
+                self.counters.update(matrix)
+
+    def freeze_reference(self) -> None:
+        """Place the PSI bin edges at the reference quantiles."""
+
+        probabilities = np.linspace(0.0, 1.0, self.group.n_bins + 1)[1:-1]
+        self.edges = np.array(
+            [
+                sketch.quantile(probabilities) if sketch.count else np.full(probabilities.size, np.inf)
+                for sketch in self.ks.reference
+            ],
+            dtype=np.float64,
+        ).reshape(len(self.numeric), probabilities.size)
+
+    def _reference_bins(self) -> np.ndarray:
+        # The reference is read once, so its bin counts come from its sketch's CDF.
+        counts = np.zeros(self.current_bins.shape, dtype=np.float64)
+        for index, (sketch, edges) in enumerate(zip(self.ks.reference, self.edges)):
+            cumulative = np.concatenate(([0.0], sketch.cdf(edges) * sketch.count, [sketch.count]))
+            counts[index] = np.diff(cumulative)
+        return counts
+
+    def results(self) -> List[FeatureDrift]:
+        if self.edges is None:
+            self.freeze_reference()
+        thresholds = self.group.thresholds
+        results: List[FeatureDrift] = []
+        if self.numeric:
+            reference_bins = self._reference_bins()
+            psi = PSIReference.from_counts(self.edges, reference_bins, self.numeric).score_counts(self.current_bins)
+            ks = self.ks.test()
+            ks_drifted = ks.drifted(thresholds.alpha, thresholds.min_ks)
+            for index, name in enumerate(self.numeric):
+                statistic, p_value = chi_square_homogeneity(reference_bins[index], self.current_bins[index])
+                js = _jensen_shannon(reference_bins[index], self.current_bins[index].astype(np.float64))
+                alerts = []
+                if psi[index] > thresholds.psi:
+                    alerts.append("PSI")
+                if ks_drifted[index]:
+                    alerts.append("KS")
+                if p_value < thresholds.alpha and js > thresholds.max_js:
+                    alerts.append("Chi-quadrado")
+                results.append(
+                    self._feature(name, NUMERIC, float(psi[index]), statistic, p_value, js, alerts,
+                                  float(ks.statistic[index]), float(ks.p_value[index]))
+                )
+        for name, result in zip(self.categorical, self.counters.test()):
+            expected = result.reference_counts / max(result.reference_counts.sum(), 1)
+            observed = result.current_counts / max(result.current_counts.sum(), 1)
+            psi_value = float(population_stability_index(expected, observed))
+            alerts = []
+            if psi_value > thresholds.psi:
+                alerts.append("PSI")
+            if result.drifted(thresholds.alpha, thresholds.max_js):
+                alerts.append("Chi-quadrado")
+            results.append(
+                self._feature(name, CATEGORICAL, psi_value, result.statistic, result.p_value,
+                              result.js_divergence, alerts)
+            )
+        return results
+
+    def _feature(
+        self,
+        name: str,
+        kind: str,
+        psi: float,
+        chi2_statistic: float,
+        chi2_p_value: float,
+        js_divergence: float,
+        alerts: List[str],
+        ks_statistic: Optional[float] = None,
+        ks_p_value: Optional[float] = None,
+    ) -> FeatureDrift:
+        return FeatureDrift(
+            name=name,
+            kind=kind,
+            n_reference=self.rows["reference"] - self.missing["reference"][name],
+            n_current=self.rows["current"] - self.missing["current"][name],
+            missing_reference=self.missing["reference"][name],
+            missing_current=self.missing["current"][name],
+            psi=psi,
+            chi2_statistic=float(chi2_statistic),
+            chi2_p_value=float(chi2_p_value),
+            js_divergence=float(js_divergence),
+            ks_statistic=ks_statistic,
+            ks_p_value=ks_p_value,
+            alerts=tuple(alerts),
+        )
+
+
+def _serve_group(group: _FeatureGroup, inbox: "multiprocessing.Queue", outbox: "multiprocessing.Queue") -> None:
+    # Worker loop: ingest (side, chunk) messages until None, then send the results
+    # with the detector metrics recorded here. Forked workers inherit the parent's
+    # samples, which are dropped so that they are not counted twice.
+    REGISTRY.drain()
+    summary = _GroupSummary(group)
+    failure: Optional[BaseException] = None
+    for side, chunk in iter(inbox.get, None):
+        if failure is None:
+            try:
+                summary.ingest(side, chunk)
+            except Exception as error:  # keep draining so that the parent never blocks
+                failure = error
+    if failure is None:
+        try:
+            outbox.put((summary.results(), REGISTRY.drain() if REGISTRY.enabled else None))
+            return
+        except Exception as error:
+            failure = error
+    outbox.put(failure)
+
+
+class _GroupWorker:
+    """Parent-side handle on the process summarizing one feature group."""
+
+    def __init__(self, group: _FeatureGroup, context: multiprocessing.context.BaseContext) -> None:
+        self._inbox = context.Queue(maxsize=_QUEUED_CHUNKS)
+        self._outbox = context.Queue()
+        self._process = context.Process(target=_serve_group, args=(group, self._inbox, self._outbox), daemon=True)
+        self._process.start()
+
+    def _check_alive(self) -> None:
+        if not self._process.is_alive():
+            raise RuntimeError(f"Um processo do relatório de drift terminou (código {self._process.exitcode}).")
+
+    def ingest(self, side: str, chunk: Chunk) -> None:
+        while True:
+            try:
+                self._inbox.put((side, chunk), timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                self._check_alive()
+
+    def results(self) -> List[FeatureDrift]:
+        self._inbox.put(None)
+        while True:
+            try:
+                result = self._outbox.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                self._check_alive()
+        if isinstance(result, BaseException):
+            raise result
+        features, metrics = result
+        if metrics:
+            REGISTRY.merge(metrics)
+        return features
+
+    def close(self) -> None:
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+
+
+_Sink = Union[_GroupSummary, _GroupWorker]
+
+
+def _chunk_rows(chunk: Chunk) -> int:
+    return len(next(iter(chunk.values()))) if chunk else 0
+
+
+def _profile(
+    reference: Path | str,
+    current: Path | str,
+    features: Sequence[str],
+    text_columns: Set[str],
+    workers: int,
+    chunk_rows: int,
+    n_bins: int,
+    sketch_k: int,
+    seed: int,
+    thresholds: DriftThresholds,
+) -> Tuple[int, int, List[FeatureDrift]]:
+    reference_dtypes = {name: TEXT_DTYPE for name in text_columns}
+    chunks: Iterator[Chunk] = iter_table_chunks(reference, chunk_rows, features, reference_dtypes)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError(f"O arquivo de referência {reference} está vazio.")
+    # Column types follow the first reference chunk; the current file is read with them.
+    numeric = {name for name in features if first[name].dtype.kind in "iuf"}
+    current_dtypes = {name: NUMERIC_DTYPE if name in numeric else TEXT_DTYPE for name in features}
+
+    seeds = np.random.SeedSequence(seed).generate_state(workers)
+    groups = []
+    for index in range(workers):
+        names = features[index::workers]
+        groups.append(
+            _FeatureGroup(
+                tuple(name for name in names if name in numeric),
+                tuple(name for name in names if name not in numeric),
+                n_bins,
+                sketch_k,
+                int(seeds[index]),
+                thresholds,
+            )
+        )
+
+    sinks: List[_Sink] = []
+    try:
+        if workers == 1:
+            sinks.append(_GroupSummary(groups[0]))
+        else:
+            context = multiprocessing.get_context()
+            sinks.extend(_GroupWorker(group, context) for group in groups)
+
+        def send(side: str, chunk: Chunk) -> int:
+            for name in numeric:
+                # Empty in the first chunk, the column was only typed when it filled up.
+                if chunk[name].dtype.kind not in "iuf":
+                    raise SchemaError(name, f"A coluna '{name}' foi lida como numérica, mas contém texto.")
+            for sink, group in zip(sinks, groups):
+                sink.ingest(side, {name: chunk[name] for name in group.numeric + group.categorical})
+            return _chunk_rows(chunk)
+
+        reference_rows = send("reference", first)
+        for chunk in chunks:
+            reference_rows += send("reference", chunk)
+        current_rows = 0
+        for chunk in iter_table_chunks(current, chunk_rows, features, current_dtypes):
+            current_rows += send("current", chunk)
+        results = [feature for sink in sinks for feature in sink.results()]
+    finally:
+        for sink in sinks:
+            if isinstance(sink, _GroupWorker):
+                sink.close()
+    return reference_rows, current_rows, results
+
+
+def build_drift_report(
+    reference: Path | str,
+    current: Path | str,
+    features: Optional[Sequence[str]] = None,
+    thresholds: DriftThresholds = DriftThresholds(),
+    n_bins: int = DEFAULT_BINS,
+    workers: Optional[int] = None,
+    chunk_rows: Optional[int] = None,
+    sketch_k: int = 1024,
+    seed: int = 0,
+) -> DriftReport:
+    """Compare every feature of ``current`` against ``reference``, streaming both.
+
+    ``features`` defaults to the columns present in both files. Each file is parsed
+    once, ``chunk_rows`` rows at a time (default: sized so a chunk stays around two
+    million cells), and the features are summarized by ``workers`` processes
+    (default: number of CPUs), each owning a share of the columns.
+    """
+
+    if n_bins < 2:
+        raise ValueError("O PSI requer pelo menos 2 faixas.")
+    reference_columns = table_columns(reference)
+    current_columns = table_columns(current)
+    if features is None:
+        available = set(current_columns)
+        features = [name for name in reference_columns if name in available]
+    else:
+        features = list(dict.fromkeys(features))
+        for path, columns in ((reference, reference_columns), (current, current_columns)):
+            missing = [name for name in features if name not in columns]
+            if missing:
+                raise ValueError(f"Colunas ausentes em {path}: {', '.join(missing)}")
+    if not features:
+        raise ValueError("Nenhuma feature em comum entre a referência e a produção.")
+
+    workers = max(min(workers or os.cpu_count() or 1, len(features)), 1)
+    rows = chunk_rows or min(max(_CELL_BUDGET // len(features), _MIN_CHUNK_ROWS), DEFAULT_CHUNK_ROWS)
+    text_columns: Set[str] = set()
+    while True:
+        try:
+            reference_rows, current_rows, results = _profile(
+                reference, current, features, text_columns, workers, rows, n_bins, sketch_k, seed, thresholds
+            )
+            break
+        except SchemaError as error:
+            # A column read as numeric holds text further down: start over with
+            # it declared as text so that it is compared as a categorical feature.
+            if error.column in text_columns:
+                raise
+            text_columns.add(error.column)
+
+    by_name = {feature.name: feature for feature in results}
+    return DriftReport(
+        reference=str(reference),
+        current=str(current),
+        reference_rows=reference_rows,
+        current_rows=current_rows,
+        thresholds=thresholds,
+        features=tuple(by_name[name] for name in features),
+    )
@@ -0,0 +1,249 @@
+"""Drift of high-dimensional embeddings in linear time and fixed memory.
+
+Vectors are first reduced by a fixed Gaussian random projection, which keeps
+pairwise distances within a small factor (Johnson-Lindenstrauss). Two scores are
+then computed against a reference summary built once:
+
+* MMD with a Gaussian kernel, approximated by random Fourier features: each window
+  only keeps the sum of its feature vectors, so the statistic needs no kernel
+  matrix and two summaries merge by addition;
+* sliced Wasserstein distance: the reduced vectors are projected on random unit
+  directions and the 1-D distributions are compared through KLL quantile sketches.
+
+Batches are processed ``chunk_rows`` rows at a time, capping the memory of the
+intermediate ``(rows, n_fourier)`` feature matrix.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from .instrumentation import DATA_DRIFT, timed
+from .sketches import KLLSketch
+
+# Quantile grid on which the sliced 1-D distributions are compared.
+_QUANTILES = np.linspace(0.005, 0.995, 100)
+# Reference rows used for the median-distance bandwidth heuristic.
+_BANDWIDTH_SAMPLE = 1000
+
+
+@dataclass(frozen=True)
+class EmbeddingDriftResult:
+    """MMD² and sliced Wasserstein distance of the current window to the reference.
+
+    ``sliced_wasserstein`` averages, over the slices, the 1-Wasserstein distance in
+    units of the reference standard deviation along each slice.
+    """
+
+    mmd2: float
+    sliced_wasserstein: float
+    per_slice: np.ndarray
+    n_reference: int
+    n_current: int
+
+    def drifted(self, max_mmd2: float = 0.01, max_wasserstein: float = 0.1) -> bool:
+        return self.mmd2 > max_mmd2 or self.sliced_wasserstein > max_wasserstein
+
+
+class _WindowSummary:
+    """Sum of Fourier features plus one quantile sketch per slice."""
+
+    def __init__(self, n_fourier: int, n_slices: int, k: int, seeds: List[np.random.SeedSequence]) -> None:
+        self.count = 0
+        self.feature_sum = np.zeros(n_fourier, dtype=np.float64)
+        self.squared_norms = 0.0
+        self.slice_sum = np.zeros(n_slices, dtype=np.float64)
+        self.slice_sumsq = np.zeros(n_slices, dtype=np.float64)
+        self.sketches = [KLLSketch(k, seed) for seed in seeds]
+
+    def merge(self, other: "_WindowSummary") -> None:
+        self.count += other.count
+        self.feature_sum += other.feature_sum
+        self.squared_norms += other.squared_norms
+        self.slice_sum += other.slice_sum
+        self.slice_sumsq += other.slice_sumsq
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+
+
+class EmbeddingDriftDetector:
+    """Compare windows of ``n_dims``-dimensional embeddings with a reference.
+
+    Detectors meant to be merged, or compared across runs, must share ``n_dims``,
+    every size parameter and ``seed``, which fixes the projection, the Fourier
+    features and the slices. ``bandwidth`` defaults to the median distance between
+    reduced reference vectors, estimated on the first reference batch; shards that
+    hold data must also share it, so once the reference owner has fitted it, create
+    the other shards with :meth:`shard`.
+    """
+
+    def __init__(
+        self,
+        n_dims: int,
+        projection_dims: int = 64,
+        n_fourier: int = 512,
+        n_slices: int = 64,
+        bandwidth: Optional[float] = None,
+        sketch_k: int = 512,
+        chunk_rows: int = 16_384,
+        seed: int = 0,
+    ) -> None:
+        if n_dims < 1 or projection_dims < 1 or n_fourier < 1 or n_slices < 1:
+            raise ValueError("Dimensões, features de Fourier e fatias devem ser positivas.")
+        if bandwidth is not None and bandwidth <= 0:
+            raise ValueError("A largura de banda do kernel deve ser positiva.")
+        self.n_dims = n_dims
+        self.projection_dims = min(projection_dims, n_dims)
+        self.n_fourier = n_fourier
+        self.n_slices = n_slices
+        self.sketch_k = sketch_k
+        self.chunk_rows = max(chunk_rows, 1)
+        self.seed = seed
+        self.bandwidth = bandwidth
+
+        rng = np.random.default_rng(seed)
+        if self.projection_dims < n_dims:
+            self.projection: Optional[np.ndarray] = rng.normal(
+                0.0, 1.0 / np.sqrt(self.projection_dims), (n_dims, self.projection_dims)
+            )
+        else:
+            self.projection = None
+        # Frequencies for a unit bandwidth; they are divided by the bandwidth at use.
+        self._frequencies = rng.normal(size=(self.projection_dims, n_fourier))
+        self._phases = rng.uniform(0.0, 2.0 * np.pi, n_fourier)
+        slices = rng.normal(size=(self.projection_dims, n_slices))
+        self.slices = slices / np.linalg.norm(slices, axis=0)
+        self._sketch_seeds = np.random.SeedSequence(seed)
+        self.reference = self._new_summary()
+        self.current = self._new_summary()
+
+    def _new_summary(self) -> _WindowSummary:
+        return _WindowSummary(self.n_fourier, self.n_slices, self.sketch_k, self._sketch_seeds.spawn(self.n_slices))
+
+    def _reduce(self, block: np.ndarray) -> np.ndarray:
+        return block @ self.projection if self.projection is not None else block
+
+    def _fit_bandwidth(self, reduced: np.ndarray) -> None:
+        sample = reduced[:_BANDWIDTH_SAMPLE]
+        squared = np.sum(sample * sample, axis=1)
+        distances = squared[:, None] + squared[None, :] - 2.0 * sample @ sample.T
+        upper = distances[np.triu_indices(sample.shape[0], k=1)]
+        median = float(np.sqrt(np.median(np.maximum(upper, 0.0)))) if upper.size else 0.0
+        self.bandwidth = median if median > 0 else 1.0
+
+    def _ingest(self, summary: _WindowSummary, values: np.ndarray) -> None:
+        matrix = np.asarray(values, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if matrix.ndim != 2 or matrix.shape[1] != self.n_dims:
+            raise ValueError(f"Esperados vetores com {self.n_dims} dimensões.")
+        matrix = matrix[~np.isnan(matrix).any(axis=1)]
+        scale = np.sqrt(2.0 / self.n_fourier)
+        with timed(DATA_DRIFT, "EmbeddingDriftDetector", matrix.shape[0]):
+            for start in range(0, matrix.shape[0], self.chunk_rows):
+                reduced = self._reduce(matrix[start : start + self.chunk_rows])
+                if self.bandwidth is None:
+                    self._fit_bandwidth(reduced)
+                features = scale * np.cos(reduced @ (self._frequencies / self.bandwidth) + self._phases)
+                summary.count += reduced.shape[0]
+                summary.feature_sum += features.sum(axis=0)
+                summary.squared_norms += float(np.einsum("ij,ij->", features, features))
+                projected = reduced @ self.slices
+                summary.slice_sum += projected.sum(axis=0)
+                summary.slice_sumsq += np.einsum("ij,ij->j", projected, projected)
+                for sketch, column in zip(summary.sketches, projected.T):
+                    sketch.update(column)
+
+    def update_reference(self, values: np.ndarray) -> None:
+        """Add a batch of embeddings (rows x ``n_dims``) to the reference summary."""
+
+        self._ingest(self.reference, values)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of embeddings (rows x ``n_dims``) to the current window."""
+
+        # The bandwidth is fitted on the reference; a shard already carries it.
+        if self.bandwidth is None:
+            raise ValueError("Alimente a referência antes da janela atual.")
+        self._ingest(self.current, values)
+
+    def shard(self) -> "EmbeddingDriftDetector":
+        """Empty detector with this configuration and bandwidth, to merge back later."""
+
+        if self.bandwidth is None:
+            raise ValueError("Alimente a referência antes de criar shards: a largura de banda ainda não foi estimada.")
+        return EmbeddingDriftDetector(
+            self.n_dims,
+            self.projection_dims,
+            self.n_fourier,
+            self.n_slices,
+            self.bandwidth,
+            self.sketch_k,
+            self.chunk_rows,
+            self.seed,
+        )
+
+    def _is_empty(self) -> bool:
+        return self.reference.count == 0 and self.current.count == 0
+
+    def merge(self, other: "EmbeddingDriftDetector") -> None:
+        """Fold the reference and current summaries of another shard into this one.
+
+        Both detectors must share their configuration and, when both hold data,
+        their bandwidth. An empty detector adopts the bandwidth of ``other``.
+        """
+
+        shape = (self.n_dims, self.projection_dims, self.n_fourier, self.n_slices, self.seed)
+        if (other.n_dims, other.projection_dims, other.n_fourier, other.n_slices, other.seed) != shape:
+            raise ValueError("Detectores de embeddings com configurações diferentes.")
+        if other.bandwidth != self.bandwidth and not other._is_empty():
+            if not self._is_empty():
+                raise ValueError(
+                    "Detectores de embeddings com larguras de banda diferentes: crie os shards com shard() "
+                    "a partir do detector da referência ou informe bandwidth explicitamente."
+                )
+            self.bandwidth = other.bandwidth
+        self.reference.merge(other.reference)
+        self.current.merge(other.current)
+
+    def reset_window(self) -> None:
+        """Start a new current window, keeping the reference summary."""
+
+        self.current = self._new_summary()
+
+    def _mmd2(self) -> float:
+        # Unbiased estimate: the diagonal k(x, x) terms are removed from each mean.
+        reference, current = self.reference, self.current
+        n, m = reference.count, current.count
+        if n < 2 or m < 2:
+            return float("nan")
+        within_reference = (reference.feature_sum @ reference.feature_sum - reference.squared_norms) / (n * (n - 1))
+        within_current = (current.feature_sum @ current.feature_sum - current.squared_norms) / (m * (m - 1))
+        between = reference.feature_sum @ current.feature_sum / (n * m)
+        return float(within_reference + within_current - 2.0 * between)
+
+    def test(self) -> EmbeddingDriftResult:
+        """Compare the current window against the reference."""
+
+        reference, current = self.reference, self.current
+        per_slice = np.full(self.n_slices, np.nan)
+        if reference.count and current.count:
+            mean = reference.slice_sum / reference.count
+            std = np.sqrt(np.maximum(reference.slice_sumsq / reference.count - mean * mean, 0.0))
+            gaps = np.array(
+                [
+                    np.mean(np.abs(ref.quantile(_QUANTILES) - cur.quantile(_QUANTILES)))
+                    for ref, cur in zip(reference.sketches, current.sketches)
+                ]
+            )
+            per_slice = gaps / np.where(std > 0, std, 1.0)
+        return EmbeddingDriftResult(
+            mmd2=self._mmd2(),
+            sliced_wasserstein=float(np.mean(per_slice)),
+            per_slice=per_slice,
+            n_reference=reference.count,
+            n_current=current.count,
+        )
@@ -0,0 +1,153 @@
+"""Incremental group fairness metrics (demographic parity and equalized odds)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Columns of the per-group counter matrix.
+DECISIONS, SELECTED, TP, FP, TN, FN = range(6)
+_N_COUNTERS = 6
+
+
+@dataclass(frozen=True)
+class FairnessReport:
+    """Per-group rates and the disparity summaries derived from them."""
+
+    groups: Tuple[object, ...]
+    decisions: np.ndarray
+    selection_rate: np.ndarray
+    impact_ratio: np.ndarray
+    true_positive_rate: np.ndarray
+    false_positive_rate: np.ndarray
+
+    @property
+    def demographic_parity_gap(self) -> float:
+        """Largest difference in selection rate between two groups."""
+
+        return _spread(self.selection_rate)
+
+    @property
+    def equalized_odds_gap(self) -> float:
+        """Largest TPR or FPR difference between two groups."""
+
+        return max(_spread(self.true_positive_rate), _spread(self.false_positive_rate))
+
+    def below_impact_ratio(self, minimum: float = 0.8) -> List[object]:
+        """Groups failing the impact-ratio threshold (four-fifths rule by default)."""
+
+        return [group for group, ratio in zip(self.groups, self.impact_ratio) if ratio < minimum]
+
+
+def _spread(values: np.ndarray) -> float:
+    finite = values[np.isfinite(values)]
+    return float(finite.max() - finite.min()) if finite.size else 0.0
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(
+        numerator, denominator, out=np.full(numerator.shape, np.nan), where=denominator > 0
+    )
+
+
+class FairnessMonitor:
+    """Per-group confusion counters updated with ``np.bincount`` on encoded group ids.
+
+    Group labels are encoded once into dense integer ids; counters live in a single
+    ``(groups, 6)`` matrix holding decisions, positive decisions and TP/FP/TN/FN.
+    Reports therefore cost ``O(groups)`` whatever the number of rows seen. Passing a
+    2-D ``groups`` array (rows x attributes) tracks intersectional groups as tuples.
+    """
+
+    def __init__(self, reference_group: Optional[object] = None) -> None:
+        self.reference_group = reference_group
+        self.counters = np.zeros((0, _N_COUNTERS), dtype=np.int64)
+        self._ids: Dict[object, int] = {}
+        self._labels: List[object] = []
+
+    @property
+    def groups(self) -> Tuple[object, ...]:
+        return tuple(self._labels)
+
+    def _encode(self, groups: np.ndarray) -> np.ndarray:
+        groups = np.asarray(groups)
+        if groups.ndim == 2:
+            # Combine the attribute codes in mixed radix so one np.unique finds the
+            # intersections; only distinct combinations are turned into tuples.
+            columns = [np.unique(column, return_inverse=True) for column in groups.T]
+            key = np.zeros(groups.shape[0], dtype=np.int64)
+            for distinct, inverse in columns:
+                key = key * distinct.size + inverse.ravel()
+            _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+            labels = [tuple(row) for row in groups[first].tolist()]
+        else:
+            distinct, inverse = np.unique(groups, return_inverse=True)
+            labels = distinct.tolist()
+        return self._ids_for(labels)[inverse.ravel()]
+
+    def _ids_for(self, labels: List[object]) -> np.ndarray:
+        ids = np.empty(len(labels), dtype=np.int64)
+        for position, label in enumerate(labels):
+            group_id = self._ids.get(label)
+            if group_id is None:
+                group_id = self._ids[label] = len(self._labels)
+                self._labels.append(label)
+            ids[position] = group_id
+        if len(self._labels) > self.counters.shape[0]:
+            grown = np.zeros((len(self._labels), _N_COUNTERS), dtype=np.int64)
+            grown[: self.counters.shape[0]] = self.counters
+            self.counters = grown
+        return ids
+
+    def update(self, groups: np.ndarray, y_pred: np.ndarray, y_true: Optional[np.ndarray] = None) -> None:
+        """Add a batch of binary decisions, optionally with their observed labels.
+
+        Rows whose label is NaN count towards selection rates but not towards the
+        confusion matrix, which suits labels that arrive late.
+        """
+
+        codes = self._encode(groups)
+        predicted = np.asarray(y_pred).ravel() == 1
+        if predicted.size != codes.size:
+            raise ValueError("Grupos e decisões devem ter o mesmo tamanho.")
+        n_groups = self.counters.shape[0]
+        self.counters[:, DECISIONS] += np.bincount(codes, minlength=n_groups)
+        self.counters[:, SELECTED] += np.bincount(codes, weights=predicted, minlength=n_groups).astype(np.int64)
+        if y_true is None:
+            return
+
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        labeled = ~np.isnan(y_true)
+        actual = y_true == 1
+        # Cell 0..3 maps to TP, FP, TN, FN.
+        cell = np.where(predicted, np.where(actual, 0, 1), np.where(actual, 3, 2))
+        flat = codes[labeled] * 4 + cell[labeled]
+        confusion = np.bincount(flat, minlength=n_groups * 4).reshape(n_groups, 4)
+        self.counters[:, TP : FN + 1] += confusion
+
+    def merge(self, other: "FairnessMonitor") -> None:
+        """Add the counters of another monitor, aligning groups by label."""
+
+        ids = self._ids_for(other._labels)
+        np.add.at(self.counters, ids, other.counters)
+
+    def report(self) -> FairnessReport:
+        """Selection rates, impact ratios and error rates for every group."""
+
+        counts = self.counters.astype(np.float64)
+        selection = _ratio(counts[:, SELECTED], counts[:, DECISIONS])
+        if self.reference_group is not None and self.reference_group in self._ids:
+            baseline = selection[self._ids[self.reference_group]]
+        else:
+            baseline = np.nanmax(selection) if np.isfinite(selection).any() else np.nan
+        impact = selection / baseline if baseline and np.isfinite(baseline) else np.full(selection.shape, np.nan)
+        return FairnessReport(
+            groups=self.groups,
+            decisions=self.counters[:, DECISIONS].copy(),
+            selection_rate=selection,
+            impact_ratio=impact,
+            true_positive_rate=_ratio(counts[:, TP], counts[:, TP] + counts[:, FN]),
+            false_positive_rate=_ratio(counts[:, FP], counts[:, FP] + counts[:, TN]),
+        )
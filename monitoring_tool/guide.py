@@ -2,88 +2,131 @@
 
 from __future__ import annotations
 
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
 from textwrap import indent
+from typing import TYPE_CHECKING, Any, Callable
 
-from .data import MONITORING_TECHNIQUES, PRODUCTION_PROBLEMS, USE_CASES
+from .data import (
+    MONITORING_TECHNIQUES,
+    PRODUCTION_PROBLEMS,
+    USE_CASES,
+    ProductionProblem,
+    Technique,
+    UseCase,
+)
+from .knowledge_base import KnowledgeBase
+
+if TYPE_CHECKING:  # pragma: no cover - the drift report pulls in NumPy
+    from .drift_report import DriftReport, FeatureDrift
 
 
 def _format_list(items: list[str], bullet: str = "- ") -> str:
     return "\n".join(f"{bullet}{item}" for item in items)
 
 
-def build_summary() -> str:
-    """Build a rich Markdown summary covering techniques, problems and use cases."""
+@lru_cache(maxsize=None)
+def knowledge_base() -> KnowledgeBase:
+    """Shared index over the built-in catalogue, built on first use."""
 
-    sections: list[str] = []
+    return KnowledgeBase(MONITORING_TECHNIQUES, PRODUCTION_PROBLEMS, USE_CASES)
 
-    technique_lines = ["## Técnicas de monitoramento", ""]
-    for technique in MONITORING_TECHNIQUES:
-        technique_lines.extend(
-            [
-                f"### {technique.name}",
-                f"**Objetivo:** {technique.objective}",
-                technique.description,
-                "",
-                "**Sinais acompanhados:**",
-                _format_list(technique.monitoring_signals),
-                "",
-                "**Algoritmos ou testes relevantes:**",
-                _format_list(
-                    [
-                        f"{algorithm.name} — {algorithm.summary} (Uso indicado: {algorithm.when_to_use})"
-                        for algorithm in technique.algorithms
-                    ]
-                ),
-                "",
-                "**Boas práticas operacionais:**",
-                _format_list(technique.operational_tips),
-                "",
-                f"**Problemas relacionados:** {', '.join(technique.related_problems)}",
-                "",
-            ]
-        )
-    sections.append("\n".join(technique_lines))
 
-    problem_lines = ["## Problemas recorrentes em produção", ""]
-    for problem in PRODUCTION_PROBLEMS:
-        problem_lines.extend(
-            [
-                f"### {problem.name}",
-                "**Sintomas:**",
-                _format_list(problem.symptoms),
-                "",
-                "**Causas comuns:**",
-                _format_list(problem.causes),
-                "",
-                "**Como detectar:**",
-                _format_list(problem.detection_methods),
-                "",
-                "**Ações de mitigação:**",
-                _format_list(problem.mitigation_actions),
-                "",
-            ]
-        )
-    sections.append("\n".join(problem_lines))
+# Rendered sections keyed by entry identity. Catalogue entries are immutable and
+# decoded once per catalogue, so identity stands in for their content at the cost
+# of one dict lookup; the entry is kept so that its id cannot be reused.
+_rendered_sections: dict[int, tuple[object, str]] = {}
 
-    use_case_lines = ["## Casos de uso", ""]
-    for use_case in USE_CASES:
-        use_case_lines.extend(
+
+def _render_cached(entry: object, render: Callable[[Any], list[str]]) -> str:
+    cached = _rendered_sections.get(id(entry))
+    if cached is None or cached[0] is not entry:
+        cached = _rendered_sections[id(entry)] = (entry, "\n".join(render(entry)))
+    return cached[1]
+
+
+def _technique_section(technique: Technique) -> list[str]:
+    return [
+        f"### {technique.name}",
+        f"**Objetivo:** {technique.objective}",
+        technique.description,
+        "",
+        "**Sinais acompanhados:**",
+        _format_list(technique.monitoring_signals),
+        "",
+        "**Algoritmos ou testes relevantes:**",
+        _format_list(
             [
-                f"### {use_case.name}",
-                use_case.context,
-                "",
-                "**Riscos de produção:**",
-                _format_list(use_case.risks),
-                "",
-                "**Foco de monitoramento:**",
-                _format_list(use_case.monitoring_focus),
-                "",
-                "**KPIs recomendados:**",
-                _format_list(use_case.example_kpis),
-                "",
+                f"{algorithm.name} — {algorithm.summary} (Uso indicado: {algorithm.when_to_use})"
+                for algorithm in technique.algorithms
             ]
-        )
-    sections.append("\n".join(use_case_lines))
+        ),
+        "",
+        "**Boas práticas operacionais:**",
+        _format_list(technique.operational_tips),
+        "",
+        f"**Problemas relacionados:** {', '.join(technique.related_problems)}",
+        "",
+    ]
+
+
+def _problem_section(problem: ProductionProblem) -> list[str]:
+    return [
+        f"### {problem.name}",
+        "**Sintomas:**",
+        _format_list(problem.symptoms),
+        "",
+        "**Causas comuns:**",
+        _format_list(problem.causes),
+        "",
+        "**Como detectar:**",
+        _format_list(problem.detection_methods),
+        "",
+        "**Ações de mitigação:**",
+        _format_list(problem.mitigation_actions),
+        "",
+    ]
+
+
+def _use_case_section(use_case: UseCase) -> list[str]:
+    return [
+        f"### {use_case.name}",
+        use_case.context,
+        "",
+        "**Riscos de produção:**",
+        _format_list(use_case.risks),
+        "",
+        "**Foco de monitoramento:**",
+        _format_list(use_case.monitoring_focus),
+        "",
+        "**KPIs recomendados:**",
+        _format_list(use_case.example_kpis),
+        "",
+    ]
+
+
+def build_summary() -> str:
+    """Build a rich Markdown summary covering techniques, problems and use cases.
+
+    Each entry is rendered once per catalogue: sections are memoized by entry, so
+    a catalogue opened from an edited source renders only its own entries again.
+    """
+
+    sections = [
+        "\n".join(
+            ["## Técnicas de monitoramento", ""]
+            + [_render_cached(technique, _technique_section) for technique in MONITORING_TECHNIQUES]
+        ),
+        "\n".join(
+            ["## Problemas recorrentes em produção", ""]
+            + [_render_cached(problem, _problem_section) for problem in PRODUCTION_PROBLEMS]
+        ),
+        "\n".join(
+            ["## Casos de uso", ""] + [_render_cached(use_case, _use_case_section) for use_case in USE_CASES]
+        ),
+    ]
 
     header = [
         "# Guia rápido de monitoramento de modelos",
@@ -94,23 +137,71 @@ def build_summary() -> str:
     return "\n".join(header)
 
 
+_SECTION_START = re.compile(r"(?m)^(?=#{1,3} )")
+
+
+def _split_sections(text: str) -> list[str]:
+    return [chunk for chunk in _SECTION_START.split(text) if chunk]
+
+
+def _section_title(chunk: str) -> str:
+    return chunk.split("\n", 1)[0].lstrip("#").strip()
+
+
+def _replace_file(path: Path, content: bytes) -> None:
+    # Readers of ``path`` see either the old guide or the new one, never a mix.
+    import tempfile
+
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            handle.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def write_summary(path: Path | str) -> list[str]:
+    """Bring the Markdown guide at ``path`` up to date.
+
+    The file is compared heading by heading with the current rendering and is only
+    rewritten when something changed. Returns the headings of the sections that
+    were added, edited or removed (empty when already up to date).
+    """
+
+    path = Path(path)
+    new_chunks = _split_sections(build_summary() + "\n")
+    try:
+        old_chunks = _split_sections(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        _replace_file(path, "".join(new_chunks).encode("utf-8"))
+        return [_section_title(chunk) for chunk in new_chunks]
+
+    old_set, new_set = set(old_chunks), set(new_chunks)
+    changed = [_section_title(chunk) for chunk in new_chunks if chunk not in old_set]
+    changed += [_section_title(chunk) for chunk in old_chunks if chunk not in new_set]
+    if not changed and old_chunks == new_chunks:
+        return []
+
+    _replace_file(path, "".join(new_chunks).encode("utf-8"))
+    return list(dict.fromkeys(changed))
+
+
 def build_cli_overview() -> str:
     """Generate a plain-text overview for use in CLI outputs."""
 
     summary_parts: list[str] = []
-    summary_parts.append("Técnicas disponíveis: " + ", ".join(t.name for t in MONITORING_TECHNIQUES))
-    summary_parts.append("Problemas monitorados: " + ", ".join(p.name for p in PRODUCTION_PROBLEMS))
-    summary_parts.append("Casos de uso mapeados: " + ", ".join(u.name for u in USE_CASES))
+    summary_parts.append("Técnicas disponíveis: " + ", ".join(MONITORING_TECHNIQUES.names))
+    summary_parts.append("Problemas monitorados: " + ", ".join(PRODUCTION_PROBLEMS.names))
+    summary_parts.append("Casos de uso mapeados: " + ", ".join(USE_CASES.names))
     return "\n".join(summary_parts)
 
 
 def format_technique(name: str) -> str:
     """Return a detailed description for a given technique."""
 
-    technique = next((t for t in MONITORING_TECHNIQUES if t.name.lower() == name.lower()), None)
-    if technique is None:
-        available = ", ".join(t.name for t in MONITORING_TECHNIQUES)
-        raise ValueError(f"Técnica '{name}' não encontrada. Opções: {available}")
+    technique = knowledge_base().technique(name)
 
     lines = [technique.name, "=" * len(technique.name), ""]
     lines.append(f"Objetivo: {technique.objective}")
@@ -143,10 +234,7 @@ def format_technique(name: str) -> str:
 def format_problem(name: str) -> str:
     """Return details for a production problem."""
 
-    problem = next((p for p in PRODUCTION_PROBLEMS if p.name.lower() == name.lower()), None)
-    if problem is None:
-        available = ", ".join(p.name for p in PRODUCTION_PROBLEMS)
-        raise ValueError(f"Problema '{name}' não encontrado. Opções: {available}")
+    problem = knowledge_base().problem(name)
 
     lines = [problem.name, "=" * len(problem.name), ""]
     lines.append("Sintomas:")
@@ -166,10 +254,7 @@ def format_problem(name: str) -> str:
 def format_use_case(name: str) -> str:
     """Return a scenario description for a given use case."""
 
-    use_case = next((u for u in USE_CASES if u.name.lower() == name.lower()), None)
-    if use_case is None:
-        available = ", ".join(u.name for u in USE_CASES)
-        raise ValueError(f"Caso de uso '{name}' não encontrado. Opções: {available}")
+    use_case = knowledge_base().use_case(name)
 
     lines = [use_case.name, "=" * len(use_case.name), ""]
     lines.append(use_case.context)
@@ -183,3 +268,121 @@ def format_use_case(name: str) -> str:
     lines.append("KPIs recomendados:")
     lines.append(indent(_format_list(use_case.example_kpis, "* "), "  "))
     return "\n".join(lines)
+
+
+def format_search(query: str, limit: int = 10) -> str:
+    """Return the entries matching a free-text query, best matches first."""
+
+    hits = knowledge_base().search(query, limit)
+    if not hits:
+        return f"Nenhum resultado para '{query}'."
+    lines = [f"Resultados para '{query}':", ""]
+    for hit in hits:
+        lines.append(f"  - [{hit.label}] {hit.name} (campos: {', '.join(hit.fields)})")
+    return "\n".join(lines)
+
+
+def _p_value(value: float) -> str:
+    return f"{value:.3g}" if value >= 1e-4 else "< 0.0001"
+
+
+def _drift_tests(feature: FeatureDrift) -> list[str]:
+    tests = [f"PSI {feature.psi:.4f}"]
+    if feature.ks_statistic is not None:
+        tests.append(f"KS {feature.ks_statistic:.4f} (p-valor {_p_value(feature.ks_p_value)})")
+    tests.append(
+        f"Chi-quadrado {feature.chi2_statistic:.1f} (p-valor {_p_value(feature.chi2_p_value)}, "
+        f"JS {feature.js_divergence:.4f})"
+    )
+    return tests
+
+
+def _missing_rate(missing: int, present: int) -> str:
+    total = missing + present
+    return f"{100.0 * missing / total:.2f}%" if total else "-"
+
+
+def format_drift_report(report: DriftReport) -> str:
+    """Render a drift report as Markdown, in the layout of :func:`build_summary`.
+
+    Every drifted feature is tagged with the "Drift de dados" production problem,
+    whose detection methods and mitigation actions close the report.
+    """
+
+    from .drift_report import DRIFT_PROBLEM
+
+    problem = knowledge_base().problem(DRIFT_PROBLEM)
+    thresholds = report.thresholds
+    drifted = report.drifted
+    lines = [
+        "# Relatório de drift de dados",
+        f"Referência: `{report.reference}` ({report.reference_rows} linhas). "
+        f"Produção: `{report.current}` ({report.current_rows} linhas).",
+        "",
+        "## Resumo",
+        "",
+        _format_list(
+            [
+                f"Features analisadas: {len(report.features)}",
+                f"Features com drift: {len(drifted)}",
+                f"PSI acima de {thresholds.psi:g}",
+                f"KS com p-valor abaixo de {thresholds.alpha:g} e distância acima de {thresholds.min_ks:g}",
+                f"Chi-quadrado com p-valor abaixo de {thresholds.alpha:g} e divergência JS acima de "
+                f"{thresholds.max_js:g}",
+            ]
+        ),
+        "",
+        "## Features com drift",
+        "",
+    ]
+    if not drifted:
+        lines.extend(["Nenhuma feature ultrapassou os limites.", ""])
+    for feature in drifted:
+        lines.extend(
+            [
+                f"### {feature.name}",
+                f"**Tipo:** {feature.kind}",
+                f"**Testes que dispararam:** {', '.join(feature.alerts)}",
+                f"**Problema relacionado:** {problem.name}",
+                "",
+                "**Estatísticas:**",
+                _format_list(
+                    [
+                        *_drift_tests(feature),
+                        f"Valores ausentes: {_missing_rate(feature.missing_reference, feature.n_reference)} "
+                        f"na referência, {_missing_rate(feature.missing_current, feature.n_current)} em produção",
+                    ]
+                ),
+                "",
+            ]
+        )
+    stable = [feature for feature in report.features if not feature.drifted]
+    if stable:
+        lines.extend(
+            [
+                "## Features estáveis",
+                "",
+                _format_list([f"{feature.name} ({feature.kind}): {'; '.join(_drift_tests(feature))}" for feature in stable]),
+                "",
+            ]
+        )
+    if drifted:
+        lines.extend(["## Problemas relacionados", "", _render_cached(problem, _problem_section)])
+    return "\n".join(lines).rstrip("\n")
+
+
+def drift_report_json(report: DriftReport) -> str:
+    """Serialize a drift report as JSON, tagging drifted features with the problem name."""
+
+    import json
+    from dataclasses import asdict
+
+    from .drift_report import DRIFT_PROBLEM
+
+    problem = knowledge_base().problem(DRIFT_PROBLEM)
+    payload = asdict(report)
+    for feature, record in zip(report.features, payload["features"]):
+        record["drifted"] = feature.drifted
+        record["problem"] = problem.name if feature.drifted else None
+    payload["problem"] = asdict(problem)
+    return json.dumps(payload, ensure_ascii=False, indent=2)
@@ -0,0 +1,381 @@
+"""Counters and histograms describing the toolkit's own hot paths.
+
+Metrics live in a process-wide :data:`REGISTRY` and are exported in the
+Prometheus text format, either by :func:`start_metrics_server` or through
+``python -m monitoring_tool stats``. Recording is a dictionary update per batch,
+never per row; with ``MONITORING_TOOL_METRICS=0`` (or ``REGISTRY.enabled =
+False``) :func:`timed` hands out a shared no-op context and nothing is recorded.
+
+Worker processes record into their own registry and ship it back with each
+result through :meth:`Registry.drain`, which the parent folds in with
+:meth:`Registry.merge`.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+from bisect import bisect_left
+from contextlib import nullcontext
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - asyncio takes tens of milliseconds to import
+    import asyncio
+
+METRICS_ENV = "MONITORING_TOOL_METRICS"
+
+# Categories of ``MONITORING_TECHNIQUES`` each detector reports under.
+DATA_DRIFT = "Detecção de Drift de Dados"
+CONCEPT_DRIFT = "Detecção de Drift de Conceito"
+PERFORMANCE = "Monitoramento de Performance"
+DATA_QUALITY = "Monitoramento de Qualidade de Dados"
+FAIRNESS = "Monitoramento de Fairness e Bias"
+DEFAULT_PORT = 9464
+
+# Update latency from 50 µs to 10 s, and batch sizes from 1 to about 4 million rows.
+LATENCY_BUCKETS = (5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(float(4**power) for power in range(12))
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.values: Dict[Labels, object] = {}
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic total per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def merge(self, values: Dict[Labels, float]) -> None:
+        for labels, amount in values.items():
+            self.inc(amount, *labels)
+
+    def render(self) -> List[str]:
+        return self._header() + [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Last value per label set."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = float(value)
+
+    def merge(self, values: Dict[Labels, float]) -> None:
+        self.values.update(values)
+
+
+class Histogram(_Metric):
+    """Counts of observations per bucket, plus their sum, per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self.values.get(labels)
+        if state is None:
+            # Bucket counts (the last one is +Inf) followed by the sum of the values.
+            state = self.values[labels] = [0.0] * (len(self.buckets) + 2)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def merge(self, values: Dict[Labels, List[float]]) -> None:
+        for labels, other in values.items():
+            state = self.values.setdefault(labels, [0.0] * len(other))
+            for index, amount in enumerate(other):
+                state[index] += amount
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, state in sorted(self.values.items()):
+            total = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), state):
+                total += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {_format_value(total)}")
+            suffix = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{suffix} {_format_value(total)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Labels) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.histogram.observe(perf_counter() - self.start, *self.labels)
+
+
+_DISABLED = nullcontext()
+
+
+class Registry:
+    """Named metrics of one process."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.metrics: Dict[str, _Metric] = {}
+
+    def _get(self, cls: type, name: str, *args: object) -> _Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args)
+        elif type(metric) is not cls:
+            raise ValueError(f"A métrica '{name}' já foi registrada como {metric.kind}.")
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help_text, label_names)  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help_text, label_names)  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, help_text, label_names, buckets)  # type: ignore[return-value]
+
+    def drain(self) -> Dict[str, Dict[Labels, object]]:
+        """Values recorded since the last drain, clearing them, for :meth:`merge`."""
+
+        _update_process_gauges()
+        snapshot = {name: metric.values for name, metric in self.metrics.items() if metric.values}
+        for metric in self.metrics.values():
+            metric.values = {}
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Dict[Labels, object]]) -> None:
+        for name, values in snapshot.items():
+            metric = self.metrics.get(name)
+            if metric is not None:
+                metric.merge(values)  # type: ignore[attr-defined]
+
+    def render(self) -> str:
+        """Every metric with at least one sample, in the Prometheus text format."""
+
+        _update_process_gauges()
+        lines: List[str] = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            if metric.values:
+                lines.extend(metric.render())  # type: ignore[attr-defined]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(enabled=os.environ.get(METRICS_ENV, "1").strip().lower() not in {"0", "false", "no", "off"})
+
+DETECTOR_SECONDS = REGISTRY.histogram(
+    "monitoring_tool_detector_update_seconds", "Tempo de cada atualização de detector.", ("technique", "detector")
+)
+DETECTOR_ROWS = REGISTRY.counter(
+    "monitoring_tool_detector_rows_total", "Linhas processadas pelos detectores.", ("technique", "detector")
+)
+BATCH_ROWS = REGISTRY.histogram(
+    "monitoring_tool_batch_rows", "Linhas por janela pontuada.", ("window",), SIZE_BUCKETS
+)
+RECORDS = REGISTRY.counter("monitoring_tool_records_total", "Registros ingeridos pelo serviço.")
+DROPPED_WINDOWS = REGISTRY.counter(
+    "monitoring_tool_dropped_windows_total", "Janelas descartadas com a fila cheia.", ("window",)
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "monitoring_tool_queue_depth", "Janelas aguardando pontuação (pending) ou em execução (in_flight).", ("queue",)
+)
+SHARD_DETECTORS = REGISTRY.gauge("monitoring_tool_shard_detectors", "Detectores carregados em memória por shard.", ("shard",))
+SHARD_RESIDENT_BYTES = REGISTRY.gauge(
+    "monitoring_tool_shard_resident_bytes", "Bytes em arrays dos detectores carregados por shard.", ("shard",)
+)
+SHARD_CHECKPOINT_BYTES = REGISTRY.gauge(
+    "monitoring_tool_shard_checkpoint_bytes", "Bytes dos segmentos de checkpoint por shard.", ("shard",)
+)
+CHECKPOINT_SECONDS = REGISTRY.histogram(
+    "monitoring_tool_checkpoint_seconds", "Duração de cada checkpoint de shard.", ("shard",)
+)
+PROCESS_RESIDENT_BYTES = REGISTRY.gauge(
+    "monitoring_tool_process_resident_bytes", "Memória residente de cada processo.", ("pid",)
+)
+
+
+def _update_process_gauges() -> None:
+    if not REGISTRY.enabled:
+        return
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            resident = int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Without /proc fall back to the peak, in KiB on Linux and bytes on macOS.
+        # ``resource`` is Unix-only, so it is imported here rather than at the top.
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        resident = peak if sys.platform == "darwin" else peak * 1024
+    PROCESS_RESIDENT_BYTES.set(resident, str(os.getpid()))
+
+
+def timed(technique: str, detector: str, rows: int = 0):
+    """Context timing one detector update; also counts ``rows`` when given."""
+
+    if not REGISTRY.enabled:
+        return _DISABLED
+    if rows:
+        DETECTOR_ROWS.inc(rows, technique, detector)
+    return _Timer(DETECTOR_SECONDS, (technique, detector))
+
+
+async def start_metrics_server(
+    port: int = DEFAULT_PORT, host: str = "127.0.0.1", registry: Registry = REGISTRY
+) -> asyncio.AbstractServer:
+    """Serve ``registry`` as Prometheus text on ``http://host:port/metrics``."""
+
+    import asyncio
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in {"/", "/metrics"}:
+                status, body = "200 OK", registry.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+# -- reading an exported page ----------------------------------------------------------
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)')
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_text(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Samples ``(name, labels, value)`` of a Prometheus text page."""
+
+    samples = []
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match is None or line.startswith("#"):
+            continue
+        name, labels, value = match.groups()
+        parsed = {key: raw.replace('\\"', '"').replace("\\n", "\n").replace("\\\\", "\\") for key, raw in _LABEL.findall(labels or "")}
+        samples.append((name, parsed, float(value)))
+    return samples
+
+
+def format_stats(text: str) -> str:
+    """Rank detectors by time spent, followed by the service queue and memory gauges."""
+
+    seconds: Dict[Tuple[str, str], float] = {}
+    calls: Dict[Tuple[str, str], float] = {}
+    rows: Dict[Tuple[str, str], float] = {}
+    gauges: List[str] = []
+    for name, labels, value in parse_text(text):
+        key = (labels.get("technique", ""), labels.get("detector", ""))
+        if name == "monitoring_tool_detector_update_seconds_sum":
+            seconds[key] = value
+        elif name == "monitoring_tool_detector_update_seconds_count":
+            calls[key] = value
+        elif name == "monitoring_tool_detector_rows_total":
+            rows[key] = value
+        elif name in {
+            "monitoring_tool_records_total",
+            "monitoring_tool_dropped_windows_total",
+            "monitoring_tool_queue_depth",
+            "monitoring_tool_shard_detectors",
+            "monitoring_tool_shard_resident_bytes",
+            "monitoring_tool_shard_checkpoint_bytes",
+            "monitoring_tool_process_resident_bytes",
+        }:
+            detail = ",".join(f"{key}={value}" for key, value in labels.items())
+            gauges.append(f"{name.removeprefix('monitoring_tool_')}{'{' + detail + '}' if detail else ''} = {value:g}")
+
+    if not seconds:
+        lines = ["Nenhuma atualização de detector registrada."]
+    else:
+        total = sum(seconds.values())
+        lines = [
+            f"{'técnica':<40} {'detector':<22} {'tempo (s)':>10} {'%':>6} {'chamadas':>9} {'ms/chamada':>11} {'linhas/s':>12}"
+        ]
+        for key in sorted(seconds, key=seconds.get, reverse=True):
+            spent, count = seconds[key], calls.get(key, 0.0)
+            throughput = rows.get(key, 0.0) / spent if spent > 0 else 0.0
+            lines.append(
+                f"{key[0]:<40} {key[1]:<22} {spent:10.3f} {100 * spent / total if total else 0:6.1f} "
+                f"{count:9.0f} {1000 * spent / count if count else 0:11.3f} {throughput:12.0f}"
+            )
+    if gauges:
+        lines.extend(["", *gauges])
+    return "\n".join(lines)
+
+
+def fetch(url: str, timeout: float = 5.0) -> str:
+    """Download a metrics page, e.g. from a service started with ``--metrics-port``."""
+
+    from urllib.error import URLError
+    from urllib.request import urlopen
+
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            return response.read().decode("utf-8")
+    except (URLError, OSError) as exc:
+        raise ValueError(f"Não foi possível ler as métricas em {url}: {exc}") from exc
+
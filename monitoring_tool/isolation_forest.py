@@ -0,0 +1,178 @@
+"""Isolation Forest stored as flat arrays and scored level by level."""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .instrumentation import DATA_QUALITY, timed
+
+_EULER_GAMMA = 0.5772156649015329
+
+# Trees x samples routed at once while scoring.
+_ROUTING_BLOCK = 1 << 16
+
+_FIELDS = ("feature", "threshold", "left", "right", "size", "depth")
+
+
+def average_path_length(n: np.ndarray) -> np.ndarray:
+    """Expected path length of an unsuccessful BST search among ``n`` points."""
+
+    n = np.asarray(n, dtype=np.float64)
+    safe = np.maximum(n, 2.0)
+    harmonic = np.log(safe - 1.0) + _EULER_GAMMA
+    return np.where(n > 2, 2.0 * harmonic - 2.0 * (safe - 1.0) / safe, np.where(n == 2, 1.0, 0.0))
+
+
+def _build_trees(
+    seeds: List[np.random.SeedSequence], data: np.ndarray, sample_size: int
+) -> Dict[str, np.ndarray]:
+    """Grow one tree per seed, each on its own subsample, into padded node arrays."""
+
+    n_trees = len(seeds)
+    n_rows, n_features = data.shape
+    max_depth = int(math.ceil(math.log2(max(sample_size, 2))))
+    n_nodes = 2 * sample_size - 1
+    arrays = {
+        "feature": np.full((n_trees, n_nodes), -1, dtype=np.int32),
+        "threshold": np.zeros((n_trees, n_nodes), dtype=np.float64),
+        "left": np.zeros((n_trees, n_nodes), dtype=np.int32),
+        "right": np.zeros((n_trees, n_nodes), dtype=np.int32),
+        "size": np.zeros((n_trees, n_nodes), dtype=np.int32),
+        "depth": np.zeros((n_trees, n_nodes), dtype=np.int16),
+    }
+    for tree, seed in enumerate(seeds):
+        # One generator per tree, so a tree does not depend on how trees are split
+        # across processes.
+        rng = np.random.default_rng(seed)
+        rows = data[rng.choice(n_rows, size=sample_size, replace=False)]
+        stack = [(0, rows, 0)]
+        next_free = 1
+        while stack:
+            node, subset, depth = stack.pop()
+            arrays["size"][tree, node] = subset.shape[0]
+            arrays["depth"][tree, node] = depth
+            if depth >= max_depth or subset.shape[0] <= 1:
+                continue
+            low = subset.min(axis=0)
+            high = subset.max(axis=0)
+            splittable = np.flatnonzero(high > low)
+            if splittable.size == 0:
+                continue
+            feature = int(rng.choice(splittable))
+            threshold = float(rng.uniform(low[feature], high[feature]))
+            goes_left = subset[:, feature] < threshold
+            left, right = next_free, next_free + 1
+            next_free += 2
+            arrays["feature"][tree, node] = feature
+            arrays["threshold"][tree, node] = threshold
+            arrays["left"][tree, node] = left
+            arrays["right"][tree, node] = right
+            stack.append((left, subset[goes_left], depth + 1))
+            stack.append((right, subset[~goes_left], depth + 1))
+    return arrays
+
+
+class IsolationForest:
+    """Isolation Forest whose trees live in ``(n_trees, n_nodes)`` NumPy arrays.
+
+    Each node stores its split feature (``-1`` for leaves), threshold, children,
+    training size and depth. Scoring moves every sample of a batch down every tree one
+    level at a time, so the Python loop runs ``max_depth`` times per block instead of
+    once per sample and node. Trees can be grown in parallel with ``n_jobs``; each
+    tree has its own seed, so a fixed ``seed`` gives the same forest for any ``n_jobs``.
+    """
+
+    def __init__(self, n_trees: int = 100, sample_size: int = 256, seed: Optional[int] = None, n_jobs: int = 1) -> None:
+        self.n_trees = n_trees
+        self.sample_size = sample_size
+        self.seed = seed
+        self.n_jobs = max(n_jobs, 1)
+        self.feature: Optional[np.ndarray] = None
+        self.threshold: Optional[np.ndarray] = None
+        self.left: Optional[np.ndarray] = None
+        self.right: Optional[np.ndarray] = None
+        self.size: Optional[np.ndarray] = None
+        self.depth: Optional[np.ndarray] = None
+        self.n_features = 0
+        self.max_depth = 0
+        self.effective_sample_size = 0
+
+    def fit(self, data: np.ndarray) -> "IsolationForest":
+        """Grow the forest on a ``(rows, features)`` matrix without missing values."""
+
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[0] < 2:
+            raise ValueError("O Isolation Forest exige uma matriz com pelo menos 2 linhas.")
+        if np.isnan(data).any():
+            raise ValueError("Remova ou impute valores ausentes antes de treinar o Isolation Forest.")
+        sample_size = min(self.sample_size, data.shape[0])
+        seeds = np.random.SeedSequence(self.seed).spawn(self.n_trees)
+        groups = [group for group in np.array_split(np.arange(self.n_trees), self.n_jobs) if group.size]
+
+        if len(groups) == 1:
+            parts: List[Dict[str, np.ndarray]] = [_build_trees(seeds, data, sample_size)]
+        else:
+            with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+                futures = [
+                    executor.submit(_build_trees, [seeds[index] for index in group], data, sample_size)
+                    for group in groups
+                ]
+                parts = [future.result() for future in futures]
+
+        for name in _FIELDS:
+            setattr(self, name, np.ascontiguousarray(np.concatenate([part[name] for part in parts])))
+        self.n_features = data.shape[1]
+        self.max_depth = int(math.ceil(math.log2(max(sample_size, 2))))
+        self.effective_sample_size = sample_size
+        return self
+
+    def path_lengths(self, data: np.ndarray) -> np.ndarray:
+        """Average isolation depth of every sample across the forest."""
+
+        if self.feature is None:
+            raise ValueError("Treine o Isolation Forest com fit() antes de pontuar.")
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[1] != self.n_features:
+            raise ValueError(f"Esperadas {self.n_features} features.")
+
+        n_trees, n_nodes = self.feature.shape
+        # Node ids are offset per tree so every lookup is a flat ``take``.
+        offsets = (np.arange(n_trees, dtype=np.int64) * n_nodes)[:, None]
+        feature = self.feature.ravel()
+        threshold = self.threshold.ravel()
+        left = self.left.ravel().astype(np.int64) + np.repeat(offsets.ravel(), n_nodes)
+        right = self.right.ravel().astype(np.int64) + np.repeat(offsets.ravel(), n_nodes)
+        lengths_at = (self.depth + average_path_length(self.size)).ravel()
+
+        result = np.empty(data.shape[0], dtype=np.float64)
+        step = max(_ROUTING_BLOCK // n_trees, 1)
+        for start in range(0, data.shape[0], step):
+            block = np.ascontiguousarray(data[start : start + step])
+            cells = (np.arange(block.shape[0], dtype=np.int64) * self.n_features)[None, :]
+            nodes = np.broadcast_to(offsets, (n_trees, block.shape[0])).copy()
+            for _ in range(self.max_depth):
+                features = feature.take(nodes)
+                internal = features >= 0
+                if not internal.any():
+                    break
+                values = block.ravel().take(cells + np.maximum(features, 0))
+                children = np.where(values < threshold.take(nodes), left.take(nodes), right.take(nodes))
+                nodes = np.where(internal, children, nodes)
+            result[start : start + step] = lengths_at.take(nodes).mean(axis=0)
+        return result
+
+    def score(self, data: np.ndarray) -> np.ndarray:
+        """Anomaly score in ``(0, 1]``; values close to 1 are easy to isolate."""
+
+        normalizer = average_path_length(self.effective_sample_size)
+        with timed(DATA_QUALITY, "IsolationForest", len(data)):
+            return np.power(2.0, -self.path_lengths(data) / normalizer)
+
+    def flag(self, data: np.ndarray, threshold: float = 0.6) -> np.ndarray:
+        """Boolean mask of samples whose score exceeds ``threshold``."""
+
+        return self.score(data) > threshold
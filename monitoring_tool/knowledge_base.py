@@ -0,0 +1,235 @@
+"""Indexed, accent-insensitive and fuzzy lookup over the monitoring knowledge base."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Generic, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from .data import ProductionProblem, Technique, UseCase
+
+Entry = TypeVar("Entry")
+
+KIND_LABELS = {
+    "technique": "Técnica",
+    "problem": "Problema",
+    "use_case": "Caso de uso",
+}
+
+# Name matches weigh more than matches in signals, symptoms or KPIs.
+_FIELD_WEIGHTS = {"nome": 3.0}
+_DEFAULT_WEIGHT = 1.0
+_FUZZY_THRESHOLD = 0.5
+_FUZZY_MARGIN = 0.1
+_TOKEN = re.compile(r"\w+")
+
+
+class _CombiningMarks(dict):
+    """``str.translate`` table deleting combining marks, filled as characters appear."""
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        value = None if unicodedata.combining(chr(codepoint)) else codepoint
+        self[codepoint] = value
+        return value
+
+
+_STRIP_MARKS = _CombiningMarks()
+
+
+def normalize(text: str) -> str:
+    """Case-fold and strip accents so 'Detecção' and 'deteccao' compare equal."""
+
+    text = text.casefold()
+    if text.isascii():
+        return text.strip()
+    return unicodedata.normalize("NFKD", text).translate(_STRIP_MARKS).strip()
+
+
+def tokens(text: str) -> List[str]:
+    return _TOKEN.findall(normalize(text))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {normalize(text)} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+class TrigramIndex(Generic[Entry]):
+    """Fuzzy matcher: candidates share trigrams with the query, ranked by Dice score.
+
+    Only postings of the query's own trigrams are visited, so the cost follows the
+    query length and the trigram selectivity rather than the catalogue size.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._sizes: List[int] = []
+        self._values: List[Entry] = []
+
+    def add(self, key: str, value: Entry) -> None:
+        grams = trigrams(key)
+        identifier = len(self._values)
+        self._values.append(value)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(identifier)
+
+    def search(self, query: str, limit: int = 5, threshold: float = 0.3) -> List[Tuple[Entry, float]]:
+        grams = trigrams(query)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = [
+            (self._values[identifier], 2.0 * count / (len(grams) + self._sizes[identifier]))
+            for identifier, count in shared.items()
+        ]
+        scored = [item for item in scored if item[1] >= threshold]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One entry matched by a full-text query."""
+
+    kind: str
+    name: str
+    score: float
+    fields: Tuple[str, ...]
+
+    @property
+    def label(self) -> str:
+        return KIND_LABELS[self.kind]
+
+
+class _Catalogue(Generic[Entry]):
+    def __init__(self, entries: Sequence[Entry], missing: str) -> None:
+        self.missing = missing
+        self._entries = entries
+        # Lazy catalogues expose their names without decoding the entries.
+        names = getattr(entries, "names", None) or [entry.name for entry in entries]  # type: ignore[attr-defined]
+        self.positions: Dict[str, int] = {normalize(name): position for position, name in enumerate(names)}
+        self._names = names
+        self._fuzzy: Optional[TrigramIndex[str]] = None
+
+    @property
+    def fuzzy(self) -> TrigramIndex[str]:
+        # Only typos need the trigram index, so exact lookups never pay for it.
+        if self._fuzzy is None:
+            self._fuzzy = TrigramIndex[str]()
+            for name in self._names:
+                self._fuzzy.add(name, name)
+        return self._fuzzy
+
+    def get(self, name: str) -> Entry:
+        position = self.positions.get(normalize(name))
+        if position is not None:
+            return self._entries[position]
+        matches = self.fuzzy.search(name)
+        # Accept a fuzzy match only when it is good and clearly ahead of the runner-up.
+        runner_up = matches[1][1] if len(matches) > 1 else 0.0
+        if matches and matches[0][1] >= _FUZZY_THRESHOLD and matches[0][1] - runner_up >= _FUZZY_MARGIN:
+            return self._entries[self.positions[normalize(matches[0][0])]]
+        if matches:
+            suggestions = ", ".join(match for match, _ in matches)
+            raise ValueError(f"{self.missing.format(name=name)} Sugestões: {suggestions}")
+        raise ValueError(f"{self.missing.format(name=name)} Use o comando 'list' para ver as opções.")
+
+
+class KnowledgeBase:
+    """Lookup tables and an inverted index built once over the catalogue.
+
+    Names resolve through case- and accent-insensitive dictionaries, with a trigram
+    fallback for typos; only the requested entry is decoded. Full-text search
+    indexes names, monitoring signals, algorithms, symptoms, causes and KPIs.
+    """
+
+    def __init__(
+        self,
+        techniques: Sequence[Technique],
+        problems: Sequence[ProductionProblem],
+        use_cases: Sequence[UseCase],
+    ) -> None:
+        self.techniques = _Catalogue(techniques, "Técnica '{name}' não encontrada.")
+        self.problems = _Catalogue(problems, "Problema '{name}' não encontrado.")
+        self.use_cases = _Catalogue(use_cases, "Caso de uso '{name}' não encontrado.")
+        self._sources = (techniques, problems, use_cases)
+        self._postings: Dict[str, Dict[Tuple[str, str], Dict[str, float]]] = defaultdict(dict)
+        self._vocabulary = TrigramIndex[str]()
+        self._indexed = False
+
+    def _build_index(self) -> None:
+        # Full-text search needs every entry decoded, so it is indexed on first use.
+        techniques, problems, use_cases = self._sources
+        self._token_cache: Dict[str, List[str]] = {}
+        for technique in techniques:
+            self._index("technique", technique.name, {
+                "nome": [technique.name],
+                "sinais": technique.monitoring_signals,
+                "algoritmos": [algorithm.name for algorithm in technique.algorithms],
+                "objetivo": [technique.objective],
+            })
+        for problem in problems:
+            self._index("problem", problem.name, {
+                "nome": [problem.name],
+                "sintomas": problem.symptoms,
+                "causas": problem.causes,
+                "detecção": problem.detection_methods,
+            })
+        for use_case in use_cases:
+            self._index("use_case", use_case.name, {
+                "nome": [use_case.name],
+                "KPIs": use_case.example_kpis,
+                "foco": use_case.monitoring_focus,
+                "riscos": use_case.risks,
+            })
+        for token in self._postings:
+            self._vocabulary.add(token, token)
+        self._indexed = True
+        del self._token_cache
+
+    def _index(self, kind: str, name: str, fields: Dict[str, Sequence[str]]) -> None:
+        for field_name, texts in fields.items():
+            weight = _FIELD_WEIGHTS.get(field_name, _DEFAULT_WEIGHT)
+            for text in texts:
+                # Large catalogues repeat the same signals and KPIs across entries.
+                text_tokens = self._token_cache.get(text)
+                if text_tokens is None:
+                    text_tokens = self._token_cache[text] = tokens(text)
+                for token in text_tokens:
+                    hits = self._postings[token].setdefault((kind, name), {})
+                    hits[field_name] = max(hits.get(field_name, 0.0), weight)
+
+    def technique(self, name: str) -> Technique:
+        return self.techniques.get(name)
+
+    def problem(self, name: str) -> ProductionProblem:
+        return self.problems.get(name)
+
+    def use_case(self, name: str) -> UseCase:
+        return self.use_cases.get(name)
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[Sequence[str]] = None) -> List[SearchHit]:
+        """Rank entries by how many query terms they contain, tolerating typos."""
+
+        if not self._indexed:
+            self._build_index()
+        scores: Dict[Tuple[str, str], float] = defaultdict(float)
+        matched_fields: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        for term in tokens(query):
+            candidates = [(term, 1.0)] if term in self._postings else self._vocabulary.search(
+                term, limit=3, threshold=_FUZZY_THRESHOLD
+            )
+            for token, similarity in candidates:
+                for key, fields in self._postings[token].items():
+                    scores[key] += similarity * max(fields.values())
+                    matched_fields[key].update(fields)
+        hits = [
+            SearchHit(kind, name, score, tuple(sorted(matched_fields[(kind, name)])))
+            for (kind, name), score in scores.items()
+            if kinds is None or kind in kinds
+        ]
+        hits.sort(key=lambda hit: (-hit.score, hit.name))
+        return hits[:limit]
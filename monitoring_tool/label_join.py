@@ -0,0 +1,441 @@
+"""Join delayed labels to the predictions they belong to, with TTL eviction.
+
+Outstanding predictions are indexed by the 64-bit hash of their ID in an
+open-addressing table made of three flat NumPy arrays (hash, time, prediction),
+about 50 bytes per prediction instead of a dict of objects. Inserts, lookups and
+deletes run a whole batch at once, one vectorized probe step per round.
+
+When ``max_in_memory`` is set, the oldest predictions are spilled to segment files
+under ``spill_dir``: each segment is sorted by hash and memory-mapped, so a label
+lookup costs one binary search per segment and only touches the pages it reads.
+Predictions older than ``ttl`` are evicted from both tiers; a segment file is
+deleted as soon as all of its predictions have expired.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from .instrumentation import PERFORMANCE, timed
+from .sketches import hash_keys
+
+# Hash values 0 and 1 mark empty and deleted slots; real hashes are remapped above.
+_EMPTY = np.uint64(0)
+_DELETED = np.uint64(1)
+_RESERVED = np.uint64(2)
+_MAX_LOAD = 0.5
+_INITIAL_CAPACITY = 1 << 16
+# Expired predictions are swept once the oldest one is this fraction of the TTL
+# past its expiry, so the sweep is amortized over many batches. Lookups ignore
+# expired predictions in the meantime.
+_EVICTION_SLACK = 1.0 / 16.0
+
+SEGMENT_DTYPE = np.dtype([("key", "<u8"), ("time", "<f8"), ("prediction", "<f8"), ("alive", "u1")])
+
+
+def _id_hashes(ids: Sequence[object]) -> np.ndarray:
+    hashed = hash_keys(np.asarray(ids).ravel())
+    # Two IDs are confused only when their 64-bit hashes collide.
+    return np.where(hashed < _RESERVED, hashed + _RESERVED, hashed)
+
+
+def _last_occurrence(keys: np.ndarray) -> np.ndarray:
+    """Positions of the last occurrence of each distinct key, in input order."""
+
+    _, reversed_first = np.unique(keys[::-1], return_index=True)
+    return np.sort(keys.size - 1 - reversed_first)
+
+
+def _first_occurrence(keys: np.ndarray) -> np.ndarray:
+    _, first = np.unique(keys, return_index=True)
+    return np.sort(first)
+
+
+@dataclass(frozen=True)
+class JoinedBatch:
+    """Predictions matched with their labels, in the order the labels arrived."""
+
+    prediction_time: np.ndarray
+    label_time: np.ndarray
+    prediction: np.ndarray
+    label: np.ndarray
+
+    def __len__(self) -> int:
+        return self.label.size
+
+    @property
+    def delay(self) -> np.ndarray:
+        """Seconds between each prediction and its label."""
+
+        return self.label_time - self.prediction_time
+
+    def decisions(self, threshold: float = 0.5) -> np.ndarray:
+        return (self.prediction >= threshold).astype(np.float64)
+
+    def errors(self, threshold: float = 0.5) -> np.ndarray:
+        """0/1 misclassification stream, as consumed by the concept drift detectors."""
+
+        return (self.decisions(threshold) != (self.label == 1.0)).astype(np.float64)
+
+
+Sink = Callable[[JoinedBatch], None]
+
+
+def concept_drift_sink(detector: object, decision_threshold: float = 0.5) -> Sink:
+    """Feed joined errors to a :class:`~monitoring_tool.concept_drift.DDM` or ``ADWIN``."""
+
+    def sink(batch: JoinedBatch) -> None:
+        detector.update_batch(batch.errors(decision_threshold))
+
+    return sink
+
+
+def performance_sink(accumulator: object, decision_threshold: Optional[float] = 0.5) -> Sink:
+    """Feed joined pairs to a :class:`~monitoring_tool.bootstrap.PoissonBootstrap` or
+    a :mod:`~monitoring_tool.performance` accumulator.
+
+    The :mod:`~monitoring_tool.performance` accumulators always receive the raw
+    predictions: :class:`~monitoring_tool.performance.ClassificationMetrics` applies
+    its own threshold and needs the scores for ROC-AUC and PR-AUC. Other
+    accumulators receive 0/1 decisions at ``decision_threshold``, or the raw
+    predictions when it is ``None``.
+    """
+
+    from .performance import ClassificationMetrics, RegressionMetrics
+
+    raw = decision_threshold is None or isinstance(accumulator, (ClassificationMetrics, RegressionMetrics))
+
+    def sink(batch: JoinedBatch) -> None:
+        predicted = batch.prediction if raw else batch.decisions(decision_threshold)
+        accumulator.update(batch.label, predicted)
+
+    return sink
+
+
+class _HashTable:
+    """Linear-probing table over flat arrays, updated a batch at a time."""
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY) -> None:
+        self._allocate(1 << max(int(capacity) - 1, 1).bit_length())
+
+    def _allocate(self, capacity: int) -> None:
+        self.keys = np.zeros(capacity, dtype=np.uint64)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.predictions = np.zeros(capacity, dtype=np.float64)
+        self.live = 0
+        self.deleted = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.keys.size
+
+    def find(self, keys: np.ndarray) -> np.ndarray:
+        """Slot holding each key, or -1."""
+
+        mask = np.uint64(self.capacity - 1)
+        slots = np.full(keys.size, -1, dtype=np.int64)
+        pending = np.arange(keys.size)
+        for probe in itertools.count():
+            if not pending.size:
+                break
+            candidate = ((keys[pending] + np.uint64(probe)) & mask).astype(np.int64)
+            stored = self.keys[candidate]
+            found = stored == keys[pending]
+            slots[pending[found]] = candidate[found]
+            # Deleted slots do not end a probe sequence; empty ones do.
+            pending = pending[~found & (stored != _EMPTY)]
+        return slots
+
+    def insert(self, keys: np.ndarray, times: np.ndarray, predictions: np.ndarray) -> None:
+        """Insert or overwrite; ``keys`` must be distinct."""
+
+        slots = self.find(keys)
+        existing = slots >= 0
+        self.times[slots[existing]] = times[existing]
+        self.predictions[slots[existing]] = predictions[existing]
+        fresh = np.flatnonzero(~existing)
+        if not fresh.size:
+            return
+        if self.live + self.deleted + fresh.size > _MAX_LOAD * self.capacity:
+            capacity = self.capacity
+            while self.live + fresh.size > _MAX_LOAD * capacity:
+                capacity *= 2
+            self._rehash(capacity)
+        # None of these keys is present, so the first free slot of each sequence is theirs.
+        mask = np.uint64(self.capacity - 1)
+        pending = fresh
+        for probe in itertools.count():
+            if not pending.size:
+                break
+            candidate = ((keys[pending] + np.uint64(probe)) & mask).astype(np.int64)
+            free = self.keys[candidate] < _RESERVED
+            # Several keys may reach the same free slot in one round: the first wins.
+            contenders = np.flatnonzero(free)
+            _, winners = np.unique(candidate[contenders], return_index=True)
+            won = contenders[winners]
+            claimed = candidate[won]
+            self.deleted -= int((self.keys[claimed] == _DELETED).sum())
+            self.keys[claimed] = keys[pending[won]]
+            self.times[claimed] = times[pending[won]]
+            self.predictions[claimed] = predictions[pending[won]]
+            self.live += won.size
+            still = np.ones(pending.size, dtype=bool)
+            still[won] = False
+            pending = pending[still]
+
+    def delete(self, slots: np.ndarray) -> None:
+        self.keys[slots] = _DELETED
+        self.live -= slots.size
+        self.deleted += slots.size
+
+    def occupied(self) -> np.ndarray:
+        return np.flatnonzero(self.keys >= _RESERVED)
+
+    def compact_if_needed(self) -> None:
+        if self.deleted > self.capacity // 4:
+            self._rehash(self.capacity)
+
+    def _rehash(self, capacity: int) -> None:
+        slots = self.occupied()
+        keys, times, predictions = self.keys[slots], self.times[slots], self.predictions[slots]
+        self._allocate(capacity)
+        self.insert(keys, times, predictions)
+
+
+class _Segment:
+    """Spilled predictions sorted by hash, memory-mapped from ``path``."""
+
+    def __init__(self, path: Path, keys: np.ndarray, times: np.ndarray, predictions: np.ndarray) -> None:
+        order = np.argsort(keys, kind="stable")
+        self.path = path
+        self.records = np.memmap(path, dtype=SEGMENT_DTYPE, mode="w+", shape=(keys.size,))
+        self.records["key"] = keys[order]
+        self.records["time"] = times[order]
+        self.records["prediction"] = predictions[order]
+        self.records["alive"] = 1
+        self.records.flush()
+        self.newest = float(times.max())
+        self.live = keys.size
+
+    def find(self, keys: np.ndarray) -> np.ndarray:
+        """Record index of each key still alive here, or -1."""
+
+        stored = self.records["key"]
+        positions = np.minimum(np.searchsorted(stored, keys), stored.size - 1)
+        hit = (stored[positions] == keys) & (self.records["alive"][positions] == 1)
+        return np.where(hit, positions, -1)
+
+    def discard(self, keys: np.ndarray) -> None:
+        positions = self.find(keys)
+        positions = positions[positions >= 0]
+        self.records["alive"][positions] = 0
+        self.live -= positions.size
+
+    def remove(self) -> None:
+        del self.records
+        self.path.unlink(missing_ok=True)
+
+
+class LabelJoiner:
+    """Match labels that arrive late to the outstanding predictions with the same ID.
+
+    ``ttl`` is in the same unit as the timestamps (seconds for epoch times). The
+    joiner's clock is the newest timestamp it has seen, so replaying old logs
+    expires predictions as they would have expired live. Every joined batch is
+    passed to each of ``sinks``, e.g. :func:`concept_drift_sink`.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        sinks: Sequence[Sink] = (),
+        max_in_memory: Optional[int] = None,
+        spill_dir: Optional[Path | str] = None,
+        capacity: int = _INITIAL_CAPACITY,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("O TTL deve ser positivo.")
+        if max_in_memory is not None and spill_dir is None:
+            raise ValueError("Limitar as previsões em memória exige um diretório de spill.")
+        self.ttl = float(ttl)
+        self.sinks = list(sinks)
+        self.max_in_memory = max_in_memory
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.clock = -np.inf
+        self._table = _HashTable(capacity)
+        self._segments: List[_Segment] = []
+        self._segment_ids = itertools.count()
+        self._oldest = np.inf
+        self.matched = 0
+        self.expired = 0
+        self.unmatched_labels = 0
+
+    def __len__(self) -> int:
+        return self._table.live + self.spilled
+
+    @property
+    def spilled(self) -> int:
+        return sum(segment.live for segment in self._segments)
+
+    def _advance(self, times: np.ndarray) -> None:
+        if times.size:
+            self.clock = max(self.clock, float(times.max()))
+        if self.clock - self.ttl > self._oldest + self.ttl * _EVICTION_SLACK:
+            self.evict()
+
+    def add_predictions(
+        self, ids: Sequence[object], predictions: Sequence[float], times: Sequence[float]
+    ) -> None:
+        """Index a batch of predictions; a repeated ID replaces the earlier prediction."""
+
+        keys = _id_hashes(ids)
+        predictions = np.asarray(predictions, dtype=np.float64).ravel()
+        times = np.asarray(times, dtype=np.float64).ravel()
+        if not keys.size == predictions.size == times.size:
+            raise ValueError("IDs, previsões e tempos devem ter o mesmo tamanho.")
+        with timed(PERFORMANCE, "LabelJoiner.add_predictions", keys.size):
+            keep = _last_occurrence(keys)
+            keys, predictions, times = keys[keep], predictions[keep], times[keep]
+            # A spilled copy of a repeated ID must not be joined after the new one.
+            for segment in self._segments:
+                segment.discard(keys)
+            self._table.insert(keys, times, predictions)
+            if times.size:
+                self._oldest = min(self._oldest, float(times.min()))
+            self._advance(times)
+            if self.max_in_memory is not None and self._table.live > self.max_in_memory:
+                self._spill()
+
+    def add_labels(
+        self, ids: Sequence[object], labels: Sequence[float], times: Optional[Sequence[float]] = None
+    ) -> JoinedBatch:
+        """Join a batch of labels, hand the pairs to the sinks and forget the predictions.
+
+        Labels without an outstanding prediction (never seen, already joined or
+        expired) are counted in ``unmatched_labels`` and dropped.
+        """
+
+        keys = _id_hashes(ids)
+        labels = np.asarray(labels, dtype=np.float64).ravel()
+        if keys.size != labels.size:
+            raise ValueError("IDs e rótulos devem ter o mesmo tamanho.")
+        if times is None:
+            label_times = np.full(keys.size, self.clock if np.isfinite(self.clock) else 0.0)
+        else:
+            label_times = np.asarray(times, dtype=np.float64).ravel()
+        self._advance(label_times)
+
+        with timed(PERFORMANCE, "LabelJoiner.add_labels", keys.size):
+            # A repeated ID in one batch joins once, with its first label.
+            received = keys.size
+            first = _first_occurrence(keys)
+            keys, labels, label_times = keys[first], labels[first], label_times[first]
+            horizon = self.clock - self.ttl
+            prediction_time = np.full(keys.size, np.nan)
+            prediction = np.full(keys.size, np.nan)
+
+            slots = self._table.find(keys)
+            hit = np.flatnonzero(slots >= 0)
+            hit = hit[self._table.times[slots[hit]] >= horizon]
+            prediction_time[hit] = self._table.times[slots[hit]]
+            prediction[hit] = self._table.predictions[slots[hit]]
+            self._table.delete(slots[hit])
+
+            for segment in reversed(self._segments):
+                pending = np.flatnonzero(np.isnan(prediction_time))
+                if not pending.size:
+                    break
+                positions = segment.find(keys[pending])
+                found = positions >= 0
+                pending, positions = pending[found], positions[found]
+                records = segment.records[positions]
+                fresh = records["time"] >= horizon
+                pending, positions, records = pending[fresh], positions[fresh], records[fresh]
+                prediction_time[pending] = records["time"]
+                prediction[pending] = records["prediction"]
+                segment.records["alive"][positions] = 0
+                segment.live -= positions.size
+
+            joined = ~np.isnan(prediction_time)
+            self.matched += int(joined.sum())
+            self.unmatched_labels += received - int(joined.sum())
+            batch = JoinedBatch(prediction_time[joined], label_times[joined], prediction[joined], labels[joined])
+            self._table.compact_if_needed()
+        if len(batch):
+            for sink in self.sinks:
+                sink(batch)
+        return batch
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop predictions older than ``now - ttl`` (default: the joiner's clock)."""
+
+        if now is not None:
+            self.clock = max(self.clock, float(now))
+        horizon = self.clock - self.ttl
+        slots = self._table.occupied()
+        times = self._table.times[slots]
+        expired = slots[times < horizon]
+        self._table.delete(expired)
+        self._table.compact_if_needed()
+        dropped = expired.size
+        kept: List[_Segment] = []
+        for segment in self._segments:
+            if segment.newest < horizon:
+                dropped += segment.live
+                segment.remove()
+            else:
+                kept.append(segment)
+        self._segments = kept
+        remaining = times[times >= horizon]
+        # A segment is dropped as a whole, once its newest prediction has expired;
+        # the older ones it holds meanwhile are skipped at lookup.
+        self._oldest = min(
+            [float(remaining.min()) if remaining.size else np.inf]
+            + [segment.newest for segment in self._segments]
+        )
+        self.expired += dropped
+        return dropped
+
+    def _spill(self) -> None:
+        """Move the oldest half of the in-memory predictions to a new segment."""
+
+        slots = self._table.occupied()
+        times = self._table.times[slots]
+        count = slots.size - self.max_in_memory // 2
+        oldest = slots[np.argpartition(times, count - 1)[:count]]
+        path = self.spill_dir / f"predictions-{next(self._segment_ids):06d}.seg"
+        self._segments.append(
+            _Segment(path, self._table.keys[oldest], self._table.times[oldest], self._table.predictions[oldest])
+        )
+        self._table.delete(oldest)
+        self._table.compact_if_needed()
+
+    def stats(self) -> dict:
+        return {
+            "in_memory": self._table.live,
+            "spilled": self.spilled,
+            "segments": len(self._segments),
+            "matched": self.matched,
+            "expired": self.expired,
+            "unmatched_labels": self.unmatched_labels,
+        }
+
+    def close(self) -> None:
+        """Delete the spill segments; outstanding predictions are discarded."""
+
+        for segment in self._segments:
+            segment.remove()
+        self._segments = []
+
+    def __enter__(self) -> "LabelJoiner":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
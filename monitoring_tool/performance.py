@@ -0,0 +1,204 @@
+"""Fixed-memory, mergeable accumulators for classification and regression metrics.
+
+Each accumulator keeps a few counters instead of the predictions, so it can be
+updated batch by batch, merged across workers or windows, and queried at any
+time. ROC-AUC and PR-AUC come from per-class histograms of the scores over fixed
+bins: scores sharing a bin count as ties, which bounds the error by the share of
+pairs falling in the same bin (under 0.1% with the default 1,000 bins).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Confusion counters at the decision threshold.
+_TP, _FP, _TN, _FN = range(4)
+
+
+def _pairs(y_true: np.ndarray, y_pred: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    y_true = np.asarray(y_true, dtype=np.float64).ravel()
+    y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+    if y_true.shape != y_pred.shape:
+        raise ValueError("y_true e y_pred devem ter o mesmo tamanho.")
+    # Rows with a missing label or prediction (e.g. labels still to arrive) are skipped.
+    valid = ~np.isnan(y_true) & ~np.isnan(y_pred)
+    return y_true[valid], y_pred[valid]
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return float(numerator / denominator) if denominator > 0 else float("nan")
+
+
+class ClassificationMetrics:
+    """Confusion counts at ``threshold`` plus score histograms for each class.
+
+    ``y_true`` is binary with ``1`` as the positive class; ``y_score`` is a score or
+    probability in ``score_range`` (values outside are clipped into the end bins).
+    """
+
+    def __init__(
+        self, n_bins: int = 1000, threshold: float = 0.5, score_range: Tuple[float, float] = (0.0, 1.0)
+    ) -> None:
+        if n_bins < 2:
+            raise ValueError("O histograma de scores exige pelo menos 2 faixas.")
+        low, high = score_range
+        if not high > low:
+            raise ValueError("A faixa de scores deve ter o limite superior maior que o inferior.")
+        self.n_bins = n_bins
+        self.threshold = float(threshold)
+        self.score_range = (float(low), float(high))
+        self.confusion = np.zeros(4, dtype=np.int64)
+        # Row 0 holds the negatives, row 1 the positives.
+        self.histogram = np.zeros((2, n_bins), dtype=np.int64)
+
+    def update(self, y_true: np.ndarray, y_score: np.ndarray) -> None:
+        """Add a batch of labels and scores."""
+
+        y_true, y_score = _pairs(y_true, y_score)
+        if y_true.size == 0:
+            return
+        actual = y_true == 1.0
+        predicted = y_score >= self.threshold
+        cell = np.where(predicted, np.where(actual, _TP, _FP), np.where(actual, _FN, _TN))
+        self.confusion += np.bincount(cell, minlength=4)
+        low, high = self.score_range
+        bins = np.clip(((y_score - low) / (high - low) * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.histogram += np.bincount(actual * self.n_bins + bins, minlength=2 * self.n_bins).reshape(2, -1)
+
+    def merge(self, other: "ClassificationMetrics") -> None:
+        """Add the counts of an accumulator built on another shard or window."""
+
+        if (other.n_bins, other.threshold, other.score_range) != (self.n_bins, self.threshold, self.score_range):
+            raise ValueError("Acumuladores com faixas ou limiar de decisão diferentes.")
+        self.confusion += other.confusion
+        self.histogram += other.histogram
+
+    def reset(self) -> None:
+        self.confusion[:] = 0
+        self.histogram[:] = 0
+
+    @property
+    def count(self) -> int:
+        return int(self.confusion.sum())
+
+    @property
+    def accuracy(self) -> float:
+        return _ratio(self.confusion[_TP] + self.confusion[_TN], self.count)
+
+    @property
+    def precision(self) -> float:
+        return _ratio(self.confusion[_TP], self.confusion[_TP] + self.confusion[_FP])
+
+    @property
+    def recall(self) -> float:
+        return _ratio(self.confusion[_TP], self.confusion[_TP] + self.confusion[_FN])
+
+    @property
+    def f1(self) -> float:
+        tp, fp, fn = self.confusion[_TP], self.confusion[_FP], self.confusion[_FN]
+        return _ratio(2 * tp, 2 * tp + fp + fn)
+
+    @property
+    def roc_auc(self) -> float:
+        """Probability that a positive outscores a negative, ties within a bin halved."""
+
+        negatives, positives = self.histogram.astype(np.float64)
+        n_negative, n_positive = negatives.sum(), positives.sum()
+        # Positives strictly above each bin, scanning from the highest scores.
+        above = np.cumsum(positives[::-1])[::-1] - positives
+        return _ratio(float(np.dot(negatives, above + 0.5 * positives)), n_negative * n_positive)
+
+    @property
+    def pr_auc(self) -> float:
+        """Average precision with every bin edge taken as a threshold."""
+
+        negatives, positives = self.histogram[:, ::-1].astype(np.float64)
+        n_positive = positives.sum()
+        if n_positive == 0:
+            return float("nan")
+        true_positives = np.cumsum(positives)
+        selected = true_positives + np.cumsum(negatives)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(selected > 0, true_positives / selected, 0.0)
+        return float(np.dot(precision, positives) / n_positive)
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "accuracy": self.accuracy,
+            "precision": self.precision,
+            "recall": self.recall,
+            "f1": self.f1,
+            "roc_auc": self.roc_auc,
+            "pr_auc": self.pr_auc,
+        }
+
+
+class RegressionMetrics:
+    """Running sums of errors and targets for RMSE, MAE, bias and R²."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        # Sums of error, squared error, absolute error, target and squared target.
+        self.sums = np.zeros(5, dtype=np.float64)
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray) -> None:
+        """Add a batch of targets and predictions."""
+
+        y_true, y_pred = _pairs(y_true, y_pred)
+        error = y_pred - y_true
+        self.count += y_true.size
+        self.sums += (error.sum(), np.dot(error, error), np.abs(error).sum(), y_true.sum(), np.dot(y_true, y_true))
+
+    def merge(self, other: "RegressionMetrics") -> None:
+        """Add the sums of an accumulator built on another shard or window."""
+
+        self.count += other.count
+        self.sums += other.sums
+
+    def reset(self) -> None:
+        self.count = 0
+        self.sums[:] = 0.0
+
+    @property
+    def rmse(self) -> float:
+        return float(np.sqrt(_ratio(self.sums[1], self.count)))
+
+    @property
+    def mae(self) -> float:
+        return _ratio(self.sums[2], self.count)
+
+    @property
+    def bias(self) -> float:
+        """Mean of ``y_pred - y_true``."""
+
+        return _ratio(self.sums[0], self.count)
+
+    @property
+    def r2(self) -> float:
+        total = self.sums[4] - self.sums[3] ** 2 / self.count if self.count else 0.0
+        return 1.0 - _ratio(self.sums[1], total)
+
+    def metrics(self) -> Dict[str, float]:
+        return {"count": self.count, "rmse": self.rmse, "mae": self.mae, "bias": self.bias, "r2": self.r2}
+
+
+def performance_metrics(
+    y_true: np.ndarray, y_pred: np.ndarray, decision_threshold: float = 0.5, n_bins: int = 1000
+) -> Optional[Dict[str, float]]:
+    """Classification metrics for 0/1 labels, regression metrics otherwise.
+
+    Returns ``None`` when no row has both a label and a prediction.
+    """
+
+    y_true, y_pred = _pairs(y_true, y_pred)
+    if y_true.size == 0:
+        return None
+    if np.isin(y_true, (0.0, 1.0)).all():
+        accumulator = ClassificationMetrics(n_bins, decision_threshold)
+    else:
+        accumulator = RegressionMetrics()
+    accumulator.update(y_true, y_pred)
+    return accumulator.metrics()
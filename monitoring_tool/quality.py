@@ -0,0 +1,273 @@
+"""Declarative data-quality rules evaluated in a single scan per column."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .tables import Chunk, null_mask
+
+
+@dataclass(frozen=True)
+class NotNull:
+    """At least ``min_ratio`` of the rows must be filled."""
+
+    column: str
+    min_ratio: float = 1.0
+
+
+@dataclass(frozen=True)
+class InRange:
+    """At least ``min_ratio`` of the filled values must lie in ``[min_value, max_value]``."""
+
+    column: str
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    min_ratio: float = 1.0
+
+
+@dataclass(frozen=True)
+class StatisticBetween:
+    """The column ``statistic`` (``min``, ``max`` or ``mean``) must lie within bounds."""
+
+    column: str
+    statistic: str
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class Unique:
+    """Filled values must not repeat, across every chunk of the table."""
+
+    column: str
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    """Filled values must exist among the keys of another table."""
+
+    column: str
+    reference_keys: Tuple[object, ...]
+    reference_name: str = "tabela de referência"
+
+
+Rule = Union[NotNull, InRange, StatisticBetween, Unique, ForeignKey]
+
+
+def _as_numbers(values: np.ndarray) -> np.ndarray:
+    """Filled values as ``float64``; text that is not a number becomes NaN."""
+
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64)
+    distinct, inverse = np.unique(values.astype(str), return_inverse=True)
+    parsed = np.empty(distinct.size, dtype=np.float64)
+    for index, text in enumerate(distinct.tolist()):
+        try:
+            parsed[index] = float(text)
+        except ValueError:
+            parsed[index] = np.nan
+    return parsed[inverse.ravel()]
+
+
+def _as_keys(values: np.ndarray) -> np.ndarray:
+    # Text and mixed columns are compared as strings so that every chunk sorts alike.
+    return values.astype(str) if values.dtype.kind in "OSU" else values
+
+
+_STATISTICS = ("min", "max", "mean")
+
+
+@dataclass(frozen=True)
+class RuleResult:
+    """Outcome of one rule after the whole table was scanned."""
+
+    rule: Rule
+    passed: bool
+    observed: float
+    message: str
+
+
+@dataclass(frozen=True)
+class QualityReport:
+    """Results of every rule, in the order they were declared."""
+
+    results: List[RuleResult]
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results)
+
+    def failures(self) -> List[RuleResult]:
+        return [result for result in self.results if not result.passed]
+
+    def to_text(self) -> str:
+        lines = [f"[{'OK' if result.passed else 'FALHA'}] {result.message}" for result in self.results]
+        return "\n".join(lines)
+
+
+@dataclass
+class _ColumnScan:
+    """Aggregates needed by every rule that touches one column."""
+
+    rules: List[Tuple[int, Rule]]
+    needs_numeric: bool = False
+    rows: int = 0
+    nulls: int = 0
+    filled: int = 0
+    non_numeric: int = 0
+    minimum: float = np.inf
+    maximum: float = -np.inf
+    total: float = 0.0
+    violations: Dict[int, int] = field(default_factory=dict)
+    seen: Optional[np.ndarray] = None
+    duplicates: int = 0
+    sorted_keys: Dict[int, np.ndarray] = field(default_factory=dict)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values)
+        missing = null_mask(values)
+        valid = values[~missing]
+        self.rows += values.size
+        self.nulls += int(missing.sum())
+        self.filled += valid.size
+        if valid.size == 0:
+            return
+
+        numeric = _as_numbers(valid) if self.needs_numeric else None
+        if numeric is not None:
+            is_number = ~np.isnan(numeric)
+            self.non_numeric += int(numeric.size - is_number.sum())
+            if is_number.any():
+                numbers = numeric[is_number]
+                self.minimum = min(self.minimum, float(numbers.min()))
+                self.maximum = max(self.maximum, float(numbers.max()))
+                self.total += float(numbers.sum())
+
+        # Every rule reuses the same null mask and converted buffer of this chunk.
+        for index, rule in self.rules:
+            if isinstance(rule, InRange):
+                # Text that is not a number is never within the range.
+                outside = np.isnan(numeric)
+                if rule.min_value is not None:
+                    outside |= numeric < rule.min_value
+                if rule.max_value is not None:
+                    outside |= numeric > rule.max_value
+                self.violations[index] = self.violations.get(index, 0) + int(outside.sum())
+            elif isinstance(rule, ForeignKey):
+                keys = self.sorted_keys[index]
+                values = _as_keys(valid)
+                if (keys.dtype.kind == "U") != (values.dtype.kind == "U"):
+                    # Numeric column against text keys or the reverse: compare as numbers.
+                    # The column keeps its type across chunks, so the keys convert once.
+                    keys = self.sorted_keys[index] = np.unique(_as_numbers(keys))
+                    values = _as_numbers(valid)
+                positions = np.clip(np.searchsorted(keys, values), 0, max(keys.size - 1, 0))
+                found = keys[positions] == values if keys.size else np.zeros(valid.size, dtype=bool)
+                self.violations[index] = self.violations.get(index, 0) + int((~found).sum())
+            elif isinstance(rule, Unique):
+                self._track_unique(valid)
+
+    def _track_unique(self, valid: np.ndarray) -> None:
+        distinct, counts = np.unique(_as_keys(valid), return_counts=True)
+        self.duplicates += int((counts - 1).sum())
+        if self.seen is None:
+            self.seen = distinct
+            return
+        if (self.seen.dtype.kind == "U") != (distinct.dtype.kind == "U"):
+            # Numbers met text in an in-memory table: keep comparing as strings.
+            self.seen = self.seen.astype(str)
+            distinct = np.unique(distinct.astype(str))
+        self.duplicates += int(np.isin(distinct, self.seen, assume_unique=True).sum())
+        self.seen = np.union1d(self.seen, distinct)
+
+
+class RuleSet:
+    """Compiled set of rules, grouped so each column is read once per chunk.
+
+    Use :meth:`validate` for an in-memory table or :meth:`validate_chunks` to stream
+    a larger-than-memory file through :func:`monitoring_tool.tables.iter_table_chunks`.
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = list(rules)
+        for rule in self.rules:
+            if not isinstance(rule, (NotNull, InRange, StatisticBetween, Unique, ForeignKey)):
+                raise ValueError(f"Regra não suportada: {rule!r}")
+            if isinstance(rule, StatisticBetween) and rule.statistic not in _STATISTICS:
+                raise ValueError(f"Estatística '{rule.statistic}' não suportada. Opções: {', '.join(_STATISTICS)}")
+
+    @property
+    def columns(self) -> List[str]:
+        return list(dict.fromkeys(rule.column for rule in self.rules))
+
+    def _compile(self) -> Dict[str, _ColumnScan]:
+        scans: Dict[str, _ColumnScan] = {}
+        for index, rule in enumerate(self.rules):
+            scan = scans.setdefault(rule.column, _ColumnScan(rules=[]))
+            scan.rules.append((index, rule))
+            scan.needs_numeric |= isinstance(rule, (InRange, StatisticBetween))
+            if isinstance(rule, ForeignKey):
+                scan.sorted_keys[index] = np.unique(_as_keys(np.asarray(rule.reference_keys)))
+        return scans
+
+    def validate(self, table: Chunk) -> QualityReport:
+        """Validate a table held in memory as ``{column: array}``."""
+
+        return self.validate_chunks([table])
+
+    def validate_chunks(self, chunks: Iterable[Chunk]) -> QualityReport:
+        """Validate a stream of chunks, keeping only per-column aggregates."""
+
+        scans = self._compile()
+        for chunk in chunks:
+            missing = [name for name in scans if name not in chunk]
+            if missing:
+                raise ValueError(f"Colunas ausentes nos dados: {', '.join(missing)}")
+            for name, scan in scans.items():
+                scan.update(chunk[name])
+        return QualityReport([self._evaluate(index, rule, scans[rule.column]) for index, rule in enumerate(self.rules)])
+
+    def _evaluate(self, index: int, rule: Rule, scan: _ColumnScan) -> RuleResult:
+        if isinstance(rule, NotNull):
+            ratio = scan.filled / scan.rows if scan.rows else 1.0
+            return RuleResult(
+                rule, ratio >= rule.min_ratio, ratio,
+                f"{rule.column}: {ratio:.2%} preenchido (mínimo {rule.min_ratio:.2%})",
+            )
+        if isinstance(rule, InRange):
+            ratio = 1.0 - scan.violations.get(index, 0) / scan.filled if scan.filled else 1.0
+            return RuleResult(
+                rule, ratio >= rule.min_ratio, ratio,
+                f"{rule.column}: {ratio:.2%} dentro de [{rule.min_value}, {rule.max_value}] "
+                f"(mínimo {rule.min_ratio:.2%})",
+            )
+        if isinstance(rule, StatisticBetween):
+            numbers = scan.filled - scan.non_numeric
+            observed = {
+                "min": scan.minimum,
+                "max": scan.maximum,
+                "mean": scan.total / numbers if numbers else np.nan,
+            }[rule.statistic]
+            passed = bool(
+                np.isfinite(observed)
+                and (rule.low is None or observed >= rule.low)
+                and (rule.high is None or observed <= rule.high)
+            )
+            return RuleResult(
+                rule, passed, observed,
+                f"{rule.column}: {rule.statistic} = {observed:.6g} (esperado entre {rule.low} e {rule.high})"
+                + (f"; {scan.non_numeric} valores não numéricos ignorados" if scan.non_numeric else ""),
+            )
+        if isinstance(rule, Unique):
+            return RuleResult(
+                rule, scan.duplicates == 0, float(scan.duplicates),
+                f"{rule.column}: {scan.duplicates} valores repetidos",
+            )
+        missing = scan.violations.get(index, 0)
+        return RuleResult(
+            rule, missing == 0, float(missing),
+            f"{rule.column}: {missing} valores sem correspondência em {rule.reference_name}",
+        )
@@ -0,0 +1,612 @@
+"""Asyncio monitoring service: ingest prediction logs and score them per window.
+
+Records arrive from tailed JSONL/CSV files or from a local Unix socket (JSONL).
+They are appended to columnar panes whose length is the greatest common divisor
+of every window size and slide; closing a pane emits the tumbling and sliding
+windows ending at that instant. Each window is scored in a process pool, so the
+event loop only parses lines and appends values.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import math
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Deque, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from .concept_drift import DDM
+from .drift import PSIReference
+from .fairness import FairnessMonitor
+from .instrumentation import (
+    BATCH_ROWS,
+    CONCEPT_DRIFT,
+    DATA_DRIFT,
+    DATA_QUALITY,
+    DROPPED_WINDOWS,
+    FAIRNESS,
+    PERFORMANCE,
+    QUEUE_DEPTH,
+    RECORDS,
+    REGISTRY,
+    start_metrics_server,
+    timed,
+)
+from .performance import performance_metrics
+from .quality import NotNull, RuleSet
+from .tables import Chunk, iter_table_chunks
+from .timeseries import SignalStore
+
+_READ_HINT = 1 << 20
+
+
+@dataclass(frozen=True)
+class WindowSpec:
+    """Window of ``size`` seconds emitted every ``slide`` seconds (tumbling if equal)."""
+
+    size: float
+    slide: float
+
+    @classmethod
+    def parse(cls, text: str) -> "WindowSpec":
+        """Parse ``SIZE`` (tumbling) or ``SIZE:SLIDE`` (sliding), in seconds."""
+
+        size_text, _, slide_text = text.partition(":")
+        try:
+            size = float(size_text)
+            slide = float(slide_text) if slide_text else size
+        except ValueError as exc:
+            raise ValueError(f"Janela inválida '{text}': use SEGUNDOS ou TAMANHO:PASSO.") from exc
+        if size <= 0 or slide <= 0 or slide > size:
+            raise ValueError(f"Janela inválida '{text}': o passo deve ser positivo e até o tamanho.")
+        return cls(size, slide)
+
+    @property
+    def name(self) -> str:
+        return f"{self.size:g}s" if self.slide == self.size else f"{self.size:g}s/{self.slide:g}s"
+
+
+@dataclass(frozen=True)
+class DetectorConfig:
+    """What the detectors read from each window and when they alert."""
+
+    features: Tuple[str, ...] = ()
+    prediction_column: Optional[str] = "prediction"
+    label_column: Optional[str] = "label"
+    group_column: Optional[str] = None
+    reference: Optional[PSIReference] = None
+    psi_threshold: float = 0.2
+    min_filled_ratio: float = 0.99
+    min_impact_ratio: float = 0.8
+    min_accuracy: Optional[float] = None
+    decision_threshold: float = 0.5
+
+    @property
+    def numeric_columns(self) -> Tuple[str, ...]:
+        optional = (self.prediction_column, self.label_column)
+        return (*self.features, *(name for name in optional if name))
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return (*self.numeric_columns, *((self.group_column,) if self.group_column else ()))
+
+
+def fit_reference(path: Path | str, features: Sequence[str], n_bins: int = 10) -> PSIReference:
+    """Fit PSI bins on the reference file (CSV or Parquet) for ``features``."""
+
+    chunks = list(iter_table_chunks(path, columns=features))
+    if not chunks:
+        raise ValueError(f"O arquivo de referência {path} está vazio.")
+    matrix = np.column_stack(
+        [np.concatenate([np.asarray(chunk[name], dtype=np.float64) for chunk in chunks]) for name in features]
+    )
+    return PSIReference.fit(matrix, n_bins, features)
+
+
+def score_window(config: DetectorConfig, batch: Chunk) -> Dict[str, object]:
+    """Run the drift, quality, performance and fairness detectors on one window."""
+
+    alerts: List[Dict[str, object]] = []
+    report: Dict[str, object] = {}
+    rows = len(next(iter(batch.values()), ()))
+
+    quality_rules = [NotNull(name, config.min_filled_ratio) for name in config.columns]
+    with timed(DATA_QUALITY, "RuleSet", rows):
+        quality = RuleSet(quality_rules).validate(batch)
+    report["quality"] = {result.rule.column: result.observed for result in quality.results}
+    alerts.extend(
+        {"technique": DATA_QUALITY, "detail": result.message} for result in quality.failures()
+    )
+
+    if config.reference is not None and config.features:
+        matrix = np.column_stack([batch[name] for name in config.features])
+        with timed(DATA_DRIFT, "PSIReference", rows):
+            psi = config.reference.score(matrix)
+        report["drift"] = {name: float(value) for name, value in zip(config.features, psi)}
+        alerts.extend(
+            {"technique": DATA_DRIFT, "detail": f"PSI de '{name}' = {value:.3f}"}
+            for name, value in zip(config.features, psi)
+            if value > config.psi_threshold
+        )
+
+    if not config.prediction_column:
+        report["alerts"] = alerts
+        return report
+    scores = batch[config.prediction_column]
+    decisions = (scores >= config.decision_threshold).astype(np.int8)
+    labels = batch[config.label_column] if config.label_column else np.full(scores.shape, np.nan)
+    with timed(PERFORMANCE, "performance_metrics", rows):
+        performance = performance_metrics(labels, scores, config.decision_threshold)
+    if performance is not None:
+        report["performance"] = {"labeled": performance.pop("count"), **performance}
+        accuracy = performance.get("accuracy")
+        if accuracy is not None and config.min_accuracy is not None and accuracy < config.min_accuracy:
+            alerts.append({"technique": PERFORMANCE, "detail": f"Acurácia {accuracy:.3f} abaixo de {config.min_accuracy}"})
+
+    if config.group_column:
+        with timed(FAIRNESS, "FairnessMonitor", rows):
+            monitor = FairnessMonitor()
+            monitor.update(batch[config.group_column].astype(str), decisions, labels)
+            fairness = monitor.report()
+        report["fairness"] = {
+            "demographic_parity_gap": fairness.demographic_parity_gap,
+            "equalized_odds_gap": fairness.equalized_odds_gap,
+            "selection_rate": dict(zip(map(str, fairness.groups), fairness.selection_rate.tolist())),
+        }
+        alerts.extend(
+            {"technique": FAIRNESS, "detail": f"Grupo '{group}' abaixo da razão de impacto {config.min_impact_ratio}"}
+            for group in fairness.below_impact_ratio(config.min_impact_ratio)
+        )
+    report["alerts"] = alerts
+    return report
+
+
+_worker_config: Optional[DetectorConfig] = None
+
+
+def _init_worker(config: DetectorConfig) -> None:
+    # The reference bins are shipped once per worker instead of once per window.
+    global _worker_config
+    _worker_config = config
+    # Forked workers inherit the parent's samples; drop them so they are not sent back.
+    REGISTRY.drain()
+
+
+def _score_in_worker(batch: Chunk) -> Tuple[Dict[str, object], Optional[Dict[str, dict]]]:
+    assert _worker_config is not None
+    report = score_window(_worker_config, batch)
+    # Metrics recorded in this process travel back with the report.
+    return report, REGISTRY.drain() if REGISTRY.enabled else None
+
+
+class _Pane:
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.columns: Dict[str, list] = {name: [] for name in names}
+        self.rows = 0
+
+    def to_chunk(self, numeric: Sequence[str]) -> Chunk:
+        chunk: Chunk = {}
+        for name, values in self.columns.items():
+            chunk[name] = np.array(values, dtype=np.float64 if name in numeric else object)
+        return chunk
+
+
+def _as_float(value: object) -> float:
+    if value is None or value == "":
+        return math.nan
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return math.nan
+
+
+@dataclass
+class WindowAssembler:
+    """Micro-batches records into panes and cuts tumbling/sliding windows from them.
+
+    Times are in seconds, either the ingestion clock or an event-time column; in
+    the latter case records older than the last closed pane are counted as late
+    and dropped.
+    """
+
+    specs: Sequence[WindowSpec]
+    columns: Sequence[str]
+    numeric_columns: Sequence[str]
+    pane: float = field(init=False)
+    late_records: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        if not self.specs:
+            raise ValueError("Informe pelo menos uma janela.")
+        # Work in milliseconds so that the pane length is an exact common divisor.
+        millis = [round(value * 1000) for spec in self.specs for value in (spec.size, spec.slide)]
+        self._pane_ms = math.gcd(*millis)
+        self.pane = self._pane_ms / 1000.0
+        self._numeric = set(self.numeric_columns)
+        self._open: Dict[int, _Pane] = {}
+        self._closed: Deque[Tuple[int, Chunk]] = deque(
+            maxlen=max(round(spec.size * 1000) // self._pane_ms for spec in self.specs)
+        )
+        # First pane still open; None until a pane has closed, so that records
+        # arriving out of order before that are never counted as late.
+        self._next_index: Optional[int] = None
+
+    def _pane_for(self, timestamp: float) -> Optional[_Pane]:
+        index = math.floor(timestamp / self.pane)
+        if self._next_index is not None and index < self._next_index:
+            self.late_records += 1
+            return None
+        pane = self._open.get(index)
+        if pane is None:
+            pane = self._open[index] = _Pane(self.columns)
+        return pane
+
+    def add(self, timestamp: float, record: Dict[str, object]) -> None:
+        pane = self._pane_for(timestamp)
+        if pane is None:
+            return
+        for name, values in pane.columns.items():
+            value = record.get(name)
+            values.append(_as_float(value) if name in self._numeric else value)
+        pane.rows += 1
+
+    def advance(self, now: float) -> List[Tuple[WindowSpec, float, float, Chunk]]:
+        """Close every pane ending at or before ``now`` and return the windows due."""
+
+        start = self._next_index if self._next_index is not None else min(self._open, default=None)
+        if start is None:
+            return []
+        if math.isfinite(now):
+            last = math.floor(now / self.pane)
+        else:
+            # Flush: close every open pane, then run on to the next boundary of every
+            # window so that the records of the last partial windows are scored too.
+            last = max(self._open, default=start) + 1
+            period = math.lcm(*(round(spec.slide * 1000) // self._pane_ms for spec in self.specs))
+            last = -(-last // period) * period
+        # After a long silence, skip the empty panes older than the longest window.
+        oldest_open = min(self._open, default=last)
+        start = max(start, min(oldest_open, last - (self._closed.maxlen or 1)))
+        if start >= last:
+            return []
+        windows = []
+        for index in range(start, last):
+            pane = self._open.pop(index, None)
+            self._closed.append((index, pane.to_chunk(self._numeric) if pane else self._empty()))
+            self._next_index = index + 1
+            end_ms = (index + 1) * self._pane_ms
+            for spec in self.specs:
+                size_ms, slide_ms = round(spec.size * 1000), round(spec.slide * 1000)
+                if end_ms % slide_ms:
+                    continue
+                first = (end_ms - size_ms) // self._pane_ms
+                parts = [chunk for pane_index, chunk in self._closed if pane_index >= first]
+                batch = {name: np.concatenate([part[name] for part in parts]) for name in self.columns}
+                if batch and len(next(iter(batch.values()))):
+                    windows.append((spec, (end_ms - size_ms) / 1000.0, end_ms / 1000.0, batch))
+        return windows
+
+    def _empty(self) -> Chunk:
+        return {
+            name: np.empty(0, dtype=np.float64 if name in self._numeric else object) for name in self.columns
+        }
+
+
+class MonitoringService:
+    """Tails sources, assembles windows and writes one JSON report per window."""
+
+    def __init__(
+        self,
+        config: DetectorConfig,
+        specs: Sequence[WindowSpec],
+        inputs: Sequence[Path | str] = (),
+        socket_path: Optional[Path | str] = None,
+        time_column: Optional[str] = None,
+        allowed_lateness: float = 0.0,
+        workers: Optional[int] = None,
+        output: Optional[TextIO] = None,
+        history: Optional[SignalStore] = None,
+        from_start: bool = False,
+        exit_at_eof: bool = False,
+        poll_interval: float = 0.2,
+        max_pending: int = 64,
+        metrics_port: Optional[int] = None,
+    ) -> None:
+        if not inputs and socket_path is None:
+            raise ValueError("Informe pelo menos um arquivo de log ou um socket.")
+        self.config = config
+        self.inputs = [Path(path) for path in inputs]
+        self.socket_path = socket_path
+        self.time_column = time_column
+        self.allowed_lateness = allowed_lateness
+        self.workers = workers or os.cpu_count() or 1
+        self.output = output or sys.stdout
+        self.history = history
+        self.from_start = from_start
+        self.exit_at_eof = exit_at_eof
+        self.poll_interval = poll_interval
+        self.metrics_port = metrics_port
+        columns = list(config.columns) + ([time_column] if time_column and time_column not in config.columns else [])
+        self.assembler = WindowAssembler(specs, columns, [*config.numeric_columns, *filter(None, [time_column])])
+        self.records = 0
+        self.dropped_windows = 0
+        self._ddm = DDM() if config.label_column and config.prediction_column else None
+        # Every row passes once through a tumbling window, so DDM sees each error once.
+        self._ddm_spec = next((spec for spec in specs if spec.slide == spec.size), None)
+        self._pending: "asyncio.Queue[Optional[Tuple[WindowSpec, float, float, Chunk]]]" = asyncio.Queue(max_pending)
+        self._event_time = -math.inf
+        self._stopping: Optional[asyncio.Event] = None
+
+    # -- ingestion -----------------------------------------------------------------
+
+    def _ingest(self, record: Dict[str, object]) -> None:
+        if self.time_column is not None:
+            timestamp = _as_float(record.get(self.time_column))
+            if math.isnan(timestamp):
+                return
+            self._event_time = max(self._event_time, timestamp)
+        else:
+            timestamp = time.time()
+        self.assembler.add(timestamp, record)
+        self.records += 1
+
+    def _ingest_lines(self, lines: List[str], parser: "_LineParser") -> None:
+        before = self.records
+        for line in lines:
+            record = parser.parse(line)
+            if record is not None:
+                self._ingest(record)
+        if REGISTRY.enabled:
+            RECORDS.inc(self.records - before)
+        if self.time_column is not None:
+            self._emit(self.assembler.advance(self._event_time - self.allowed_lateness))
+
+    async def _tail(self, path: Path) -> None:
+        handle: Optional[IO[bytes]] = None
+        parser = _LineParser(path.suffix.lower() == ".csv")
+        from_start = self.from_start
+        while not self._stopping.is_set():
+            if handle is None:
+                try:
+                    handle = open(path, "rb")
+                except FileNotFoundError:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                if not from_start:
+                    parser.skip_to_end(handle)
+            lines = handle.readlines(_READ_HINT)
+            if lines and not lines[-1].endswith(b"\n") and not self.exit_at_eof:
+                # Leave a partially written last line for the next read.
+                handle.seek(-len(lines.pop()), os.SEEK_CUR)
+            if lines:
+                self._ingest_lines([line.decode("utf-8", "replace") for line in lines], parser)
+                await asyncio.sleep(0)
+                continue
+            if self.exit_at_eof:
+                break
+            if _rotated(path, handle):
+                handle.close()
+                handle = None
+                parser = _LineParser(path.suffix.lower() == ".csv")
+                from_start = True
+                continue
+            await asyncio.sleep(self.poll_interval)
+        if handle is not None:
+            handle.close()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        parser = _LineParser(False)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._ingest_lines([line.decode("utf-8")], parser)
+        finally:
+            writer.close()
+
+    # -- windows and scoring ---------------------------------------------------------
+
+    def _emit(self, windows: List[Tuple[WindowSpec, float, float, Chunk]]) -> None:
+        for window in windows:
+            spec, _, _, batch = window
+            if self._ddm is not None and spec == self._ddm_spec:
+                self._update_concept_drift(window)
+            try:
+                self._pending.put_nowait(window)
+            except asyncio.QueueFull:
+                self.dropped_windows += 1
+                if REGISTRY.enabled:
+                    DROPPED_WINDOWS.inc(1, spec.name)
+        if REGISTRY.enabled:
+            QUEUE_DEPTH.set(self._pending.qsize(), "pending")
+
+    def _update_concept_drift(self, window: Tuple[WindowSpec, float, float, Chunk]) -> None:
+        spec, start, end, batch = window
+        labels = batch[self.config.label_column]
+        scores = batch[self.config.prediction_column]
+        labeled = ~np.isnan(labels) & ~np.isnan(scores)
+        if not labeled.any() or not np.isin(labels[labeled], (0.0, 1.0)).all():
+            return
+        errors = (scores[labeled] >= self.config.decision_threshold) != (labels[labeled] == 1.0)
+        with timed(CONCEPT_DRIFT, "DDM", errors.size):
+            drifts = self._ddm.update_batch(errors)
+        if drifts.size:
+            self._write(
+                {
+                    "type": "concept_drift",
+                    "technique": CONCEPT_DRIFT,
+                    "window": spec.name,
+                    "start": start,
+                    "end": end,
+                    "positions": drifts.tolist(),
+                }
+            )
+
+    async def _clock(self) -> None:
+        while not self._stopping.is_set():
+            await asyncio.sleep(min(self.assembler.pane / 4.0, 1.0))
+            self._emit(self.assembler.advance(time.time()))
+
+    async def _dispatch(self, executor: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        in_flight: set = set()
+        limit = asyncio.Semaphore(self.workers * 2)
+
+        async def score(spec: WindowSpec, start: float, end: float, batch: Chunk) -> None:
+            header = {"window": spec.name, "start": start, "end": end, "rows": len(next(iter(batch.values())))}
+            if REGISTRY.enabled:
+                BATCH_ROWS.observe(header["rows"], spec.name)
+            try:
+                report, metrics = await loop.run_in_executor(executor, _score_in_worker, batch)
+            except Exception as exc:  # noqa: BLE001 - one bad window must not stop the service
+                self._write({"type": "error", **header, "error": str(exc)})
+            else:
+                if metrics:
+                    REGISTRY.merge(metrics)
+                self._write({"type": "window", **header, **report})
+                if self.history is not None:
+                    self.history.record(end, dict(_signals(spec.name, report)))
+            finally:
+                limit.release()
+                if REGISTRY.enabled:
+                    QUEUE_DEPTH.set(len(in_flight) - 1, "in_flight")
+
+        while True:
+            window = await self._pending.get()
+            if window is None:
+                break
+            await limit.acquire()
+            task = asyncio.ensure_future(score(*window))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            if REGISTRY.enabled:
+                QUEUE_DEPTH.set(self._pending.qsize(), "pending")
+                QUEUE_DEPTH.set(len(in_flight), "in_flight")
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    def _write(self, payload: Dict[str, object]) -> None:
+        self.output.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        self.output.flush()
+
+    # -- lifecycle ---------------------------------------------------------------------
+
+    async def run(self, duration: Optional[float] = None) -> None:
+        """Serve until interrupted, ``duration`` elapses or (with ``exit_at_eof``) inputs end."""
+
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self._stopping.set)
+            except (NotImplementedError, RuntimeError):  # pragma: no cover - non-Unix loops
+                pass
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.config,)) as executor:
+            dispatcher = asyncio.ensure_future(self._dispatch(executor))
+            tasks = [asyncio.ensure_future(self._tail(path)) for path in self.inputs]
+            if self.time_column is None:
+                tasks.append(asyncio.ensure_future(self._clock()))
+            server = None
+            if self.socket_path is not None:
+                server = await asyncio.start_unix_server(self._handle_client, path=str(self.socket_path))
+            metrics_server = None
+            if self.metrics_port is not None:
+                metrics_server = await start_metrics_server(self.metrics_port)
+
+            readers = tasks[: len(self.inputs)]
+            stop = asyncio.ensure_future(self._stopping.wait())
+            waiters = [stop]
+            if duration is not None:
+                waiters.append(asyncio.ensure_future(asyncio.sleep(duration)))
+            if self.exit_at_eof and readers and server is None:
+                waiters.append(asyncio.ensure_future(asyncio.gather(*readers)))
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+
+            self._stopping.set()
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+                Path(self.socket_path).unlink(missing_ok=True)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for waiter in waiters:
+                waiter.cancel()
+            # Flush the panes still open so no ingested record is left unscored.
+            self._emit(self.assembler.advance(math.inf))
+            await self._pending.put(None)
+            await dispatcher
+            if metrics_server is not None:
+                metrics_server.close()
+                await metrics_server.wait_closed()
+        self._write(
+            {
+                "type": "summary",
+                "records": self.records,
+                "late_records": self.assembler.late_records,
+                "dropped_windows": self.dropped_windows,
+            }
+        )
+
+
+def _signals(prefix: str, report: Dict[str, object]) -> Iterator[Tuple[str, float]]:
+    """Flatten the numeric values of a window report into ``prefix/.../name`` signals."""
+
+    for key, value in report.items():
+        if key == "alerts":
+            continue
+        if isinstance(value, dict):
+            yield from _signals(f"{prefix}/{key}", value)
+        elif isinstance(value, (int, float)):
+            yield f"{prefix}/{key}", float(value)
+
+
+class _LineParser:
+    """Turns JSONL or CSV lines into dictionaries; malformed lines are skipped."""
+
+    def __init__(self, is_csv: bool) -> None:
+        self.is_csv = is_csv
+        self.header: Optional[List[str]] = None
+        self.malformed = 0
+
+    def skip_to_end(self, handle: IO[bytes]) -> None:
+        if self.is_csv:
+            self.header = next(csv.reader([handle.readline().decode("utf-8")]), None)
+        handle.seek(0, os.SEEK_END)
+
+    def parse(self, line: str) -> Optional[Dict[str, object]]:
+        if not line.strip():
+            return None
+        if self.is_csv:
+            row = next(csv.reader([line]))
+            if self.header is None:
+                self.header = row
+                return None
+            return dict(zip(self.header, row))
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            self.malformed += 1
+            return None
+        return record if isinstance(record, dict) else None
+
+
+def _rotated(path: Path, handle: IO[bytes]) -> bool:
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(handle.fileno())
+    return current.st_ino != opened.st_ino or current.st_size < handle.tell()
@@ -0,0 +1,143 @@
+"""Vectorized Monte Carlo version of the browser production simulator."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Hourly failure durations drawn by ``simulateUnplannedDowntime`` in app.js (minutes).
+FAILURE_MIN_MINUTES = 5.0
+FAILURE_SPAN_MINUTES = 20.0
+
+DEFAULT_PERCENTILES = (5.0, 50.0, 95.0)
+
+# Random cells (replications x days x shifts x hours) drawn per block.
+_DRAW_BLOCK = 1 << 22
+
+
+@dataclass(frozen=True)
+class ProductionParameters:
+    """Inputs of the simulator form, with the same defaults as ``readInputs()``."""
+
+    capacity: float = 100.0
+    shift_hours: float = 8.0
+    planned_downtime: float = 30.0
+    unplanned_probability: float = 15.0
+    quality_rate: float = 95.0
+    days: int = 7
+    shifts_per_day: int = 1
+    setup_time: float = 20.0
+
+    def validate(self) -> None:
+        if self.days < 1 or self.shifts_per_day < 1:
+            raise ValueError("Dias e turnos por dia devem ser pelo menos 1.")
+        if self.shift_hours <= 0 or self.capacity < 0:
+            raise ValueError("Horas por turno devem ser positivas e a capacidade não negativa.")
+        if not 0.0 <= self.unplanned_probability <= 100.0 or not 0.0 <= self.quality_rate <= 100.0:
+            raise ValueError("Probabilidade de parada e taxa de qualidade devem estar entre 0 e 100.")
+
+
+PARAMETER_NAMES = tuple(field.name for field in fields(ProductionParameters))
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Per-replication outcomes; every array has one entry per replication."""
+
+    parameters: ProductionParameters
+    total_good: np.ndarray
+    total_scrap: np.ndarray
+    total_downtime_minutes: np.ndarray
+    avg_daily_output: np.ndarray
+    per_shift_output: np.ndarray
+    utilization: np.ndarray
+    performance: np.ndarray
+    oee: np.ndarray
+    throughput_per_hour: np.ndarray
+
+    @property
+    def replications(self) -> int:
+        return self.oee.size
+
+    def percentiles(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, float]]:
+        """Mean and percentiles of every metric across replications."""
+
+        summary: Dict[str, Dict[str, float]] = {}
+        for name in ("oee", "utilization", "performance", "total_good", "total_scrap", "total_downtime_minutes"):
+            values = getattr(self, name)
+            stats = {"mean": float(values.mean())}
+            stats.update(
+                {f"p{value:g}": float(result) for value, result in zip(percentiles, np.percentile(values, percentiles))}
+            )
+            summary[name] = stats
+        return summary
+
+
+def _clamp(values: np.ndarray) -> np.ndarray:
+    return np.clip(values, 0.0, 1.0)
+
+
+def simulate(
+    parameters: ProductionParameters = ProductionParameters(),
+    replications: int = 10_000,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """Run ``replications`` independent copies of ``runSimulation`` at once.
+
+    Every hourly failure roll and duration of every shift, day and replication is
+    drawn in bulk from one seeded generator, in blocks that cap memory use.
+    """
+
+    parameters.validate()
+    if replications < 1:
+        raise ValueError("É necessário pelo menos 1 replicação.")
+    rng = np.random.default_rng(seed)
+
+    days = int(parameters.days)
+    shifts = int(parameters.shifts_per_day)
+    hours = max(int(np.floor(parameters.shift_hours)), 1)
+    minutes_per_shift = parameters.shift_hours * 60.0
+    base_runtime = minutes_per_shift - parameters.planned_downtime
+    quality = parameters.quality_rate / 100.0
+    probability = parameters.unplanned_probability / 100.0
+
+    total_good = np.empty(replications)
+    total_scrap = np.empty(replications)
+    total_downtime = np.empty(replications)
+    step = max(_DRAW_BLOCK // (days * shifts * hours), 1)
+    for start in range(0, replications, step):
+        count = min(step, replications - start)
+        shape = (count, days * shifts, hours)
+        failures = rng.random(shape) < probability
+        durations = FAILURE_MIN_MINUTES + rng.random(shape) * FAILURE_SPAN_MINUTES
+        unplanned = np.where(failures, durations, 0.0).sum(axis=2)
+        setup = np.where(unplanned > 0, parameters.setup_time, 0.0)
+
+        produced = np.maximum(base_runtime - unplanned, 0.0) / 60.0 * parameters.capacity
+        good = produced * quality
+        total_good[start : start + count] = good.sum(axis=1)
+        total_scrap[start : start + count] = np.maximum(produced - good, 0.0).sum(axis=1)
+        total_downtime[start : start + count] = (parameters.planned_downtime + unplanned + setup).sum(axis=1)
+
+    total_shifts = days * shifts
+    per_shift_output = total_good / total_shifts
+    total_runtime = total_shifts * minutes_per_shift
+    utilization = (total_runtime - total_downtime) / total_runtime if total_runtime > 0 else np.zeros(replications)
+    ideal_throughput = parameters.capacity * parameters.shift_hours
+    performance = per_shift_output / ideal_throughput if ideal_throughput > 0 else np.zeros(replications)
+    oee = _clamp(utilization) * _clamp(performance) * _clamp(np.full(replications, quality))
+
+    return SimulationResult(
+        parameters=parameters,
+        total_good=total_good,
+        total_scrap=total_scrap,
+        total_downtime_minutes=total_downtime,
+        avg_daily_output=total_good / days,
+        per_shift_output=per_shift_output,
+        utilization=utilization,
+        performance=performance,
+        oee=oee,
+        throughput_per_hour=per_shift_output / parameters.shift_hours,
+    )
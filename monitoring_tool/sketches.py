@@ -0,0 +1,291 @@
+"""Bounded-memory, mergeable summaries used by the streaming detectors."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """KLL quantile sketch over a stream of floats.
+
+    Items are kept in a stack of compactors; an item stored at level ``h`` stands for
+    ``2**h`` original values. Memory stays around ``3 * k`` items no matter how many
+    values are ingested, and two sketches built on different shards or windows can be
+    merged into one that summarizes their union.
+    """
+
+    __slots__ = ("k", "count", "minimum", "maximum", "_levels", "_rng")
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None) -> None:
+        if k < 8:
+            raise ValueError("O parâmetro k do sketch deve ser pelo menos 8.")
+        self.k = k
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self._levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return sum(level.size for level in self._levels)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * _CAPACITY_DECAY**depth)), 2)
+
+    def update(self, values: np.ndarray) -> None:
+        """Ingest a batch of values, ignoring NaNs."""
+
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._levels[0] = np.concatenate((self._levels[0], values))
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """Fold ``other`` into this sketch in place."""
+
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype=np.float64))
+        for height, level in enumerate(other._levels):
+            if level.size:
+                self._levels[height] = np.concatenate((self._levels[height], level))
+        self._compress()
+
+    def _compress(self) -> None:
+        while True:
+            height = next(
+                (h for h, level in enumerate(self._levels) if level.size > self._capacity(h)),
+                None,
+            )
+            if height is None:
+                return
+            if height + 1 == len(self._levels):
+                self._levels.append(np.empty(0, dtype=np.float64))
+            level = np.sort(self._levels[height])
+            # An odd leftover stays behind so the total weight is preserved.
+            keep = level[: level.size % 2]
+            pairs = level[keep.size :]
+            offset = int(self._rng.integers(2))
+            self._levels[height] = keep.copy()
+            self._levels[height + 1] = np.concatenate((self._levels[height + 1], pairs[offset::2]))
+
+    def weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the retained items in sorted order and their weights."""
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(level.size, 1 << height, dtype=np.int64) for height, level in enumerate(self._levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def cdf(self, points: np.ndarray) -> np.ndarray:
+        """Approximate the fraction of ingested values that are ``<= points``."""
+
+        values, weights = self.weighted_items()
+        return _step_cdf(values, weights, np.asarray(points, dtype=np.float64))
+
+    def quantile(self, q: np.ndarray) -> np.ndarray:
+        """Approximate quantiles for the probabilities ``q``."""
+
+        values, weights = self.weighted_items()
+        if values.size == 0:
+            return np.full(np.shape(q), np.nan)
+        cumulative = np.cumsum(weights) / weights.sum()
+        positions = np.searchsorted(cumulative, np.asarray(q, dtype=np.float64), side="left")
+        return values[np.minimum(positions, values.size - 1)]
+
+
+def _step_cdf(values: np.ndarray, weights: np.ndarray, points: np.ndarray) -> np.ndarray:
+    if values.size == 0:
+        return np.zeros(points.shape, dtype=np.float64)
+    cumulative = np.concatenate(([0], np.cumsum(weights)))
+    return cumulative[np.searchsorted(values, points, side="right")] / cumulative[-1]
+
+
+def ks_distance(reference: KLLSketch, current: KLLSketch) -> float:
+    """Largest gap between the CDFs summarized by two sketches.
+
+    Both step CDFs only change at retained items, so evaluating them on the union of
+    those items gives the supremum in ``O(sketch size)``.
+    """
+
+    ref_values, ref_weights = reference.weighted_items()
+    cur_values, cur_weights = current.weighted_items()
+    if ref_values.size == 0 or cur_values.size == 0:
+        return 0.0
+    points = np.concatenate((ref_values, cur_values))
+    gap = _step_cdf(ref_values, ref_weights, points) - _step_cdf(cur_values, cur_weights, points)
+    return float(np.abs(gap).max())
+
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    # Integer overflow wraps around modulo 2**64, which is exactly what the mixer needs.
+    z = values + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+def hash_keys(keys: np.ndarray) -> np.ndarray:
+    """Map categorical keys to stable 64-bit hashes.
+
+    Integer keys are mixed in a single vectorized step; any other key type is hashed
+    once per distinct value with BLAKE2b, so the cost follows the batch cardinality.
+    """
+
+    keys = np.asarray(keys)
+    if keys.dtype.kind in "iub":
+        return _splitmix64(keys.astype(np.int64).view(np.uint64))
+    distinct, inverse = np.unique(keys.astype(str), return_inverse=True)
+    digests = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+            for key in distinct
+        ),
+        dtype=np.uint64,
+        count=distinct.size,
+    )
+    return digests[inverse.ravel()]
+
+
+class CountMinSketch:
+    """Count-min sketch with ``depth`` rows of ``width`` counters.
+
+    Estimates never undercount; the overcount is at most ``e / width`` of the total
+    with probability ``1 - exp(-depth)``. Sketches sharing a seed and shape merge by
+    adding their tables.
+    """
+
+    __slots__ = ("width", "depth", "seed", "table", "_salts")
+
+    def __init__(self, width: int = 1 << 14, depth: int = 4, seed: int = 0) -> None:
+        if width & (width - 1) or width < 2:
+            raise ValueError("A largura do count-min sketch deve ser potência de 2.")
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._salts = _splitmix64(np.arange(depth, dtype=np.uint64) + np.uint64(seed) * np.uint64(depth))
+
+    def _columns(self, hashed: np.ndarray) -> np.ndarray:
+        mixed = _splitmix64(hashed[None, :] ^ self._salts[:, None])
+        return (mixed & np.uint64(self.width - 1)).astype(np.intp)
+
+    def update(self, hashed: np.ndarray, counts: np.ndarray) -> None:
+        """Add ``counts`` for the already hashed keys; repeated keys accumulate."""
+
+        columns = self._columns(np.asarray(hashed, dtype=np.uint64))
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=counts, minlength=self.width).astype(np.int64)
+
+    def estimate(self, hashed: np.ndarray) -> np.ndarray:
+        """Return the (over)estimated count of each hashed key."""
+
+        columns = self._columns(np.asarray(hashed, dtype=np.uint64))
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """Add the counters of a sketch built with the same shape and seed."""
+
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Só é possível combinar sketches com mesma forma e semente.")
+        self.table += other.table
+
+
+class TopKCounter:
+    """Exact counts for the ``k`` heaviest categories plus a count-min long tail.
+
+    Every occurrence is added to the count-min sketch; the ``k`` categories with the
+    largest counts are also tracked exactly from the moment they enter the table.
+    Memory is fixed by ``k`` and the sketch shape regardless of the cardinality.
+    """
+
+    __slots__ = ("k", "total", "heavy", "sketch")
+
+    def __init__(self, k: int = 256, width: int = 1 << 14, depth: int = 4, seed: int = 0) -> None:
+        self.k = k
+        self.total = 0
+        self.heavy: Dict[object, int] = {}
+        self.sketch = CountMinSketch(width, depth, seed)
+
+    def update(self, values: np.ndarray) -> None:
+        """Ingest a batch of categorical values; ``None`` and NaN are ignored."""
+
+        values = np.asarray(values).ravel()
+        if values.dtype.kind == "f":
+            values = values[~np.isnan(values)]
+        elif values.dtype == object:
+            # Elementwise comparisons run in C; NaN is the only value unequal to itself.
+            present = np.not_equal(values, None) & np.equal(values, values)
+            values = values[present].astype(str)
+        if values.size == 0:
+            return
+        labels, counts = np.unique(values, return_counts=True)
+        self.update_counts(labels, counts)
+
+    def update_counts(self, labels: np.ndarray, counts: np.ndarray) -> None:
+        """Ingest pre-aggregated ``(label, count)`` pairs."""
+
+        labels = np.asarray(labels)
+        counts = np.asarray(counts, dtype=np.int64)
+        hashed = hash_keys(labels)
+        self.sketch.update(hashed, counts)
+        self.total += int(counts.sum())
+
+        tracked = np.fromiter((label in self.heavy for label in labels.tolist()), dtype=bool, count=labels.size)
+        for label, count in zip(labels[tracked].tolist(), counts[tracked].tolist()):
+            self.heavy[label] += count
+        if not tracked.all():
+            self._admit(labels[~tracked].tolist(), self.sketch.estimate(hashed[~tracked]))
+
+    def _admit(self, labels: list, estimates: np.ndarray) -> None:
+        floor = min(self.heavy.values()) if len(self.heavy) >= self.k else 0
+        candidates = np.flatnonzero(estimates > floor)
+        if candidates.size > self.k:
+            candidates = candidates[np.argpartition(-estimates[candidates], self.k - 1)[: self.k]]
+        for index in candidates.tolist():
+            self.heavy[labels[index]] = int(estimates[index])
+        if len(self.heavy) > self.k:
+            ranked = sorted(self.heavy.items(), key=lambda item: item[1], reverse=True)
+            self.heavy = dict(ranked[: self.k])
+
+    def counts_for(self, labels: list) -> np.ndarray:
+        """Exact counts for tracked labels, count-min estimates for the others."""
+
+        counts = np.array([self.heavy.get(label, -1) for label in labels], dtype=np.int64)
+        missing = counts < 0
+        if missing.any():
+            counts[missing] = self.sketch.estimate(hash_keys(np.asarray(labels)[missing]))
+        return counts
+
+    def merge(self, other: "TopKCounter") -> None:
+        """Fold another counter (same sketch shape and seed) into this one."""
+
+        labels = list(dict.fromkeys([*self.heavy, *other.heavy]))
+        combined = self.counts_for(labels) + other.counts_for(labels)
+        self.sketch.merge(other.sketch)
+        self.total += other.total
+        self.heavy = {}
+        self._admit(labels, combined)
@@ -0,0 +1,282 @@
+"""Parallel parameter sweeps and OEE sensitivity analysis for the simulator."""
+
+from __future__ import annotations
+
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .simulation import PARAMETER_NAMES, ProductionParameters, simulate
+
+# ``readInputs()`` field names in app.js mapped to the Python parameter names.
+JS_PARAMETER_NAMES = {
+    "capacity": "capacity",
+    "shiftHours": "shift_hours",
+    "plannedDowntime": "planned_downtime",
+    "unplannedProbability": "unplanned_probability",
+    "qualityRate": "quality_rate",
+    "days": "days",
+    "shiftsPerDay": "shifts_per_day",
+    "setupTime": "setup_time",
+}
+
+_INTEGER_PARAMETERS = {"days", "shifts_per_day"}
+
+RESULT_METRICS = (
+    "oee_mean",
+    "oee_p5",
+    "oee_p50",
+    "oee_p95",
+    "utilization_mean",
+    "performance_mean",
+    "total_good_mean",
+    "total_scrap_mean",
+)
+
+
+def parameter_name(name: str) -> str:
+    """Accept both the app.js (camelCase) and the Python (snake_case) names."""
+
+    resolved = JS_PARAMETER_NAMES.get(name, name)
+    if resolved not in PARAMETER_NAMES:
+        raise ValueError(f"Parâmetro '{name}' desconhecido. Opções: {', '.join(JS_PARAMETER_NAMES)}")
+    return resolved
+
+
+def _coerce(name: str, value: float) -> float:
+    return int(round(value)) if name in _INTEGER_PARAMETERS else float(value)
+
+
+def grid_scenarios(
+    base: ProductionParameters, grid: Mapping[str, Sequence[float]]
+) -> List[ProductionParameters]:
+    """Cartesian product of the listed values, other parameters taken from ``base``."""
+
+    names = [parameter_name(name) for name in grid]
+    combinations = itertools.product(*grid.values())
+    return [
+        replace(base, **{name: _coerce(name, value) for name, value in zip(names, combo)})
+        for combo in combinations
+    ]
+
+
+def latin_hypercube(
+    base: ProductionParameters,
+    ranges: Mapping[str, Tuple[float, float]],
+    samples: int,
+    seed: Optional[int] = None,
+) -> List[ProductionParameters]:
+    """Latin-hypercube design: each range is split in ``samples`` strata hit once."""
+
+    if samples < 1:
+        raise ValueError("O hipercubo latino exige pelo menos 1 amostra.")
+    rng = np.random.default_rng(seed)
+    names = [parameter_name(name) for name in ranges]
+    bounds = np.array(list(ranges.values()), dtype=np.float64).reshape(len(names), 2)
+    strata = (rng.random((len(names), samples)) + np.arange(samples)) / samples
+    for row in strata:
+        rng.shuffle(row)
+    values = bounds[:, :1] + strata * (bounds[:, 1:] - bounds[:, :1])
+    return [
+        replace(base, **{name: _coerce(name, value) for name, value in zip(names, column)})
+        for column in values.T
+    ]
+
+
+def build_scenarios(
+    base: ProductionParameters,
+    grid: Optional[Mapping[str, Sequence[float]]] = None,
+    ranges: Optional[Mapping[str, Tuple[float, float]]] = None,
+    samples: int = 100,
+    seed: Optional[int] = None,
+) -> List[ProductionParameters]:
+    """Cross the grid with a Latin-hypercube sample of the ranges."""
+
+    scenarios = grid_scenarios(base, grid) if grid else [base]
+    if not ranges:
+        return scenarios
+    return [
+        scenario
+        for point in scenarios
+        for scenario in latin_hypercube(point, ranges, samples, seed)
+    ]
+
+
+def _run_batch(
+    scenarios: List[ProductionParameters], replications: int, seed: int
+) -> List[Dict[str, float]]:
+    rows = []
+    for scenario in scenarios:
+        summary = simulate(scenario, replications, seed).percentiles()
+        row: Dict[str, float] = {name: getattr(scenario, name) for name in PARAMETER_NAMES}
+        row.update({f"oee_{key}": value for key, value in summary["oee"].items()})
+        for metric in ("utilization", "performance", "total_good", "total_scrap"):
+            row[f"{metric}_mean"] = summary[metric]["mean"]
+        rows.append(row)
+    return rows
+
+
+class _CsvSink:
+    def __init__(self, path: Path) -> None:
+        self._handle = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._handle, fieldnames=[*PARAMETER_NAMES, *RESULT_METRICS])
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, float]]) -> None:
+        self._writer.writerows(rows)
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class _ParquetSink:
+    def __init__(self, path: Path) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ValueError("Saída em Parquet requer o pacote opcional 'pyarrow'.") from exc
+        self._pa = pa
+        self._writer: Optional[object] = None
+        self._path = path
+        self._pq = pq
+
+    def write(self, rows: List[Dict[str, float]]) -> None:
+        # Each finished batch becomes one row group, so results land on disk as they arrive.
+        table = self._pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _open_sink(path: Path):
+    if path.suffix.lower() in {".parquet", ".pq"}:
+        return _ParquetSink(path)
+    if path.suffix.lower() == ".csv":
+        return _CsvSink(path)
+    raise ValueError("A saída do sweep deve terminar em .csv ou .parquet.")
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """Sweep outcomes in columnar form, one entry per scenario."""
+
+    columns: Dict[str, np.ndarray]
+
+    @property
+    def n_scenarios(self) -> int:
+        return self.columns["oee_mean"].size
+
+
+@dataclass(frozen=True)
+class Sensitivity:
+    """Tornado bar: mean OEE in the lower and upper quartile of one parameter."""
+
+    parameter: str
+    low_value: float
+    high_value: float
+    oee_at_low: float
+    oee_at_high: float
+
+    @property
+    def swing(self) -> float:
+        return self.oee_at_high - self.oee_at_low
+
+
+def run_sweep(
+    scenarios: Sequence[ProductionParameters],
+    replications: int = 1000,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    output: Optional[Path | str] = None,
+    batch_size: int = 16,
+) -> SweepResult:
+    """Simulate every scenario across a process pool, streaming rows to ``output``.
+
+    All scenarios share one seed (common random numbers), so differences between
+    them come from the parameters rather than from sampling noise.
+    """
+
+    if not scenarios:
+        raise ValueError("Nenhum cenário para simular.")
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    workers = workers or os.cpu_count() or 1
+    batches = [list(scenarios[start : start + batch_size]) for start in range(0, len(scenarios), batch_size)]
+    sink = _open_sink(Path(output)) if output is not None else None
+    finished: List[List[Dict[str, float]]] = [[] for _ in batches]
+    try:
+        if workers == 1:
+            for index, batch in enumerate(batches):
+                finished[index] = _run_batch(batch, replications, seed)
+                if sink is not None:
+                    sink.write(finished[index])
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_run_batch, batch, replications, seed): index
+                    for index, batch in enumerate(batches)
+                }
+                for future in as_completed(futures):
+                    finished[futures[future]] = future.result()
+                    if sink is not None:
+                        sink.write(finished[futures[future]])
+    finally:
+        if sink is not None:
+            sink.close()
+
+    # The output file gets batches as they finish; the result keeps scenario order.
+    rows = [row for batch_rows in finished for row in batch_rows]
+    names = [*PARAMETER_NAMES, *RESULT_METRICS]
+    return SweepResult({name: np.array([row[name] for row in rows], dtype=np.float64) for name in names})
+
+
+def tornado(result: SweepResult, parameters: Optional[Sequence[str]] = None) -> List[Sensitivity]:
+    """Sensitivity of mean OEE to each varied parameter, largest swing first."""
+
+    oee = result.columns["oee_mean"]
+    names = [parameter_name(name) for name in parameters] if parameters else list(PARAMETER_NAMES)
+    bars = []
+    for name in names:
+        values = result.columns[name]
+        if np.ptp(values) == 0:
+            continue
+        low, high = np.quantile(values, [0.25, 0.75])
+        bars.append(
+            Sensitivity(
+                parameter=name,
+                low_value=float(values[values <= low].mean()),
+                high_value=float(values[values >= high].mean()),
+                oee_at_low=float(oee[values <= low].mean()),
+                oee_at_high=float(oee[values >= high].mean()),
+            )
+        )
+    return sorted(bars, key=lambda bar: abs(bar.swing), reverse=True)
+
+
+def format_tornado(bars: Sequence[Sensitivity], width: int = 30) -> str:
+    """Plain-text tornado chart for CLI output."""
+
+    if not bars:
+        return "Nenhum parâmetro variou no sweep."
+    largest = max(abs(bar.swing) for bar in bars) or 1.0
+    label_width = max(len(bar.parameter) for bar in bars)
+    lines = ["Sensibilidade do OEE (quartil superior - quartil inferior do parâmetro):"]
+    for bar in bars:
+        length = int(round(abs(bar.swing) / largest * width))
+        lines.append(
+            f"  {bar.parameter:<{label_width}}  {bar.swing:+.4f}  {'#' * length}"
+            f"  ({bar.low_value:g} -> {bar.high_value:g})"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,203 @@
+"""Chunked readers that stream tabular files as dictionaries of NumPy columns."""
+
+from __future__ import annotations
+
+import csv
+import re
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+Chunk = Dict[str, np.ndarray]
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Column types of a CSV schema.
+NUMERIC = "numeric"
+TEXT = "text"
+
+# Zero-padded codes ("001", "-07") would lose their padding as numbers.
+_ID_LIKE = re.compile(r"[+-]?0\d")
+
+
+class SchemaError(ValueError):
+    """A chunk holds values that do not fit the type fixed for ``column``."""
+
+    def __init__(self, column: str, message: str) -> None:
+        super().__init__(message)
+        self.column = column
+
+
+def _infer_kind(text: np.ndarray) -> str:
+    distinct = np.unique(text)
+    if any(_ID_LIKE.match(value) for value in distinct.tolist()):
+        return TEXT
+    try:
+        distinct.astype(np.float64)
+    except ValueError:
+        return TEXT
+    return NUMERIC
+
+
+def _to_column(raw: List[str], name: str, kind: Optional[str], first_row: int) -> Tuple[np.ndarray, Optional[str]]:
+    """Parse one column of a chunk as ``kind``, inferring it when still unknown."""
+
+    text = np.array(raw, dtype=str)
+    empty = text == ""
+    if kind is None:
+        if empty.all():
+            # Nothing to infer from yet: the type is decided by the first filled chunk.
+            return np.full(text.shape, np.nan), None
+        kind = _infer_kind(text[~empty])
+    if kind == NUMERIC:
+        try:
+            return np.where(empty, "nan", text).astype(np.float64), kind
+        except ValueError:
+            for offset, value in enumerate(raw):
+                try:
+                    float(value or "nan")
+                except ValueError:
+                    raise SchemaError(
+                        name,
+                        f"A coluna '{name}' foi lida como numérica, mas a linha {first_row + offset} contém "
+                        f"'{value}'. Declare-a como texto: dtypes={{'{name}': '{TEXT}'}}.",
+                    ) from None
+            raise
+    column = text.astype(object)
+    column[empty] = None
+    return column, kind
+
+
+def _check_dtypes(dtypes: Optional[Mapping[str, str]]) -> Dict[str, str]:
+    dtypes = dict(dtypes or {})
+    invalid = [name for name, kind in dtypes.items() if kind not in (NUMERIC, TEXT)]
+    if invalid:
+        raise ValueError(f"Tipos inválidos para {', '.join(invalid)}: use '{NUMERIC}' ou '{TEXT}'.")
+    return dtypes
+
+
+def iter_csv_chunks(
+    path: Path | str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: Optional[Sequence[str]] = None,
+    dtypes: Optional[Mapping[str, str]] = None,
+) -> Iterator[Chunk]:
+    """Yield ``chunk_rows`` rows at a time; numeric columns become ``float64``.
+
+    Empty cells become ``NaN`` (numeric) or ``None`` (text). Only the requested
+    ``columns`` are materialized.
+
+    Each column keeps one type for the whole file: the one declared in ``dtypes``
+    (``"numeric"`` or ``"text"``), else the one inferred from the first chunk where
+    it has values. Zero-padded codes such as ``"001"`` are inferred as text. A later
+    chunk that does not fit a numeric column raises :class:`SchemaError`.
+    """
+
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        wanted = list(columns) if columns is not None else header
+        missing = [name for name in wanted if name not in header]
+        if missing:
+            raise ValueError(f"Colunas ausentes em {path}: {', '.join(missing)}")
+        positions = [header.index(name) for name in wanted]
+        # Only the requested cells of each row are kept, so reading a few columns of
+        # a wide file buffers a few columns' worth of text.
+        pick = _picker(positions)
+        declared = _check_dtypes(dtypes)
+        schema: Dict[str, Optional[str]] = {name: declared.get(name) for name in wanted}
+
+        rows: List[Tuple[str, ...]] = []
+        # Line numbers in messages count the header as line 1.
+        first_row = 2
+        for row in reader:
+            rows.append(pick(row))
+            if len(rows) == chunk_rows:
+                yield _rows_to_chunk(rows, wanted, schema, first_row)
+                first_row += len(rows)
+                rows = []
+        if rows:
+            yield _rows_to_chunk(rows, wanted, schema, first_row)
+
+
+def _picker(positions: List[int]) -> Callable[[List[str]], Tuple[str, ...]]:
+    if len(positions) > 1:
+        return itemgetter(*positions)
+    return lambda row: tuple(row[position] for position in positions)
+
+
+def _rows_to_chunk(
+    rows: List[Tuple[str, ...]], names: List[str], schema: Dict[str, Optional[str]], first_row: int
+) -> Chunk:
+    chunk: Chunk = {}
+    for name, values in zip(names, zip(*rows)):
+        chunk[name], schema[name] = _to_column(list(values), name, schema[name], first_row)
+    return chunk
+
+
+def iter_parquet_chunks(
+    path: Path | str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[Chunk]:
+    """Yield record batches of a Parquet file, reading only the requested columns."""
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise ValueError("Leitura de Parquet requer o pacote opcional 'pyarrow'.") from exc
+
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=list(columns) if columns else None):
+        yield {
+            name: column.to_numpy(zero_copy_only=False)
+            for name, column in zip(batch.schema.names, batch.columns)
+        }
+
+
+def iter_table_chunks(
+    path: Path | str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: Optional[Sequence[str]] = None,
+    dtypes: Optional[Mapping[str, str]] = None,
+) -> Iterator[Chunk]:
+    """Dispatch to the CSV or Parquet reader based on the file extension.
+
+    ``dtypes`` only applies to CSV; Parquet files carry their own schema.
+    """
+
+    suffix = Path(path).suffix.lower()
+    if suffix in {".parquet", ".pq"}:
+        return iter_parquet_chunks(path, chunk_rows, columns)
+    if suffix in {".csv", ".txt"}:
+        return iter_csv_chunks(path, chunk_rows, columns, dtypes)
+    raise ValueError(f"Formato de arquivo não suportado: {suffix or path}")
+
+
+def table_columns(path: Path | str) -> List[str]:
+    """Column names of a CSV or Parquet file, without reading its rows."""
+
+    suffix = Path(path).suffix.lower()
+    if suffix in {".parquet", ".pq"}:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ValueError("Leitura de Parquet requer o pacote opcional 'pyarrow'.") from exc
+        return list(pq.ParquetFile(path).schema_arrow.names)
+    with open(path, newline="", encoding="utf-8") as handle:
+        return next(csv.reader(handle), [])
+
+
+def null_mask(values: np.ndarray) -> np.ndarray:
+    """Missing-value mask for numeric (NaN) and object (``None``/NaN/empty) columns."""
+
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    if values.dtype == object:
+        return np.equal(values, None) | np.not_equal(values, values) | np.equal(values, "")
+    return np.zeros(values.shape, dtype=bool)
@@ -0,0 +1,350 @@
+"""Embedded time-series store for monitoring signals with automatic rollups.
+
+Each signal keeps a ring buffer of raw points plus rollups at 1 minute, 1 hour and
+1 day. Rollup buffers are addressed by time: bucket ``b`` lives in slot
+``b % capacity`` and remembers its bucket id, so writes are O(1) per bucket,
+late points update the right bucket while it is retained, and expired buckets
+are simply overwritten. Every buffer is a fixed-size NumPy array, optionally
+memory-mapped from a file under the store directory.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+RAW = 0
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+RESOLUTIONS = (RAW, MINUTE, HOUR, DAY)
+
+# Default retention: about 1 day of raw points at one point per second, two weeks
+# of minutes, a year of hours and ten years of days.
+DEFAULT_CAPACITIES = {RAW: 86_400, MINUTE: 20_160, HOUR: 8_784, DAY: 3_660}
+DEFAULT_MAX_POINTS = 1000
+
+_MAGIC = int.from_bytes(b"MTSERIES", "little")
+_VERSION = 1
+_HEADER_WORDS = 8
+_HEADER_BYTES = _HEADER_WORDS * 8
+# Header words: magic, version, resolution, capacity, head and size (raw ring only),
+# and the end (in whole seconds) of the newest data overwritten so far.
+_HEAD, _SIZE, _EVICTED = 4, 5, 6
+_EMPTY = np.iinfo(np.int64).min
+
+RAW_DTYPE = np.dtype([("time", "<f8"), ("value", "<f8")])
+ROLLUP_DTYPE = np.dtype(
+    [("bucket", "<i8"), ("count", "<i8"), ("sum", "<f8"), ("sumsq", "<f8"), ("min", "<f8"), ("max", "<f8")]
+)
+
+
+@dataclass(frozen=True)
+class SeriesSlice:
+    """Aggregated points of one signal; one entry per bucket that has data."""
+
+    signal: str
+    resolution: int
+    step: float
+    start: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    std: np.ndarray
+
+    def __len__(self) -> int:
+        return self.start.size
+
+
+class _Buffer:
+    """One ring buffer with its header, in memory or mapped from ``path``."""
+
+    def __init__(self, resolution: int, capacity: int, path: Optional[Path]) -> None:
+        dtype = RAW_DTYPE if resolution == RAW else ROLLUP_DTYPE
+        if path is None:
+            self.header = np.zeros(_HEADER_WORDS, dtype="<i8")
+            self.records = np.zeros(capacity, dtype=dtype)
+            self._initialize(resolution, capacity)
+            return
+        fresh = not path.exists()
+        if fresh:
+            with open(path, "wb") as handle:
+                handle.truncate(_HEADER_BYTES + capacity * dtype.itemsize)
+        self.header = np.memmap(path, dtype="<i8", mode="r+", shape=(_HEADER_WORDS,))
+        if not fresh:
+            if self.header[0] != _MAGIC or self.header[1] != _VERSION or self.header[2] != resolution:
+                raise ValueError(f"Segmento de série temporal inválido: {path}")
+            capacity = int(self.header[3])
+        self.records = np.memmap(path, dtype=dtype, mode="r+", offset=_HEADER_BYTES, shape=(capacity,))
+        if fresh:
+            self._initialize(resolution, capacity)
+
+    def _initialize(self, resolution: int, capacity: int) -> None:
+        self.header[:4] = (_MAGIC, _VERSION, resolution, capacity)
+        self.header[_EVICTED] = _EMPTY
+        if resolution != RAW:
+            self.records["bucket"] = _EMPTY
+
+    @property
+    def capacity(self) -> int:
+        return self.records.shape[0]
+
+    def flush(self) -> None:
+        for array in (self.header, self.records):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+class _Signal:
+    def __init__(self, capacities: Dict[int, int], directory: Optional[Path]) -> None:
+        self.buffers = {
+            resolution: _Buffer(
+                resolution,
+                capacities[resolution],
+                directory / f"{resolution}.seg" if directory is not None else None,
+            )
+            for resolution in RESOLUTIONS
+        }
+
+    def append(self, times: np.ndarray, values: np.ndarray) -> None:
+        self._append_raw(times, values)
+        for resolution in RESOLUTIONS[1:]:
+            self._roll_up(self.buffers[resolution], resolution, times, values)
+
+    def _append_raw(self, times: np.ndarray, values: np.ndarray) -> None:
+        buffer = self.buffers[RAW]
+        capacity = buffer.capacity
+        if times.size > capacity:
+            # Points pushed out within the batch count as overwritten too.
+            dropped = math.ceil(times[:-capacity].max())
+            buffer.header[_EVICTED] = max(int(buffer.header[_EVICTED]), dropped)
+            times, values = times[-capacity:], values[-capacity:]
+        head, size = int(buffer.header[_HEAD]), int(buffer.header[_SIZE])
+        slots = (head + np.arange(times.size)) % capacity
+        overwritten = max(size + times.size - capacity, 0)
+        if overwritten:
+            evicted = buffer.records["time"][slots[:overwritten]].max()
+            buffer.header[_EVICTED] = max(int(buffer.header[_EVICTED]), math.ceil(evicted))
+        buffer.records["time"][slots] = times
+        buffer.records["value"][slots] = values
+        buffer.header[_HEAD] = (head + times.size) % capacity
+        buffer.header[_SIZE] = min(size + times.size, capacity)
+
+    @staticmethod
+    def _roll_up(buffer: _Buffer, resolution: int, times: np.ndarray, values: np.ndarray) -> None:
+        buckets = np.floor(times / resolution).astype(np.int64)
+        order = np.argsort(buckets, kind="stable")
+        buckets, values = buckets[order], values[order]
+        boundaries = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        distinct = buckets[boundaries]
+        count = np.diff(np.append(boundaries, buckets.size))
+        total = np.add.reduceat(values, boundaries)
+        squares = np.add.reduceat(values * values, boundaries)
+        low = np.minimum.reduceat(values, boundaries)
+        high = np.maximum.reduceat(values, boundaries)
+
+        # Within one batch only the newest ``capacity`` buckets can be kept.
+        keep = distinct > distinct[-1] - buffer.capacity
+        if not keep.all():
+            horizon = (int(distinct[~keep].max()) + 1) * resolution
+            buffer.header[_EVICTED] = max(int(buffer.header[_EVICTED]), horizon)
+        distinct, count, total, squares, low, high = (
+            column[keep] for column in (distinct, count, total, squares, low, high)
+        )
+        records = buffer.records
+        slots = distinct % buffer.capacity
+        stored = records["bucket"][slots]
+        # A slot holding an older bucket has expired; one holding a newer bucket means
+        # the point arrived too late for this resolution's retention.
+        stale = stored < distinct
+        late = stored > distinct
+        if stale.any():
+            reset = slots[stale]
+            expired = stored[stale]
+            expired = expired[expired != _EMPTY]
+            if expired.size:
+                horizon = (int(expired.max()) + 1) * resolution
+                buffer.header[_EVICTED] = max(int(buffer.header[_EVICTED]), horizon)
+            records["bucket"][reset] = distinct[stale]
+            records["count"][reset] = 0
+            records["sum"][reset] = 0.0
+            records["sumsq"][reset] = 0.0
+            records["min"][reset] = np.inf
+            records["max"][reset] = -np.inf
+        live = ~late
+        slots = slots[live]
+        records["count"][slots] += count[live]
+        records["sum"][slots] += total[live]
+        records["sumsq"][slots] += squares[live]
+        records["min"][slots] = np.minimum(records["min"][slots], low[live])
+        records["max"][slots] = np.maximum(records["max"][slots], high[live])
+
+    def raw(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw points currently retained, in time order."""
+
+        buffer = self.buffers[RAW]
+        size, head = int(buffer.header[_SIZE]), int(buffer.header[_HEAD])
+        order = (head - size + np.arange(size)) % buffer.capacity
+        records = buffer.records[order]
+        by_time = np.argsort(records["time"], kind="stable")
+        return records["time"][by_time], records["value"][by_time]
+
+    def retains(self, resolution: int, start: float) -> bool:
+        """Whether nothing newer than ``start`` has been overwritten at ``resolution``."""
+
+        return int(self.buffers[resolution].header[_EVICTED]) <= start
+
+    def evicted(self, resolution: int) -> int:
+        return int(self.buffers[resolution].header[_EVICTED])
+
+
+class SignalStore:
+    """Per-signal ring buffers with 1m/1h/1d rollups, optionally persisted to ``path``.
+
+    With a directory, each signal gets a subdirectory of fixed-size segment files
+    (one per resolution) that are memory-mapped, so history survives restarts and
+    only touched pages are read. Without one, buffers live in memory.
+    """
+
+    def __init__(self, path: Optional[Path | str] = None, capacities: Optional[Dict[int, int]] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.capacities = {**DEFAULT_CAPACITIES, **(capacities or {})}
+        self._signals: Dict[str, _Signal] = {}
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for directory in sorted(self.path.iterdir()):
+                if directory.is_dir():
+                    self._signals[unquote(directory.name)] = _Signal(self.capacities, directory)
+
+    def signals(self) -> List[str]:
+        return sorted(self._signals)
+
+    def _signal(self, name: str) -> _Signal:
+        signal = self._signals.get(name)
+        if signal is None:
+            directory = None
+            if self.path is not None:
+                directory = self.path / quote(name, safe="")
+                directory.mkdir(exist_ok=True)
+            signal = self._signals[name] = _Signal(self.capacities, directory)
+        return signal
+
+    def append(self, name: str, times: Sequence[float], values: Sequence[float]) -> None:
+        """Record points of ``name``; NaN values are ignored."""
+
+        times = np.asarray(times, dtype=np.float64).ravel()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if times.shape != values.shape:
+            raise ValueError("Tempos e valores devem ter o mesmo tamanho.")
+        valid = ~np.isnan(values) & np.isfinite(times)
+        if valid.any():
+            self._signal(name).append(times[valid], values[valid])
+
+    def record(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Record one point for each signal in ``values`` at the same instant."""
+
+        for name, value in values.items():
+            self.append(name, [timestamp], [value])
+
+    def choose_resolution(self, name: str, start: float, step: float) -> int:
+        """Coarsest resolution no coarser than ``step`` that still retains ``start``.
+
+        Failing that, the finest resolution retaining ``start`` is used, and when none
+        reaches back that far, the one reaching furthest back: long ranges degrade to
+        coarser data instead of coming back empty.
+        """
+
+        signal = self._signals[name]
+        covering = [resolution for resolution in RESOLUTIONS if signal.retains(resolution, start)]
+        fitting = [resolution for resolution in covering if resolution <= step]
+        if fitting:
+            return fitting[-1]
+        if covering:
+            return covering[0]
+        return min(RESOLUTIONS, key=lambda resolution: (signal.evicted(resolution), -resolution))
+
+    def query(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        step: Optional[float] = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+        resolution: Optional[int] = None,
+    ) -> SeriesSlice:
+        """Aggregate ``name`` over ``[start, end)`` into buckets of ``step`` seconds.
+
+        ``step`` defaults to the range split into ``max_points`` buckets. The data
+        are read from :meth:`choose_resolution` unless ``resolution`` is forced.
+        """
+
+        if name not in self._signals:
+            raise ValueError(f"Sinal '{name}' não encontrado.")
+        if end <= start:
+            raise ValueError("O fim do intervalo deve ser posterior ao início.")
+        step = step or (end - start) / max_points
+        resolution = self.choose_resolution(name, start, step) if resolution is None else resolution
+        signal = self._signals[name]
+
+        if resolution == RAW:
+            times, values = signal.raw()
+            inside = (times >= start) & (times < end)
+            times, values = times[inside], values[inside]
+            starts, count, total = times, np.ones(times.size, dtype=np.int64), values
+            squares, low, high = values * values, values, values
+        else:
+            records = signal.buffers[resolution].records
+            buckets = records["bucket"]
+            starts = buckets * float(resolution)
+            inside = (buckets != _EMPTY) & (starts + resolution > start) & (starts < end)
+            chosen = records[inside]
+            order = np.argsort(chosen["bucket"])
+            chosen = chosen[order]
+            starts = chosen["bucket"] * float(resolution)
+            count, total, squares = chosen["count"], chosen["sum"], chosen["sumsq"]
+            low, high = chosen["min"], chosen["max"]
+
+        # Merge the stored buckets into the requested step.
+        # A bucket straddling ``start`` is attributed to the first step.
+        groups = np.maximum(np.floor((starts - start) / step), 0).astype(np.int64)
+        distinct, boundaries = np.unique(groups, return_index=True)
+        if distinct.size:
+            count = np.add.reduceat(count, boundaries)
+            total = np.add.reduceat(total, boundaries)
+            squares = np.add.reduceat(squares, boundaries)
+            low = np.minimum.reduceat(low, boundaries)
+            high = np.maximum.reduceat(high, boundaries)
+        mean = total / np.maximum(count, 1)
+        variance = np.maximum(squares / np.maximum(count, 1) - mean * mean, 0.0)
+        return SeriesSlice(
+            signal=name,
+            resolution=resolution,
+            step=step,
+            start=start + distinct * step,
+            count=np.asarray(count, dtype=np.int64),
+            mean=mean,
+            minimum=np.asarray(low, dtype=np.float64),
+            maximum=np.asarray(high, dtype=np.float64),
+            std=np.sqrt(variance),
+        )
+
+    def flush(self) -> None:
+        for signal in self._signals.values():
+            for buffer in signal.buffers.values():
+                buffer.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._signals.clear()
+
+    def __enter__(self) -> "SignalStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
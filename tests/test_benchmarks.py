@@ -0,0 +1,38 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SUITE = Path(__file__).resolve().parent.parent / "benchmarks" / "suite.py"
+
+
+@pytest.fixture(scope="module")
+def suite():
+    spec = importlib.util.spec_from_file_location("benchmark_suite", SUITE)
+    module = importlib.util.module_from_spec(spec)
+    # Dataclasses look their module up in sys.modules.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _result(calls, p95_ms, throughput=1000.0):
+    return {"case": "c", "rows": 10, "features": 1, "calls": calls, "throughput": throughput, "p95_ms": p95_ms,
+            "peak_mb": 1.0}
+
+
+def test_p95_needs_enough_calls_before_gating(suite):
+    few = suite.MIN_P95_CALLS - 1
+    baseline = {"c/10x1": _result(few, 1.0)}
+    assert suite.regressions([_result(few, 50.0)], baseline, 0.2) == []
+
+    baseline = {"c/10x1": _result(suite.MIN_P95_CALLS, 1.0)}
+    (found,) = suite.regressions([_result(suite.MIN_P95_CALLS, 50.0)], baseline, 0.2)
+    assert "p95" in found
+
+
+def test_throughput_is_gated_regardless_of_calls(suite):
+    baseline = {"c/10x1": _result(1, 1.0, throughput=1000.0)}
+    (found,) = suite.regressions([_result(1, 1.0, throughput=500.0)], baseline, 0.2)
+    assert "vazão" in found
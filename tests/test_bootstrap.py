@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.bootstrap import PoissonBootstrap
+
+
+def test_interval_covers_the_true_mean_at_the_nominal_rate():
+    covered = 0
+    for trial in range(100):
+        rng = np.random.default_rng(trial)
+        bootstrap = PoissonBootstrap(300, seed=trial)
+        for _ in range(2):
+            bootstrap.update(rng.normal(3.0, 1.0, 250))
+        low, high = bootstrap.confidence_interval("mean", 0.95)
+        covered += low <= 3.0 <= high
+    assert 0.88 <= covered / 100 <= 1.0
+
+
+def test_merged_shards_match_a_single_pass():
+    rng = np.random.default_rng(1)
+    y_true = (rng.random(4000) < 0.3).astype(float)
+    y_pred = np.where(rng.random(4000) < 0.8, y_true, 1.0 - y_true)
+    single = PoissonBootstrap(500, seed=1)
+    single.update(y_true, y_pred)
+    left, right = PoissonBootstrap(500, seed=2), PoissonBootstrap(500, seed=3)
+    left.update(y_true[:1500], y_pred[:1500])
+    right.update(y_true[1500:], y_pred[1500:])
+    left.merge(right)
+
+    np.testing.assert_allclose(left.exact, single.exact)
+    for metric in ("accuracy", "f1"):
+        assert left.estimate(metric) == single.estimate(metric)
+        merged, whole = left.confidence_interval(metric), single.confidence_interval(metric)
+        width = whole[1] - whole[0]
+        assert merged == pytest.approx(whole, abs=0.2 * width)
+    with pytest.raises(ValueError):
+        left.merge(PoissonBootstrap(100))
+
+
+def test_parallel_replicates_equal_serial_ones_for_a_fixed_seed():
+    rng = np.random.default_rng(2)
+    batches = [(rng.random(3000) < 0.5).astype(float) for _ in range(3)]
+    serial = PoissonBootstrap(200, seed=7)
+    with PoissonBootstrap(200, seed=7, n_jobs=3) as parallel:
+        for batch in batches:
+            serial.update(batch, 1.0 - batch)
+            parallel.update(batch, 1.0 - batch)
+    np.testing.assert_array_equal(parallel.totals, serial.totals)
+    assert parallel.confidence_interval("rmse") == serial.confidence_interval("rmse")
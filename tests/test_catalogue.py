@@ -0,0 +1,35 @@
+import shutil
+
+from monitoring_tool import catalogue
+
+
+def test_open_catalogue_compiles_into_the_user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    source = tmp_path / "pacote" / "catalogue.json"
+    source.parent.mkdir()
+    shutil.copy(catalogue.SOURCE_PATH, source)
+
+    opened = catalogue.open_catalogue(source)
+    assert list(source.parent.iterdir()) == [source]
+    (compiled,) = catalogue.cache_dir().iterdir()
+    assert opened.sections["techniques"].names == catalogue.CompiledCatalogue.open(compiled).sections["techniques"].names
+
+    # A stale compiled copy is rebuilt in place.
+    source.write_text(source.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    catalogue.open_catalogue(source)
+    assert catalogue._is_current(compiled, source)
+
+
+def test_open_catalogue_falls_back_to_memory_without_a_cache(tmp_path, monkeypatch):
+    blocker = tmp_path / "arquivo"
+    blocker.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(blocker))
+    assert len(catalogue.open_catalogue().sections["problems"]) > 0
+
+
+def test_compile_catalogue_leaves_no_temporary_files(tmp_path):
+    output = tmp_path / "catalogue.bin"
+    payload = catalogue.compile_catalogue([catalogue.SOURCE_PATH], output)
+    catalogue.compile_catalogue([catalogue.SOURCE_PATH], output)
+    assert output.read_bytes() == payload
+    assert list(tmp_path.iterdir()) == [output]
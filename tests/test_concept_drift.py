@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+
+from monitoring_tool.concept_drift import ADWIN, DDM
+
+
+def _scalar_ddm(errors, min_instances=30, drift_level=3.0):
+    """Textbook DDM, one error at a time."""
+
+    drifts, n, total, best_p, best_s = [], 0, 0.0, math.inf, math.inf
+    for index, error in enumerate(errors):
+        n += 1
+        total += error
+        p = total / n
+        s = math.sqrt(p * (1.0 - p) / n)
+        if n < min_instances:
+            continue
+        if p + s <= best_p + best_s:
+            best_p, best_s = p, s
+        if p + s > best_p + drift_level * best_s:
+            drifts.append(index)
+            n, total, best_p, best_s = 0, 0.0, math.inf, math.inf
+    return drifts
+
+
+def test_ddm_matches_the_scalar_definition_in_any_batching():
+    for seed in range(10):
+        rng = np.random.default_rng(seed)
+        errors = np.r_[rng.random(3000) < 0.1, rng.random(2000) < 0.4].astype(np.float64)
+        expected = _scalar_ddm(errors)
+        assert DDM().update_batch(errors).tolist() == expected
+
+        detector, found = DDM(), []
+        for start in range(0, errors.size, 337):
+            found.extend((start + detector.update_batch(errors[start : start + 337])).tolist())
+        assert found == expected
+
+
+def test_ddm_fires_soon_after_an_abrupt_change():
+    for seed in range(10):
+        rng = np.random.default_rng(seed)
+        errors = np.r_[rng.random(3000) < 0.05, rng.random(1000) < 0.5]
+        drifts = DDM().update_batch(errors)
+        assert ((drifts >= 3000) & (drifts < 3200)).any()
+
+
+def test_adwin_stays_quiet_on_a_stationary_stream():
+    false_alarms = sum(
+        ADWIN().update_batch(np.random.default_rng(seed).random(3000) < 0.1).size > 0 for seed in range(20)
+    )
+    assert false_alarms <= 1
+
+
+def test_adwin_cuts_its_window_after_a_change():
+    rng = np.random.default_rng(1)
+    detector = ADWIN()
+    drifts = detector.update_batch(np.r_[rng.random(2000) < 0.1, rng.random(2000) < 0.5])
+    assert drifts.size and 2000 <= drifts[0] < 2200
+    assert detector.estimation > 0.4
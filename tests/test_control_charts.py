@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.control_charts import ControlChartEvaluator
+
+
+def _reference_cusum(z, k, h, reset_on_alarm):
+    """Tabular CUSUM one sample at a time; NaNs leave the accumulators unchanged."""
+
+    upper, lower = np.zeros_like(z), np.zeros_like(z)
+    for row in range(z.shape[0]):
+        high = low = 0.0
+        for column, value in enumerate(z[row]):
+            if not np.isnan(value):
+                high = max(0.0, high + value - k)
+                low = max(0.0, low - value - k)
+            upper[row, column], lower[row, column] = high, low
+            if reset_on_alarm and (high > h or low > h):
+                high = low = 0.0
+    return upper, lower
+
+
+@pytest.mark.parametrize("reset_on_alarm", [True, False])
+def test_closed_form_cusum_matches_a_per_sample_loop(reset_on_alarm):
+    rng = np.random.default_rng(0)
+    values = rng.normal(0.0, 1.0, (50, 400))
+    values[::3, 150:] += 1.5  # drifting series alarm several times
+    values[::7, 300:] -= 2.0
+    values[rng.random(values.shape) < 0.02] = np.nan
+
+    chart = ControlChartEvaluator(np.zeros(50), np.ones(50), k=0.5, h=4.0, reset_on_alarm=reset_on_alarm)
+    # Split into ticks so that the accumulators also carry over between calls.
+    results = [chart.update(values[:, start : start + 57]) for start in range(0, 400, 57)]
+    upper = np.concatenate([result.cusum_upper for result in results], axis=1)
+    lower = np.concatenate([result.cusum_lower for result in results], axis=1)
+
+    expected_upper, expected_lower = _reference_cusum(values, 0.5, 4.0, reset_on_alarm)
+    np.testing.assert_allclose(upper, expected_upper, atol=1e-9)
+    np.testing.assert_allclose(lower, expected_lower, atol=1e-9)
+    if reset_on_alarm:
+        assert (np.concatenate([result.cusum_alarm for result in results], axis=1).sum(axis=1) > 1).any()
+
+
+def test_shewhart_limits_fire_on_a_known_shift():
+    rng = np.random.default_rng(1)
+    chart = ControlChartEvaluator.fit(rng.normal(10.0, 2.0, (4, 2000)))
+    values = rng.normal(10.0, 2.0, (4, 200))
+    values[1, 100:] += 5 * 2.0
+    values[2, 100:] -= 5 * 2.0
+    result = chart.update(values)
+    assert result.shewhart_upper[1, 100:].mean() > 0.8
+    assert result.shewhart_lower[2, 100:].mean() > 0.8
+    # Before the shift, 3-sigma limits only flag the rare tail points.
+    assert result.out_of_control[:, :100].mean() < 0.02
+    assert {1, 2} <= set(result.alarmed_series().tolist())
@@ -0,0 +1,47 @@
+import pytest
+
+from monitoring_tool.__main__ import main
+from monitoring_tool.discrete_event import Distribution, LineConfig, PlantConfig, run_discrete_event
+
+
+def _plant(lines=5, crews=1, mtbf=Distribution("exponential", 120.0), **kwargs):
+    configs = tuple(
+        LineConfig(f"L{index}", 100.0, mtbf, Distribution("exponential", 60.0)) for index in range(lines)
+    )
+    return PlantConfig(configs, repair_crews=crews, **{"days": 30, "shifts_per_day": 3, **kwargs})
+
+
+def test_planned_downtime_is_charged_every_shift_even_during_repairs():
+    result = run_discrete_event(_plant(), seed=1)
+    for line in result.lines:
+        # 30 days x 3 shifts x 30 minutes, although most lines queue for the single crew.
+        assert line.minutes["planned"] == pytest.approx(2700.0)
+        assert sum(line.minutes.values()) == pytest.approx(line.scheduled_minutes)
+
+
+def test_availability_is_full_without_failures():
+    result = run_discrete_event(_plant(lines=2, mtbf=Distribution("constant", float("inf"))), seed=0)
+    for line in result.lines:
+        assert line.failures == 0
+        assert line.availability == pytest.approx(1.0)
+
+
+def test_more_crews_reduce_repair_waits():
+    single = run_discrete_event(_plant(crews=1), seed=2)
+    shared = run_discrete_event(_plant(crews=5), seed=2)
+    assert sum(line.repair_wait_minutes for line in shared.lines) < sum(
+        line.repair_wait_minutes for line in single.lines
+    )
+
+
+def test_distribution_parse():
+    assert Distribution.parse("weibull:1.5:600") == Distribution("weibull", 1.5, 600.0)
+    with pytest.raises(ValueError):
+        Distribution.parse("weibull")
+
+
+def test_cli_simulate_events(capsys):
+    main(["simulate-events", "--set", "shiftsPerDay=2", "--lines", "2", "--days", "5", "--seed", "1"])
+    output = capsys.readouterr().out
+    assert "Linha 2" in output
+    assert "OEE da planta" in output
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.drift import CategoricalDriftDetector, KSDetector, PSIReference, population_stability_index
+
+
+def _false_alarm_rate(sample, k, trials=20, rows=50_000, alpha=0.05):
+    alarms = 0
+    for trial in range(trials):
+        rng = np.random.default_rng(trial)
+        detector = CategoricalDriftDetector(1, k=k, seed=trial)
+        detector.update_reference(sample(rng, rows))
+        detector.update(sample(rng, rows))
+        alarms += detector.test()[0].p_value < alpha
+    return alarms / trials
+
+
+@pytest.mark.parametrize(
+    "sample, k",
+    [
+        (lambda rng, rows: rng.integers(0, 1000, rows), 50),
+        (lambda rng, rows: np.minimum(rng.zipf(1.3, rows), 10**6), 256),
+        (lambda rng, rows: rng.integers(0, 100, rows), 5),
+    ],
+    ids=["uniform-1000-k50", "zipf-k256", "uniform-100-k5"],
+)
+def test_categorical_null_hypothesis_keeps_false_alarm_rate(sample, k):
+    # Same distribution on both sides: p-values must not pile up below alpha.
+    assert _false_alarm_rate(sample, k) <= 0.15
+
+
+def test_categorical_detects_shift_in_a_reference_category():
+    rng = np.random.default_rng(0)
+    detector = CategoricalDriftDetector(1, k=50)
+    detector.update_reference(rng.integers(0, 100, 50_000))
+    current = rng.integers(0, 100, 50_000)
+    current[rng.random(current.size) < 0.2] = 3
+    detector.update(current)
+    result = detector.test()[0]
+    assert result.p_value < 1e-10
+    assert 3 in result.categories
+
+
+def test_categorical_categories_come_from_reference_only():
+    detector = CategoricalDriftDetector(1, k=10)
+    detector.update_reference(np.array(["a", "b", "c"] * 1000, dtype=object))
+    detector.update(np.array(["z"] * 3000, dtype=object))
+    result = detector.test()[0]
+    assert "z" not in result.categories
+    # Everything unseen in the reference lands in the trailing "other" bucket.
+    assert result.current_counts[-1] == 3000
+    assert result.p_value < 1e-10
+
+
+def test_categorical_merge_matches_single_detector_totals():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 20, (4000, 2))
+    whole = CategoricalDriftDetector(2, k=32, seed=3)
+    left, right = CategoricalDriftDetector(2, k=32, seed=3), CategoricalDriftDetector(2, k=32, seed=3)
+    whole.update_reference(values)
+    left.update_reference(values[:2000])
+    right.update_reference(values[2000:])
+    left.merge(right)
+    for index, (merged, single) in enumerate(zip(left.test(), whole.test())):
+        # Every reference row went either to choosing the categories or to the counts.
+        assert merged.reference_counts.sum() + left.reference[index].total == 4000
+        assert set(merged.categories) == set(single.categories) == set(range(20))
+
+
+def test_psi_scores_every_feature_like_a_per_feature_loop():
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(5000, 40))
+    current = rng.normal(0.3, 1.2, (4000, 40))
+    psi = PSIReference.fit(reference, n_bins=10)
+    expected = []
+    for column in range(40):
+        edges = psi.interior_edges[column]
+        ref = np.bincount(np.searchsorted(edges, reference[:, column], side="right"), minlength=10) / 5000
+        cur = np.bincount(np.searchsorted(edges, current[:, column], side="right"), minlength=10) / 4000
+        expected.append(population_stability_index(ref[None, :], cur[None, :])[0])
+    np.testing.assert_allclose(psi.score(current), expected, rtol=1e-6)
+    # Chunked counts add up to the one-pass score.
+    counts = sum(psi.bin_counts(chunk) for chunk in np.array_split(current, 7))
+    np.testing.assert_allclose(psi.score_counts(counts), psi.score(current))
+
+
+def test_psi_separates_resamples_from_shifts():
+    rng = np.random.default_rng(1)
+    psi = PSIReference.fit(rng.normal(size=(20_000, 200)))
+    assert psi.score(rng.normal(size=(20_000, 200))).max() < 0.02
+    assert psi.score(rng.normal(0.5, 1.0, (20_000, 200))).min() > 0.1
+
+
+def test_ks_null_hypothesis_keeps_false_alarm_rate():
+    alarms = 0
+    for trial in range(30):
+        rng = np.random.default_rng(trial)
+        detector = KSDetector(5, seed=trial)
+        detector.update_reference(rng.normal(size=(5000, 5)))
+        detector.update(rng.normal(size=(5000, 5)))
+        alarms += int(detector.test().drifted(0.05).sum())
+    assert alarms / 150 <= 0.1
+
+
+def test_ks_flags_a_shift_and_merges_shards():
+    rng = np.random.default_rng(2)
+    reference, current = rng.normal(size=(8000, 2)), np.c_[rng.normal(size=8000), rng.normal(0.3, 1.0, 8000)]
+    left, right = KSDetector(2, seed=5), KSDetector(2, seed=6)
+    left.update_reference(reference[:4000])
+    right.update_reference(reference[4000:])
+    left.update(current[:4000])
+    right.update(current[4000:])
+    left.merge(right)
+    result = left.test()
+    assert result.n_reference.tolist() == [8000, 8000]
+    assert result.drifted(0.05, 0.05).tolist() == [False, True]
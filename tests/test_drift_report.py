@@ -0,0 +1,86 @@
+import csv
+
+import numpy as np
+import pytest
+
+from monitoring_tool import drift_report
+from monitoring_tool.drift_report import CATEGORICAL, NUMERIC, build_drift_report
+
+
+def _write(path, columns):
+    names = list(columns)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(names)
+        writer.writerows(zip(*(columns[name] for name in names)))
+    return path
+
+
+def _snapshot(path, rng, rows, shift=0.0, late_text=None):
+    code = [str(value) for value in rng.integers(0, 5, rows)]
+    if late_text is not None:
+        code[late_text:] = ["desconhecido"] * (rows - late_text)
+    return _write(
+        path,
+        {
+            "x": rng.normal(shift, 1.0, rows),
+            "y": rng.normal(0.0, 1.0, rows),
+            "level": [f"n{value}" for value in rng.integers(0, 8, rows)],
+            "code": code,
+        },
+    )
+
+
+def test_identical_distributions_raise_no_alerts(tmp_path):
+    rng = np.random.default_rng(0)
+    reference = _snapshot(tmp_path / "ref.csv", rng, 20_000)
+    current = _snapshot(tmp_path / "cur.csv", rng, 20_000)
+    report = build_drift_report(reference, current, workers=1, chunk_rows=3_000)
+    assert report.drifted == ()
+    assert [feature.kind for feature in report.features] == [NUMERIC, NUMERIC, CATEGORICAL, NUMERIC]
+
+
+def test_column_turning_to_text_later_is_categorical(tmp_path):
+    rng = np.random.default_rng(1)
+    reference = _snapshot(tmp_path / "ref.csv", rng, 10_000, late_text=9_000)
+    current = _snapshot(tmp_path / "cur.csv", rng, 10_000, shift=1.0)
+    report = build_drift_report(reference, current, workers=1, chunk_rows=2_000)
+    by_name = {feature.name: feature for feature in report.features}
+    assert by_name["code"].kind == CATEGORICAL
+    assert by_name["code"].drifted
+    assert by_name["x"].kind == NUMERIC and "KS" in by_name["x"].alerts
+
+
+def test_text_in_the_current_file_makes_the_column_categorical(tmp_path):
+    rng = np.random.default_rng(2)
+    reference = _snapshot(tmp_path / "ref.csv", rng, 5_000)
+    current = _snapshot(tmp_path / "cur.csv", rng, 5_000, late_text=4_000)
+    report = build_drift_report(reference, current, features=["code"], workers=1)
+    assert report.features[0].kind == CATEGORICAL
+
+
+def test_workers_receive_columns_parsed_once(tmp_path, monkeypatch):
+    rng = np.random.default_rng(3)
+    reference = _snapshot(tmp_path / "ref.csv", rng, 12_000)
+    current = _snapshot(tmp_path / "cur.csv", rng, 12_000, shift=0.5)
+    reads = []
+    original = drift_report.iter_table_chunks
+
+    def counting(path, *args, **kwargs):
+        reads.append(str(path))
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(drift_report, "iter_table_chunks", counting)
+    parallel = build_drift_report(reference, current, workers=2, chunk_rows=2_500)
+    assert reads == [str(reference), str(current)]
+
+    serial = build_drift_report(reference, current, workers=1, chunk_rows=2_500)
+    for left, right in zip(parallel.features, serial.features):
+        assert (left.name, left.kind, left.n_reference, left.n_current) == (
+            right.name,
+            right.kind,
+            right.n_reference,
+            right.n_current,
+        )
+        assert left.psi == pytest.approx(right.psi, abs=0.02)
+    assert {feature.name for feature in parallel.drifted} == {"x"}
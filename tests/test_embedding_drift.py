@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.embedding_drift import EmbeddingDriftDetector
+
+
+def _data(seed, rows=4000, dims=32, shift=0.0):
+    return np.random.default_rng(seed).normal(shift, 1.0, (rows, dims))
+
+
+def test_shards_merge_into_the_single_pass_summary():
+    reference, current = _data(0), _data(1)
+    owner = EmbeddingDriftDetector(32, seed=3)
+    owner.update_reference(reference[:2000])
+    shards = [owner.shard() for _ in range(2)]
+    shards[0].update_reference(reference[2000:])
+    shards[1].update(current)
+    for shard in shards:
+        owner.merge(shard)
+
+    single = EmbeddingDriftDetector(32, seed=3, bandwidth=owner.bandwidth)
+    single.update_reference(reference)
+    single.update(current)
+    np.testing.assert_allclose(owner.reference.feature_sum, single.reference.feature_sum)
+    np.testing.assert_allclose(owner.current.feature_sum, single.current.feature_sum)
+    assert owner.test().mmd2 == pytest.approx(single.test().mmd2)
+
+
+def test_empty_detector_adopts_the_fitted_bandwidth():
+    owner = EmbeddingDriftDetector(32, seed=3)
+    owner.update_reference(_data(0))
+    collector = EmbeddingDriftDetector(32, seed=3)
+    collector.merge(owner)
+    assert collector.bandwidth == owner.bandwidth
+    assert collector.reference.count == owner.reference.count
+
+
+def test_shards_with_their_own_bandwidth_do_not_merge():
+    left, right = EmbeddingDriftDetector(32, seed=3), EmbeddingDriftDetector(32, seed=3)
+    left.update_reference(_data(0))
+    right.update_reference(_data(1, shift=0.5) * 3.0)
+    with pytest.raises(ValueError, match="larguras de banda"):
+        left.merge(right)
+    with pytest.raises(ValueError):
+        EmbeddingDriftDetector(32).shard()
+
+
+def test_flags_a_shift_but_not_a_resample():
+    detector = EmbeddingDriftDetector(32, seed=1)
+    detector.update_reference(_data(0))
+    detector.update(_data(1))
+    assert not detector.test().drifted()
+    detector.reset_window()
+    detector.update(_data(2, shift=0.5))
+    assert detector.test().drifted()
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.fairness import FairnessMonitor
+
+
+def _batch(seed, rows=3000):
+    rng = np.random.default_rng(seed)
+    groups = rng.choice(["a", "b", "c", "d"], rows, p=[0.4, 0.3, 0.2, 0.1])
+    y_pred = (rng.random(rows) < np.where(groups == "a", 0.5, 0.3)).astype(int)
+    y_true = (rng.random(rows) < 0.4).astype(np.float64)
+    y_true[rng.random(rows) < 0.1] = np.nan
+    return groups, y_pred, y_true
+
+
+def _reference(groups, y_pred, y_true):
+    """Per-group rates computed with a dict of row lists."""
+
+    rows = {}
+    for group, predicted, actual in zip(groups.tolist(), y_pred.tolist(), y_true.tolist()):
+        rows.setdefault(group, []).append((predicted, actual))
+    rates = {}
+    for group, values in rows.items():
+        labeled = [(p, a) for p, a in values if a == a]
+        tp = sum(1 for p, a in labeled if p == 1 and a == 1)
+        fn = sum(1 for p, a in labeled if p != 1 and a == 1)
+        fp = sum(1 for p, a in labeled if p == 1 and a != 1)
+        tn = sum(1 for p, a in labeled if p != 1 and a != 1)
+        rates[group] = (
+            len(values),
+            sum(1 for p, _ in values if p == 1) / len(values),
+            tp / (tp + fn),
+            fp / (fp + tn),
+        )
+    return rates
+
+
+def test_bincount_rates_match_a_per_group_computation():
+    groups, y_pred, y_true = _batch(0)
+    monitor = FairnessMonitor(reference_group="a")
+    monitor.update(groups, y_pred, y_true)
+    report = monitor.report()
+    expected = _reference(groups, y_pred, y_true)
+
+    assert sorted(report.groups) == sorted(expected)
+    for index, group in enumerate(report.groups):
+        decisions, selection, tpr, fpr = expected[group]
+        assert report.decisions[index] == decisions
+        assert report.selection_rate[index] == pytest.approx(selection)
+        assert report.true_positive_rate[index] == pytest.approx(tpr)
+        assert report.false_positive_rate[index] == pytest.approx(fpr)
+        assert report.impact_ratio[index] == pytest.approx(selection / expected["a"][1])
+
+    selections = [value[1] for value in expected.values()]
+    assert report.demographic_parity_gap == pytest.approx(max(selections) - min(selections))
+    tprs, fprs = [value[2] for value in expected.values()], [value[3] for value in expected.values()]
+    assert report.equalized_odds_gap == pytest.approx(max(max(tprs) - min(tprs), max(fprs) - min(fprs)))
+    assert set(report.below_impact_ratio()) == {
+        group for group, value in expected.items() if value[1] / expected["a"][1] < 0.8
+    }
+
+
+def test_intersectional_groups_are_tuples():
+    rng = np.random.default_rng(1)
+    groups = np.column_stack([rng.choice(["f", "m"], 500), rng.choice([1, 2, 3], 500)])
+    y_pred = rng.integers(0, 2, 500)
+    monitor = FairnessMonitor()
+    monitor.update(groups, y_pred)
+    report = monitor.report()
+    rows = {}
+    for row, predicted in zip(groups.tolist(), y_pred.tolist()):
+        rows.setdefault(tuple(row), []).append(predicted)
+    assert sorted(report.groups) == sorted(rows)
+    for index, group in enumerate(report.groups):
+        assert report.decisions[index] == len(rows[group])
+        assert report.selection_rate[index] == pytest.approx(np.mean(rows[group]))
+
+
+def test_merge_equals_a_single_pass():
+    batches = [_batch(seed, rows) for seed, rows in [(2, 1000), (3, 700), (4, 1200)]]
+    single = FairnessMonitor()
+    for batch in batches:
+        single.update(*batch)
+
+    merged = FairnessMonitor()
+    for batch in batches:
+        shard = FairnessMonitor()
+        # Shards see groups in a different order, so merge must align by label.
+        order = np.argsort(batch[0])[::-1]
+        shard.update(*(column[order] for column in batch))
+        merged.merge(shard)
+
+    by_label = dict(zip(single.groups, single.counters.tolist()))
+    assert dict(zip(merged.groups, merged.counters.tolist())) == by_label
@@ -0,0 +1,44 @@
+from monitoring_tool import guide
+
+
+def test_write_summary_creates_then_skips_an_up_to_date_guide(tmp_path):
+    path = tmp_path / "guia.md"
+    assert guide.write_summary(path)
+    assert path.read_text(encoding="utf-8") == guide.build_summary() + "\n"
+    assert guide.write_summary(path) == []
+
+
+def test_write_summary_replaces_edited_guide(tmp_path):
+    path = tmp_path / "guia.md"
+    guide.write_summary(path)
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text.replace("## Casos de uso", "## Casos de uso\nnota local", 1), encoding="utf-8")
+
+    assert guide.write_summary(path) == ["Casos de uso"]
+    assert path.read_text(encoding="utf-8") == text
+    assert [entry.name for entry in tmp_path.iterdir()] == ["guia.md"]
+
+
+def test_format_drift_report_lists_the_related_problem():
+    from monitoring_tool.drift_report import NUMERIC, DriftReport, DriftThresholds, FeatureDrift
+
+    feature = FeatureDrift("x", NUMERIC, 100, 100, 0, 0, 0.5, 40.0, 0.001, 0.2, 0.3, 0.001, ("PSI", "KS"))
+    report = DriftReport("ref.csv", "cur.csv", 100, 100, DriftThresholds(), (feature,))
+    text = guide.format_drift_report(report)
+    assert "## Problemas relacionados" in text
+    assert "### Drift de dados" in text
+
+
+def test_build_summary_renders_each_entry_once():
+    from dataclasses import replace
+
+    guide._rendered_sections.clear()
+    summary = guide.build_summary()
+    rendered = dict(guide._rendered_sections)
+    assert guide.build_summary() == summary
+    assert guide._rendered_sections == rendered
+
+    technique = guide.MONITORING_TECHNIQUES[0]
+    edited = replace(technique, name="Técnica editada")
+    assert guide._render_cached(technique, guide._technique_section) == rendered[id(technique)][1]
+    assert guide._render_cached(edited, guide._technique_section).startswith("### Técnica editada")
@@ -0,0 +1,109 @@
+import builtins
+import csv
+import os
+
+import numpy as np
+
+from monitoring_tool import instrumentation
+from monitoring_tool.concept_drift import ADWIN
+from monitoring_tool.drift import CategoricalDriftDetector, KSDetector
+from monitoring_tool.drift_report import build_drift_report
+from monitoring_tool.embedding_drift import EmbeddingDriftDetector
+from monitoring_tool.instrumentation import REGISTRY, Registry, format_stats, parse_text
+from monitoring_tool.isolation_forest import IsolationForest
+from monitoring_tool.label_join import LabelJoiner
+
+
+def _registry():
+    registry = Registry()
+    seconds = registry.histogram(
+        "monitoring_tool_detector_update_seconds", "Tempo.", ("technique", "detector"), buckets=(0.01, 0.1)
+    )
+    rows = registry.counter("monitoring_tool_detector_rows_total", "Linhas.", ("technique", "detector"))
+    return registry, seconds, rows
+
+
+def test_render_is_prometheus_text():
+    registry, seconds, rows = _registry()
+    seconds.observe(0.05, "drift", "KS")
+    seconds.observe(0.5, "drift", "KS")
+    rows.inc(100, "drift", "KS")
+    text = registry.render()
+    assert "# TYPE monitoring_tool_detector_update_seconds histogram" in text
+    samples = {(name, labels.get("le")): value for name, labels, value in parse_text(text)}
+    assert samples[("monitoring_tool_detector_update_seconds_bucket", "0.01")] == 0
+    assert samples[("monitoring_tool_detector_update_seconds_bucket", "0.1")] == 1
+    assert samples[("monitoring_tool_detector_update_seconds_bucket", "+Inf")] == 2
+    assert samples[("monitoring_tool_detector_update_seconds_count", None)] == 2
+    assert samples[("monitoring_tool_detector_rows_total", None)] == 100
+    assert "KS" in format_stats(text)
+
+
+def test_drained_worker_metrics_merge_into_the_parent():
+    parent, parent_seconds, _ = _registry()
+    worker, worker_seconds, worker_rows = _registry()
+    parent_seconds.observe(0.05, "drift", "PSI")
+    worker_seconds.observe(0.05, "drift", "PSI")
+    worker_rows.inc(10, "drift", "PSI")
+    parent.merge(worker.drain())
+    assert worker_seconds.values == {}
+    assert parent_seconds.values[("drift", "PSI")][-1] == 0.1
+    assert parent.metrics["monitoring_tool_detector_rows_total"].values[("drift", "PSI")] == 10
+
+
+def _rows_by_detector():
+    counter = REGISTRY.metrics["monitoring_tool_detector_rows_total"]
+    return {detector: value for (_, detector), value in counter.values.items()}
+
+
+def test_detector_updates_record_rows():
+    REGISTRY.drain()
+    rng = np.random.default_rng(0)
+    ks = KSDetector(2)
+    ks.update_reference(rng.normal(size=(300, 2)))
+    ks.update(rng.normal(size=(200, 2)))
+    CategoricalDriftDetector(1).update_reference(rng.integers(0, 4, (150, 1)))
+    ADWIN().update_batch(rng.integers(0, 2, 120))
+    IsolationForest(10, seed=0).fit(rng.normal(size=(256, 3))).score(rng.normal(size=(50, 3)))
+    embeddings = EmbeddingDriftDetector(8, projection_dims=4, n_fourier=16, n_slices=4)
+    embeddings.update_reference(rng.normal(size=(90, 8)))
+    joiner = LabelJoiner(ttl=60.0)
+    joiner.add_predictions(["a", "b", "c"], [0.1, 0.9, 0.5], [0.0, 1.0, 2.0])
+    joiner.add_labels(["a", "b"], [0, 1], [3.0, 3.0])
+
+    assert _rows_by_detector() == {
+        "KSDetector": 500,
+        "CategoricalDriftDetector": 150,
+        "ADWIN": 120,
+        "IsolationForest": 50,
+        "EmbeddingDriftDetector": 90,
+        "LabelJoiner.add_predictions": 3,
+        "LabelJoiner.add_labels": 2,
+    }
+    REGISTRY.drain()
+
+
+def test_drift_report_workers_send_their_metrics_back(tmp_path):
+    rng = np.random.default_rng(1)
+    for name in ("ref.csv", "cur.csv"):
+        with open(tmp_path / name, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["x", "y", "code"])
+            writer.writerows(zip(rng.normal(size=400), rng.normal(size=400), (f"c{value}" for value in rng.integers(0, 3, 400))))
+
+    REGISTRY.drain()
+    build_drift_report(tmp_path / "ref.csv", tmp_path / "cur.csv", workers=2, chunk_rows=100)
+    rows = _rows_by_detector()
+    REGISTRY.drain()
+    # Each worker profiles its own features; both sides of every feature are counted once.
+    assert rows == {"KSDetector": 1600, "CategoricalDriftDetector": 800}
+
+
+def test_process_gauge_falls_back_without_proc(monkeypatch):
+    def no_proc(path, *args, **kwargs):
+        raise OSError(path)
+
+    monkeypatch.setattr(builtins, "open", no_proc)
+    instrumentation._update_process_gauges()
+    monkeypatch.undo()
+    assert instrumentation.PROCESS_RESIDENT_BYTES.values[(str(os.getpid()),)] > 0
@@ -0,0 +1,51 @@
+import numpy as np
+
+from monitoring_tool.isolation_forest import IsolationForest, average_path_length
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    inliers = rng.normal(0.0, 1.0, (2000, 4))
+    outliers = rng.uniform(6.0, 9.0, (20, 4)) * rng.choice([-1.0, 1.0], (20, 4))
+    return inliers, outliers
+
+
+def _walk(forest, sample):
+    """Path length of one sample, following each tree node by node."""
+
+    lengths = []
+    for tree in range(forest.n_trees):
+        node = 0
+        while forest.feature[tree, node] >= 0:
+            go_left = sample[forest.feature[tree, node]] < forest.threshold[tree, node]
+            node = forest.left[tree, node] if go_left else forest.right[tree, node]
+        lengths.append(forest.depth[tree, node] + average_path_length(forest.size[tree, node]))
+    return np.mean(lengths)
+
+
+def test_outliers_score_above_inliers():
+    inliers, outliers = _data()
+    forest = IsolationForest(100, seed=1).fit(inliers)
+    scores_in, scores_out = forest.score(inliers), forest.score(outliers)
+    assert scores_out.min() > np.quantile(scores_in, 0.99)
+    assert forest.flag(outliers).all()
+    assert forest.flag(inliers).mean() < 0.05
+
+
+def test_level_by_level_scoring_matches_a_per_sample_walk():
+    inliers, outliers = _data(1)
+    forest = IsolationForest(30, seed=2).fit(inliers)
+    samples = np.vstack([inliers[:50], outliers])
+    expected = [_walk(forest, sample) for sample in samples]
+    np.testing.assert_allclose(forest.path_lengths(samples), expected)
+
+
+def test_fixed_seed_is_deterministic_in_serial_and_parallel():
+    inliers, outliers = _data(2)
+    samples = np.vstack([inliers, outliers])
+    serial = IsolationForest(60, seed=3).fit(inliers)
+    again = IsolationForest(60, seed=3).fit(inliers)
+    parallel = IsolationForest(60, seed=3, n_jobs=3).fit(inliers)
+    np.testing.assert_array_equal(serial.score(samples), again.score(samples))
+    np.testing.assert_array_equal(parallel.threshold, serial.threshold)
+    np.testing.assert_array_equal(parallel.score(samples), serial.score(samples))
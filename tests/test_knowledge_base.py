@@ -0,0 +1,63 @@
+import pytest
+
+from monitoring_tool.data import MONITORING_TECHNIQUES, PRODUCTION_PROBLEMS, USE_CASES
+from monitoring_tool.knowledge_base import KnowledgeBase, TrigramIndex, normalize
+
+
+@pytest.fixture(scope="module")
+def base():
+    return KnowledgeBase(MONITORING_TECHNIQUES, PRODUCTION_PROBLEMS, USE_CASES)
+
+
+def test_normalize_folds_case_and_accents():
+    assert normalize("  Detecção de DRIFT ") == "deteccao de drift"
+    assert normalize("Concessão") == normalize("concessao")
+
+
+def test_exact_lookup_returns_the_catalogue_entry(base):
+    for technique in MONITORING_TECHNIQUES:
+        assert base.technique(technique.name) is technique
+    assert base.problem("Drift de conceito") is PRODUCTION_PROBLEMS[1]
+    assert base.use_case("Detecção de fraude") is USE_CASES[1]
+
+
+def test_lookup_ignores_case_and_accents(base):
+    assert base.technique("deteccao de drift de dados").name == "Detecção de Drift de Dados"
+    assert base.use_case("CONCESSAO DE CREDITO").name == "Concessão de crédito"
+    assert base.problem("vies algoritmico").name == "Viés algorítmico"
+
+
+def test_fuzzy_lookup_accepts_a_clear_typo(base):
+    # No exact key matches, so these go through the trigram index.
+    assert base.technique("Monitoramento de Performnce").name == "Monitoramento de Performance"
+    assert base.use_case("manutencao preditva").name == "Manutenção preditiva"
+
+
+def test_ambiguous_match_lists_suggestions(base):
+    with pytest.raises(ValueError, match="Sugestões: .*Monitoramento") as error:
+        base.technique("Monitoramento")
+    assert "Técnica 'Monitoramento' não encontrada." in str(error.value)
+
+
+def test_unknown_name_points_to_list(base):
+    with pytest.raises(ValueError, match="Problema 'xyzzy' não encontrado. Use o comando 'list'"):
+        base.problem("xyzzy")
+
+
+def test_trigram_index_ranks_by_dice_score():
+    index = TrigramIndex[str]()
+    for name in ("latency", "latent", "throughput"):
+        index.add(name, name)
+    matches = index.search("latncy")
+    assert [name for name, _ in matches] == ["latency", "latent"]
+    assert matches[0][1] > matches[1][1]
+    assert index.search("zzz") == []
+
+
+def test_search_weights_names_and_tolerates_typos(base):
+    hits = base.search("fraude")
+    assert (hits[0].kind, hits[0].name) == ("use_case", "Detecção de fraude")
+    assert "nome" in hits[0].fields
+    typo = base.search("fraud3")
+    assert typo[0].name == "Detecção de fraude"
+    assert all(hit.kind == "problem" for hit in base.search("drift", kinds=["problem"]))
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.label_join import LabelJoiner
+
+
+class _DictJoiner:
+    """Plain-dict model of the joiner's semantics."""
+
+    def __init__(self, ttl):
+        self.ttl, self.clock, self.pending = ttl, -np.inf, {}
+
+    def add_predictions(self, ids, predictions, times):
+        self.clock = max(self.clock, max(times))
+        for key, prediction, time in zip(ids, predictions, times):
+            self.pending[key] = (time, prediction)
+
+    def add_labels(self, ids, labels, times):
+        self.clock = max(self.clock, max(times))
+        joined, seen = [], set()
+        for key, label, time in zip(ids, labels, times):
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = self.pending.pop(key, None)
+            if entry is not None and entry[0] >= self.clock - self.ttl:
+                joined.append((entry[0], time, entry[1], label))
+        return joined
+
+
+@pytest.mark.parametrize("max_in_memory", [None, 500])
+def test_matches_a_dict_join(tmp_path, max_in_memory):
+    rng = np.random.default_rng(7)
+    joiner = LabelJoiner(ttl=300.0, max_in_memory=max_in_memory, spill_dir=tmp_path, capacity=64)
+    model = _DictJoiner(300.0)
+    clock = 0.0
+    for _ in range(60):
+        clock += 20.0
+        ids = [f"p{value}" for value in rng.integers(0, 5000, 200)]
+        predictions = rng.random(200).tolist()
+        times = (clock + rng.random(200)).tolist()
+        joiner.add_predictions(ids, predictions, times)
+        model.add_predictions(ids, predictions, times)
+
+        ids = [f"p{value}" for value in rng.integers(0, 5000, 150)]
+        labels = rng.integers(0, 2, 150).astype(float).tolist()
+        times = (clock + 1.0 + rng.random(150)).tolist()
+        batch = joiner.add_labels(ids, labels, times)
+        expected = model.add_labels(ids, labels, times)
+        got = list(zip(batch.prediction_time, batch.label_time, batch.prediction, batch.label))
+        assert got == expected
+
+    if max_in_memory is not None:
+        assert joiner.stats()["segments"] > 0
+    joiner.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_feeds_sinks_and_counts_unmatched_labels():
+    received = []
+    joiner = LabelJoiner(ttl=10.0, sinks=[received.append])
+    joiner.add_predictions(["a", "b"], [0.9, 0.2], [0.0, 0.0])
+    batch = joiner.add_labels(["a", "c", "a"], [1.0, 0.0, 0.0], [1.0, 1.0, 1.0])
+    assert batch.label.tolist() == [1.0]
+    assert batch.errors().tolist() == [0.0]
+    assert received == [batch]
+    assert joiner.unmatched_labels == 2
+
+    joiner.evict(now=20.0)
+    assert joiner.expired == 1
+    assert len(joiner.add_labels(["b"], [0.0], [20.0])) == 0
+
+
+def test_performance_sink_passes_scores_to_classification_metrics():
+    from monitoring_tool.label_join import performance_sink
+    from monitoring_tool.performance import ClassificationMetrics
+
+    rng = np.random.default_rng(3)
+    labels = (rng.random(2000) < 0.4).astype(float)
+    scores = np.clip(0.3 * labels + 0.7 * rng.random(2000), 0.0, 1.0)
+    metrics = ClassificationMetrics()
+    joiner = LabelJoiner(ttl=1e6, sinks=[performance_sink(metrics)])
+    ids = [f"p{index}" for index in range(2000)]
+    joiner.add_predictions(ids, scores, np.zeros(2000))
+    for start in range(0, 2000, 500):
+        joiner.add_labels(ids[start : start + 500], labels[start : start + 500], np.ones(500))
+
+    positives, negatives = scores[labels == 1], scores[labels == 0]
+    exact = ((positives[:, None] > negatives[None, :]).mean()
+             + 0.5 * (positives[:, None] == negatives[None, :]).mean())
+    assert metrics.count == 2000
+    assert metrics.roc_auc == pytest.approx(exact, abs=2e-3)
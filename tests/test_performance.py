@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.performance import ClassificationMetrics, RegressionMetrics, performance_metrics
+
+
+def _exact_auc(y_true, y_score):
+    positives, negatives = y_score[y_true == 1], y_score[y_true == 0]
+    wins = (positives[:, None] > negatives[None, :]).sum() + 0.5 * (positives[:, None] == negatives[None, :]).sum()
+    return wins / (positives.size * negatives.size)
+
+
+def test_classification_metrics_match_exact_values():
+    rng = np.random.default_rng(0)
+    y_true = (rng.random(3000) < 0.3).astype(float)
+    y_score = np.clip(0.35 * y_true + rng.random(3000) * 0.7, 0.0, 1.0)
+    metrics = ClassificationMetrics()
+    for chunk in np.array_split(np.arange(3000), 5):
+        metrics.update(y_true[chunk], y_score[chunk])
+
+    predicted = y_score >= 0.5
+    tp = np.sum(predicted & (y_true == 1))
+    assert metrics.count == 3000
+    assert metrics.accuracy == pytest.approx(np.mean(predicted == (y_true == 1)))
+    assert metrics.precision == pytest.approx(tp / predicted.sum())
+    assert metrics.recall == pytest.approx(tp / (y_true == 1).sum())
+    # Scores are binned into 1000 bins, so the AUC is exact up to ties within a bin.
+    assert metrics.roc_auc == pytest.approx(_exact_auc(y_true, y_score), abs=2e-3)
+
+
+def test_merged_shards_equal_one_pass():
+    rng = np.random.default_rng(1)
+    y_true, y_score = (rng.random(1000) < 0.5).astype(float), rng.random(1000)
+    whole, left, right = ClassificationMetrics(), ClassificationMetrics(), ClassificationMetrics()
+    whole.update(y_true, y_score)
+    left.update(y_true[:400], y_score[:400])
+    right.update(y_true[400:], y_score[400:])
+    left.merge(right)
+    assert left.metrics() == whole.metrics()
+    with pytest.raises(ValueError):
+        left.merge(ClassificationMetrics(threshold=0.7))
+
+
+def test_regression_metrics_and_dispatch():
+    rng = np.random.default_rng(2)
+    y_true = rng.normal(10.0, 2.0, 500)
+    y_pred = y_true + rng.normal(0.5, 1.0, 500)
+    metrics = performance_metrics(y_true, y_pred)
+    error = y_pred - y_true
+    assert metrics["rmse"] == pytest.approx(np.sqrt(np.mean(error**2)))
+    assert metrics["mae"] == pytest.approx(np.mean(np.abs(error)))
+    assert metrics["bias"] == pytest.approx(np.mean(error))
+    assert metrics["r2"] == pytest.approx(1 - np.sum(error**2) / np.sum((y_true - y_true.mean()) ** 2))
+    assert "roc_auc" in performance_metrics(np.array([0.0, 1.0]), np.array([0.2, 0.9]))
+    assert performance_metrics(np.array([np.nan]), np.array([0.5])) is None
+
+    regression = RegressionMetrics()
+    regression.update(y_true, y_pred)
+    assert regression.metrics() == metrics
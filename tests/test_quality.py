@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.quality import ForeignKey, InRange, NotNull, RuleSet, StatisticBetween, Unique
+from monitoring_tool.tables import SchemaError, iter_csv_chunks
+
+
+def _write_csv(path, header, rows):
+    path.write_text("\n".join([header, *rows]) + "\n", encoding="utf-8")
+    return path
+
+
+def test_schema_is_fixed_by_first_chunk(tmp_path):
+    path = _write_csv(tmp_path / "data.csv", "code", ["1", "2", "A7", "B8"])
+    with pytest.raises(SchemaError) as error:
+        list(iter_csv_chunks(path, chunk_rows=2))
+    assert error.value.column == "code"
+    assert "linha 4" in str(error.value)
+
+
+def test_declared_text_column_is_text_in_every_chunk(tmp_path):
+    path = _write_csv(tmp_path / "data.csv", "code", ["1", "2", "A7", "1"])
+    chunks = list(iter_csv_chunks(path, chunk_rows=2, dtypes={"code": "text"}))
+    assert [chunk["code"].tolist() for chunk in chunks] == [["1", "2"], ["A7", "1"]]
+    report = RuleSet([Unique("code")]).validate_chunks(chunks)
+    assert report.results[0].observed == 1.0
+
+
+def test_zero_padded_ids_stay_text_and_match_foreign_keys(tmp_path):
+    path = _write_csv(tmp_path / "data.csv", "sku,qty", ["001,3", "002,4", "001,5"])
+    chunks = list(iter_csv_chunks(path, chunk_rows=2))
+    assert chunks[0]["sku"].tolist() == ["001", "002"]
+    assert chunks[0]["qty"].dtype == np.float64
+    report = RuleSet([ForeignKey("sku", ("001", "002"))]).validate_chunks(chunks)
+    assert report.passed
+    assert report.results[0].observed == 0.0
+
+
+def test_empty_first_chunk_does_not_fix_the_type(tmp_path):
+    path = _write_csv(tmp_path / "data.csv", "note,x", [",1", ",2", "ok,3"])
+    chunks = list(iter_csv_chunks(path, chunk_rows=2))
+    assert np.isnan(chunks[0]["note"]).all()
+    assert chunks[1]["note"].tolist() == ["ok"]
+    report = RuleSet([NotNull("note", 0.3)]).validate_chunks(chunks)
+    assert report.passed
+
+
+def test_invalid_dtype_is_rejected(tmp_path):
+    path = _write_csv(tmp_path / "data.csv", "x", ["1"])
+    with pytest.raises(ValueError):
+        list(iter_csv_chunks(path, dtypes={"x": "int"}))
+
+
+def test_unique_counts_duplicates_across_chunks():
+    chunks = [{"id": np.array([1.0, 2.0, 2.0])}, {"id": np.array([3.0, 1.0])}]
+    report = RuleSet([Unique("id")]).validate_chunks(chunks)
+    assert report.results[0].observed == 2.0
+
+
+def test_unique_tolerates_mixed_object_values():
+    chunks = [{"id": np.array([1.0, 2.0])}, {"id": np.array(["a", 2.0], dtype=object)}]
+    report = RuleSet([Unique("id")]).validate_chunks(chunks)
+    assert not report.passed
+
+
+def test_numeric_rules_on_text_column_count_non_numbers():
+    table = {"age": np.array(["10", "abc", "30", None], dtype=object)}
+    report = RuleSet(
+        [InRange("age", 0, 100), StatisticBetween("age", "mean", 15, 25)]
+    ).validate(table)
+    in_range, mean = report.results
+    # "abc" is filled but not a number, so it is outside the range.
+    assert in_range.observed == pytest.approx(2 / 3)
+    assert mean.observed == pytest.approx(20.0)
+    assert mean.passed
+    assert "1 valores não numéricos" in mean.message
+
+
+def test_foreign_key_with_numeric_column_and_text_keys():
+    report = RuleSet([ForeignKey("store", ("1", "2"))]).validate({"store": np.array([1.0, 2.0, 3.0])})
+    assert report.results[0].observed == 1.0
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+
+from monitoring_tool.service import WindowAssembler, WindowSpec
+
+
+def _assembler(*specs):
+    return WindowAssembler(specs or (WindowSpec(10.0, 10.0),), ("x",), ("x",))
+
+
+def test_out_of_order_records_before_the_first_close_are_kept():
+    assembler = _assembler()
+    lateness = 30.0
+    event_time = -math.inf
+    for timestamp in (105.0, 101.0, 99.0):
+        event_time = max(event_time, timestamp)
+        assembler.add(timestamp, {"x": timestamp})
+        assert assembler.advance(event_time - lateness) == []
+    assert assembler.late_records == 0
+
+    windows = assembler.advance(math.inf)
+    assert [(start, end) for _, start, end, _ in windows] == [(90.0, 100.0), (100.0, 110.0)]
+    assert [batch["x"].tolist() for *_, batch in windows] == [[99.0], [105.0, 101.0]]
+
+
+def test_records_behind_a_closed_pane_are_late():
+    assembler = _assembler()
+    assembler.add(105.0, {"x": 1.0})
+    assert len(assembler.advance(120.0)) == 1
+    assembler.add(99.0, {"x": 2.0})
+    assembler.add(115.0, {"x": 3.0})
+    assert assembler.late_records == 2
+    assert assembler.advance(math.inf) == []
+
+
+def test_sliding_windows_cover_every_pane_of_their_span():
+    assembler = _assembler(WindowSpec(20.0, 10.0))
+    for timestamp in np.arange(0.0, 40.0, 1.0):
+        assembler.add(float(timestamp), {"x": float(timestamp)})
+    windows = assembler.advance(40.0)
+    assert [(start, end, len(batch["x"])) for _, start, end, batch in windows] == [
+        (-10.0, 10.0, 10),
+        (0.0, 20.0, 20),
+        (10.0, 30.0, 20),
+        (20.0, 40.0, 20),
+    ]
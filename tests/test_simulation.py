@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from monitoring_tool.simulation import ProductionParameters, simulate
+
+
+def _run_simulation(parameters, rng):
+    """Line-by-line port of ``runSimulation`` in app.js."""
+
+    minutes_per_shift = parameters.shift_hours * 60
+    base_runtime = minutes_per_shift - parameters.planned_downtime
+    quality = parameters.quality_rate / 100
+    total_good = total_scrap = total_downtime = 0.0
+    for _ in range(parameters.days):
+        for _ in range(parameters.shifts_per_day):
+            unplanned = 0.0
+            for _ in range(max(int(parameters.shift_hours // 1), 1)):
+                if rng.random() * 100 < parameters.unplanned_probability:
+                    unplanned += 5 + rng.random() * 20
+            setup = parameters.setup_time if unplanned > 0 else 0.0
+            produced = max(base_runtime - unplanned, 0) / 60 * parameters.capacity
+            good = produced * quality
+            total_good += good
+            total_scrap += max(produced - good, 0)
+            total_downtime += parameters.planned_downtime + unplanned + setup
+    total_shifts = parameters.days * parameters.shifts_per_day
+    total_runtime = total_shifts * minutes_per_shift
+    utilization = (total_runtime - total_downtime) / total_runtime
+    performance = total_good / total_shifts / (parameters.capacity * parameters.shift_hours)
+    clamp = lambda value: max(0.0, min(1.0, value))
+    return {
+        "total_good": total_good,
+        "total_scrap": total_scrap,
+        "total_downtime_minutes": total_downtime,
+        "utilization": utilization,
+        "performance": performance,
+        "oee": clamp(utilization) * clamp(performance) * clamp(quality),
+    }
+
+
+def test_shapes_and_seeded_reproducibility():
+    parameters = ProductionParameters(days=5, shifts_per_day=2)
+    result = simulate(parameters, replications=300, seed=4)
+    for name in ("total_good", "total_scrap", "total_downtime_minutes", "avg_daily_output",
+                 "per_shift_output", "utilization", "performance", "oee", "throughput_per_hour"):
+        assert getattr(result, name).shape == (300,)
+    assert result.replications == 300
+    np.testing.assert_array_equal(result.oee, simulate(parameters, replications=300, seed=4).oee)
+    assert not np.array_equal(result.oee, simulate(parameters, replications=300, seed=5).oee)
+
+    summary = result.percentiles()
+    assert set(summary["oee"]) == {"mean", "p5", "p50", "p95"}
+    assert summary["oee"]["p5"] <= summary["oee"]["p50"] <= summary["oee"]["p95"]
+    assert summary["total_good"]["mean"] == pytest.approx(result.total_good.mean())
+
+
+def test_without_failures_every_replication_matches_the_browser_run():
+    parameters = ProductionParameters(unplanned_probability=0.0, days=3, shifts_per_day=2)
+    expected = _run_simulation(parameters, random.Random(0))
+    result = simulate(parameters, replications=10, seed=0)
+    for name, value in expected.items():
+        np.testing.assert_allclose(getattr(result, name), value)
+    np.testing.assert_allclose(result.avg_daily_output, expected["total_good"] / 3)
+    np.testing.assert_allclose(result.throughput_per_hour, expected["total_good"] / 6 / 8)
+
+
+@pytest.mark.parametrize("probability", [15.0, 60.0])
+def test_summary_statistics_match_the_browser_run(probability):
+    parameters = ProductionParameters(unplanned_probability=probability, days=4, shifts_per_day=2)
+    rng = random.Random(1)
+    runs = [_run_simulation(parameters, rng) for _ in range(4000)]
+    result = simulate(parameters, replications=20_000, seed=1)
+    for name in runs[0]:
+        reference = np.array([run[name] for run in runs])
+        values = getattr(result, name)
+        error = 4 * np.hypot(reference.std() / np.sqrt(reference.size), values.std() / np.sqrt(values.size))
+        assert abs(values.mean() - reference.mean()) <= error + 1e-12
+        assert values.std() == pytest.approx(reference.std(), rel=0.1)
+
+
+def test_invalid_parameters_are_rejected():
+    with pytest.raises(ValueError):
+        simulate(ProductionParameters(days=0))
+    with pytest.raises(ValueError):
+        simulate(ProductionParameters(quality_rate=120.0))
+    with pytest.raises(ValueError):
+        simulate(replications=0)
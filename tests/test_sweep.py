@@ -0,0 +1,75 @@
+import csv
+
+import numpy as np
+import pytest
+
+from monitoring_tool.__main__ import main
+from monitoring_tool.simulation import ProductionParameters
+from monitoring_tool.sweep import SweepResult, build_scenarios, run_sweep, tornado
+
+
+def test_grid_expansion_crosses_values_and_resolves_app_names():
+    base = ProductionParameters()
+    scenarios = build_scenarios(base, {"capacity": [80, 120], "shiftsPerDay": [1.2, 2.0, 3.0]})
+    assert len(scenarios) == 6
+    assert {(s.capacity, s.shifts_per_day) for s in scenarios} == {
+        (capacity, shifts) for capacity in (80.0, 120.0) for shifts in (1, 2, 3)
+    }
+    assert all(isinstance(s.shifts_per_day, int) for s in scenarios)
+    assert all(s.quality_rate == base.quality_rate for s in scenarios)
+    with pytest.raises(ValueError):
+        build_scenarios(base, {"speed": [1.0]})
+
+
+def test_latin_hypercube_hits_every_stratum_at_each_grid_point():
+    scenarios = build_scenarios(
+        ProductionParameters(), {"days": [5, 7]}, {"unplannedProbability": (10.0, 30.0)}, samples=8, seed=1
+    )
+    assert len(scenarios) == 16
+    for days in (5, 7):
+        values = [s.unplanned_probability for s in scenarios if s.days == days]
+        strata = np.floor((np.array(values) - 10.0) / 20.0 * 8)
+        assert sorted(strata) == list(range(8))
+
+
+def test_tornado_orders_parameters_by_swing():
+    quality = np.repeat([80.0, 90.0, 100.0], 3)
+    capacity = np.tile([90.0, 100.0, 110.0], 3)
+    columns = {name: np.zeros(9) for name in ("oee_mean", "quality_rate", "capacity", "days")}
+    columns.update(quality_rate=quality, capacity=capacity, days=np.full(9, 7.0))
+    # OEE depends strongly on quality and weakly, inversely, on capacity.
+    columns["oee_mean"] = quality / 100 - capacity / 1000
+    bars = tornado(SweepResult(columns), ["qualityRate", "capacity", "days"])
+    assert [bar.parameter for bar in bars] == ["quality_rate", "capacity"]
+    assert bars[0].swing == pytest.approx(0.2)
+    assert bars[1].swing == pytest.approx(-0.02)
+    assert (bars[0].low_value, bars[0].high_value) == (80.0, 100.0)
+
+
+def test_parallel_sweep_matches_serial(tmp_path):
+    scenarios = build_scenarios(ProductionParameters(), {"capacity": [80, 100, 120], "qualityRate": [90, 99]})
+    serial = run_sweep(scenarios, replications=200, seed=3, workers=1, batch_size=1)
+    parallel = run_sweep(scenarios, replications=200, seed=3, workers=2, batch_size=1, output=tmp_path / "out.csv")
+    for name, values in serial.columns.items():
+        np.testing.assert_array_equal(parallel.columns[name], values)
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as handle:
+        assert len(list(csv.DictReader(handle))) == 6
+
+
+def test_cli_sweep_with_two_workers_matches_one(tmp_path, capsys):
+    arguments = [
+        "sweep", "--grid", "capacity=80,120", "--range", "unplannedProbability=5:40",
+        "--samples", "4", "--replications", "200", "--seed", "7",
+    ]
+    main([*arguments, "--workers", "1", "--output", str(tmp_path / "one.csv")])
+    one = capsys.readouterr().out
+    main([*arguments, "--workers", "2", "--output", str(tmp_path / "two.csv")])
+    two = capsys.readouterr().out
+    assert "Cenários simulados: 8" in one
+    assert one.replace("one.csv", "two.csv") == two
+
+    def rows(name):
+        with open(tmp_path / name, newline="", encoding="utf-8") as handle:
+            return sorted(tuple(row.values()) for row in csv.DictReader(handle))
+
+    assert rows("one.csv") == rows("two.csv")
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from monitoring_tool.timeseries import DAY, HOUR, MINUTE, RAW, SignalStore
+
+
+def _points(seconds, interval=10.0, seed=0):
+    times = np.arange(0.0, seconds, interval)
+    values = np.random.default_rng(seed).normal(50.0, 5.0, times.size)
+    return times, values
+
+
+def _reference(times, values, width):
+    """Per-bucket statistics from an explicit group-by."""
+
+    buckets = np.floor(times / width)
+    rows = []
+    for bucket in np.unique(buckets):
+        chunk = values[buckets == bucket]
+        rows.append((bucket * width, chunk.size, chunk.mean(), chunk.min(), chunk.max(), chunk.std()))
+    return np.array(rows)
+
+
+def _as_rows(series):
+    return np.column_stack([series.start, series.count, series.mean, series.minimum, series.maximum, series.std])
+
+
+def test_raw_ring_wraps_around_and_keeps_the_newest_points():
+    store = SignalStore(capacities={RAW: 100})
+    times, values = _points(2500)
+    for start in range(0, times.size, 30):
+        store.append("cpu", times[start : start + 30], values[start : start + 30])
+    series = store.query("cpu", 0.0, 2500.0, step=10.0, resolution=RAW)
+    np.testing.assert_array_equal(series.start, times[-100:])
+    np.testing.assert_array_equal(series.mean, values[-100:])
+    # The raw ring no longer reaches back to the start, so minutes are used.
+    assert store.choose_resolution("cpu", 0.0, 10.0) == MINUTE
+    assert store.choose_resolution("cpu", times[-100], 10.0) == RAW
+
+    # The same holds when a single batch overflows the ring.
+    single = SignalStore(capacities={RAW: 100})
+    single.append("cpu", times, values)
+    assert single.choose_resolution("cpu", 0.0, 10.0) == MINUTE
+
+
+@pytest.mark.parametrize("resolution", [MINUTE, HOUR, DAY])
+def test_rollups_match_a_group_by_of_the_raw_points(resolution):
+    store = SignalStore()
+    times, values = _points(3 * DAY + 5 * HOUR, interval=37.0)
+    order = np.random.default_rng(1).permutation(times.size)
+    # Out-of-order batches land in the right buckets.
+    for chunk in np.array_split(order, 20):
+        store.append("latency", times[chunk], values[chunk])
+    series = store.query("latency", 0.0, 4 * DAY, step=resolution, resolution=resolution)
+    np.testing.assert_allclose(_as_rows(series), _reference(times, values, resolution), atol=1e-6)
+
+
+def test_coarser_query_steps_merge_stored_buckets():
+    store = SignalStore()
+    times, values = _points(2 * DAY)
+    store.append("load", times, values)
+    series = store.query("load", 0.0, 2 * DAY, step=6 * HOUR)
+    assert series.resolution == HOUR
+    np.testing.assert_allclose(_as_rows(series), _reference(times, values, 6 * HOUR), atol=1e-6)
+
+
+def test_rollup_ring_overwrites_expired_buckets_and_ignores_late_points():
+    store = SignalStore(capacities={RAW: 10, MINUTE: 60})
+    times, values = _points(3 * HOUR)
+    store.append("temp", times, values)
+    minutes = store.query("temp", 0.0, 3 * HOUR, step=MINUTE, resolution=MINUTE)
+    np.testing.assert_array_equal(minutes.start, np.arange(120, 180) * 60.0)
+    assert minutes.count.sum() == 360
+
+    # A point older than the minute ring's retention only reaches hours and days.
+    store.append("temp", [30.0], [1000.0])
+    assert store.query("temp", 0.0, 3 * HOUR, step=MINUTE, resolution=MINUTE).maximum.max() < 1000.0
+    hours = store.query("temp", 0.0, 3 * HOUR, step=HOUR, resolution=HOUR)
+    assert hours.maximum[0] == 1000.0 and hours.count[0] == 361
+    assert store.choose_resolution("temp", 0.0, MINUTE) == HOUR
+
+
+def test_segments_persist_across_reopen(tmp_path):
+    times, values = _points(2 * HOUR)
+    with SignalStore(tmp_path, capacities={RAW: 500}) as store:
+        store.append("rpm/line 1", times, values)
+        expected = store.query("rpm/line 1", 0.0, 2 * HOUR, step=MINUTE)
+    reopened = SignalStore(tmp_path)
+    assert reopened.signals() == ["rpm/line 1"]
+    np.testing.assert_array_equal(_as_rows(reopened.query("rpm/line 1", 0.0, 2 * HOUR, step=MINUTE)), _as_rows(expected))
+    reopened.append("rpm/line 1", [2 * HOUR], [1.0])
+    assert reopened.query("rpm/line 1", 0.0, 3 * HOUR, step=HOUR).count.sum() == times.size + 1